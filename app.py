@@ -4,11 +4,13 @@ HuggingFace Spaces: Gradio単体 / ローカル: FastAPI統合
 """
 import sys
 import os
+import re
 import asyncio
 import gradio as gr
 from datetime import datetime
 import traceback
 import time
+import threading
 import urllib.parse
 
 # HuggingFace Spaces環境判定（最優先）
@@ -21,10 +23,12 @@ if not is_hf_spaces:
     print("ローカル環境：FastAPI関連をインポート")
     from fastapi import FastAPI, HTTPException
     from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.responses import StreamingResponse, PlainTextResponse
     from fastapi.staticfiles import StaticFiles
     from pydantic import BaseModel
     from typing import Optional, Dict, List, Any
     import logging
+    import json
     
     # ロギング設定
     logging.basicConfig(level=logging.INFO)
@@ -50,6 +54,15 @@ if not is_hf_spaces:
     class ScrapeRequest(BaseModel):
         keyword: str = "バッグ"
         worker_id: Optional[str] = None
+        capture_api: bool = False  # 検索APIのJSONから商品を構築（取得できなければHTML解析）
+        incremental: bool = False  # 読み込み中に商品を逐次取得（最終HTMLダンプなし、失敗時も部分結果を返す）
+        save_html: bool = True  # 取得したHTMLをファイルにも保存するか
+        locale: str = "jp/ja"  # 対象サイトの国/言語（URLパス）
+        use_cache: bool = True  # キャッシュ済みの結果があれば再取得せずに返す
+        resource_profile: str = "default"  # リソースブロック（off / analytics / default / aggressive）
+        parallel_pages: bool = False  # 総商品数判明後、残りページを検索APIで並列取得
+        save_json: bool = True  # 商品DBに加えてJSONファイルも出力するか
+        output_format: str = "json"  # ファイルの形式（json / ndjson: 1行1商品、解析しながら書き出す）
 
     class ScrapeResponse(BaseModel):
         status: str
@@ -59,34 +72,131 @@ if not is_hf_spaces:
         total_products: int
         unique_products: int
         files: Dict[str, str]
-        products: Optional[List[Dict[str, Any]]] = None
+        run_id: Optional[str] = None
+        products: Optional[List[Dict[str, Any]]] = None  # 10件以下の場合のみ（全件は products_url から取得）
+        products_url: Optional[str] = None  # 全商品をNDJSONで逐次取得するURL
         error: Optional[str] = None
+        stats: Optional[Dict[str, Any]] = None
+        cache_hit: bool = False
+        cache_state: Optional[str] = None  # fresh / stale / miss
+        data_age_seconds: Optional[float] = None
+        timings: Optional[Dict[str, Any]] = None  # フェーズ別の所要時間とカウンタ
+        delta: Optional[Dict[str, Any]] = None  # 前回の実行からの差分（追加・削除・価格変更）
         execution_time: float
 
+    class BatchScrapeRequest(BaseModel):
+        keywords: List[str]
+        worker_id: Optional[str] = None
+        concurrency: int = 3  # 同時に開くタブ数（上限: BATCH_MAX_CONCURRENCY）
+        browsers: int = 1  # 使用するブラウザ数（プールサイズが上限）
+        capture_api: bool = False
+        incremental: bool = False
+        save_html: bool = True
+        resource_profile: str = "default"
+        parallel_pages: bool = False
+        save_json: bool = True
+        output_format: str = "json"
+
+    class ReparseRequest(BaseModel):
+        pattern: str = "hermes_page*.html"  # 対象スナップショットのファイル名パターン
+        output_dir: str = "default"  # 出力先の名前（REPARSE_ROOT 直下のディレクトリ、途中で止まった場合は同じ名前で再開）
+        workers: Optional[int] = None  # プロセス数（既定: CPUコア数）
+        engine: str = "lxml"
+        output_format: str = "json"
+        save_json: bool = True  # スナップショットごとのファイルを出力するか
+        write_db: bool = True  # 商品DBにも保存するか（実行ディレクトリ内のHTMLは元の実行を置き換える）
+        resume: bool = True  # Falseで記録済みの進捗を破棄して全件を解析し直す
+
+    class JobSubmitResponse(BaseModel):
+        job_id: str
+        status: str
+        queue_position: Optional[int] = None
+        links: Dict[str, str]
+
     class HealthResponse(BaseModel):
         status: str
         version: str
         timestamp: str
+        environment: Optional[Dict[str, Any]] = None
 else:
     print("HuggingFace Spaces環境：FastAPI無効、Gradio単体で動作")
 
 # モジュールのインポート
 from modules import (
-    check_environment,
-    HermesScraper,
+    create_logger,
+    check_environment_cached,
+    refresh_environment_cache,
+    get_environment_status,
+    FileHandler,
+    BrowserPool,
+    ScrapePipeline,
+    BatchScraper,
+    JobManager,
+    QueueFullError,
+    ResultCache,
+    RESOURCE_PROFILES,
+    get_artifact_store,
+    RunWorkspace,
+    RUNS_ROOT,
     HermesParser,
-    FileHandler
+    RunTimer,
+    get_metrics,
+    DeltaIndex,
+    get_product_store,
+    load_reparse_summary,
+    reparse_command
+)
+
+# プロセス共有のブラウザプール（APIとGradio UIの両方で使用）
+browser_pool = BrowserPool(
+    size=int(os.environ.get("BROWSER_POOL_SIZE", "2")),
+    max_uses=int(os.environ.get("BROWSER_POOL_MAX_USES", "20"))
 )
 
+# リソースブロックの既定プロファイル（Gradio UI用）
+resource_profile = os.environ.get("RESOURCE_BLOCK_PROFILE", "default")
+
+# キーワード単位の結果キャッシュ（エントリ単位のファイルに非同期で永続化）
+result_cache = ResultCache(
+    root=os.environ.get("RESULT_CACHE_DIR", "result_cache"),
+    ttl=int(os.environ.get("RESULT_CACHE_TTL", "900")),
+    stale_ttl=int(os.environ.get("RESULT_CACHE_STALE_TTL", "86400")),
+    max_entries=int(os.environ.get("RESULT_CACHE_MAX_ENTRIES", "100"))
+)
+
+# 抽出した商品の蓄積先（SQLite、保存先は環境変数 PRODUCT_DB）
+product_store = get_product_store()
+
+# キーワードごとの最新の商品状態（実行間の差分算出用、ディスクに永続化）
+delta_index = DeltaIndex(os.environ.get("DELTA_INDEX_DIR", "delta_index"), product_store=product_store)
+
+# 環境チェックは起動時に1回だけ実行してキャッシュ（リクエスト時はキャッシュを参照）
+threading.Thread(target=check_environment_cached, name='env-check-startup', daemon=True).start()
+
+# 古い実行ワークスペースと成果物ストア内のHTMLを定期的に削除（RUNS_KEEP=0で無効）
+runs_keep = int(os.environ.get("RUNS_KEEP", "50"))
+runs_clean_interval = int(os.environ.get("RUNS_CLEAN_INTERVAL", "600"))
+
+
+def _clean_runs_periodically():
+    while True:
+        try:
+            removed = FileHandler.clean_old_runs(keep_latest=runs_keep)
+            if removed:
+                print(f"🧹 古い実行を{removed}件削除しました（最新{runs_keep}件を保持）")
+        except Exception as e:
+            print(f"⚠️ 古い実行の削除に失敗しました: {e}")
+        time.sleep(runs_clean_interval)
+
+
+if runs_keep > 0:
+    threading.Thread(target=_clean_runs_periodically, name='runs-retention', daemon=True).start()
+
 # Gradio UI用のメイン処理関数
-def main_process(search_keyword="バッグ"):
+def main_process(search_keyword="バッグ", capture_api=False):
     """メイン処理を実行"""
-    results = []
-    
-    def log_and_append(message):
-        results.append(message)
-        print(message)
-        sys.stdout.flush()
+    logger = create_logger()
+    log_and_append = logger.log
     
     log_and_append("=== Hermes商品情報抽出システム (15000px版) ===")
     log_and_append(f"実行時刻: {datetime.now()}")
@@ -94,13 +204,17 @@ def main_process(search_keyword="バッグ"):
     
     try:
         # Phase 1-5: 環境チェック
-        log_and_append("📋 Phase 1-5: 環境チェック実行中...")
-        env_ok, env_results = check_environment()
-        results.extend(env_results)
+        log_and_append("📋 Phase 1-5: 環境チェック（起動時の結果を使用）...")
+        timer = RunTimer()
+        with timer.span('environment_check'):
+            env_ok, env_results = check_environment_cached()
+        logger.extend(env_results)
+        env_status = get_environment_status()
+        log_and_append(f"  ℹ️ 環境チェック実行時刻: {env_status['checked_at']}（{env_status['age_seconds']:.0f}秒前）")
         
         if not env_ok:
             log_and_append("\n❌ 環境チェックでエラーが発生しました。")
-            return "\n".join(results)
+            return "\n".join(logger.get_results())
         
         log_and_append("\n✅ 環境チェック完了！")
         log_and_append("")
@@ -109,37 +223,38 @@ def main_process(search_keyword="バッグ"):
         log_and_append("🌐 Phase 6.0: Hermesサイトスクレイピング開始...")
         log_and_append(f"🔍 検索キーワード: {search_keyword}")
         
-        async def run_scraping():
-            scraper = HermesScraper()
-            success = await scraper.scrape_hermes_site(search_keyword=search_keyword)
-            return success, scraper.get_results()
+        # スクレイピング→解析を1パスで実行（HTMLはメモリ上で受け渡し、解析は1回のみ）
+        pipeline = ScrapePipeline(
+            browser_pool=browser_pool,
+            capture_api=capture_api,
+            resource_profile=resource_profile,
+            workspace=RunWorkspace(),
+            timer=timer,
+            delta_index=delta_index,
+            product_store=product_store
+        )
         
-        # 非同期処理を実行
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        scraping_success, scraping_results = loop.run_until_complete(run_scraping())
-        loop.close()
+        # ブラウザプールのイベントループ上で非同期処理を実行
+        browser_pool.run(pipeline.run(search_keyword=search_keyword))
         
-        results.extend(scraping_results)
+        logger.extend(pipeline.get_scraper_results())
         
-        if not scraping_success:
+        if not pipeline.scrape_success:
             log_and_append("\n❌ スクレイピングに失敗しました。")
-            return "\n".join(results)
+            return "\n".join(logger.get_results())
         
         log_and_append("\n✅ Phase 6.0完了！")
         log_and_append("")
         
         # Phase 6.5: HTML解析
         log_and_append("📊 Phase 6.5: HTML解析開始...")
-        parser = HermesParser()
-        parse_success = parser.parse_html_file()
-        results.extend(parser.get_results())
+        logger.extend(pipeline.get_parser_results())
         
-        if not parse_success:
+        if not pipeline.parse_success:
             log_and_append("\n❌ HTML解析に失敗しました。")
-            return "\n".join(results)
+            return "\n".join(logger.get_results())
         
-        products = parser.get_products()
+        products = pipeline.get_products()
         log_and_append(f"\n✅ Phase 6.5完了！ {len(products)}個の商品情報を抽出しました。")
         
         # 結果サマリー
@@ -150,6 +265,9 @@ def main_process(search_keyword="バッグ"):
         log_and_append(f"✅ Phase 6.0: スクレイピング - 成功")
         log_and_append(f"✅ Phase 6.5: HTML解析 - 成功")
         log_and_append(f"📦 抽出商品数: {len(products)}個")
+        log_and_append(f"\n⏱️ フェーズ別所要時間:")
+        for phase, timing in pipeline.timer.breakdown()['phases'].items():
+            log_and_append(f"  - {phase}: {timing['seconds']:.2f}秒" + (f" ({timing['count']}回)" if timing['count'] > 1 else ""))
         
         # ダウンロード可能ファイル
         files = FileHandler.get_downloadable_files()
@@ -162,7 +280,7 @@ def main_process(search_keyword="バッグ"):
         log_and_append(f"\n❌ エラーが発生しました: {type(e).__name__}: {str(e)}")
         log_and_append(traceback.format_exc())
     
-    return "\n".join(results)
+    return "\n".join(logger.get_results())
 
 
 def get_downloadable_files():
@@ -195,6 +313,102 @@ def get_downloadable_files():
 
 # FastAPIエンドポイント（ローカル環境のみ）
 if not is_hf_spaces:
+    async def run_scrape_job(job):
+        """ジョブキューのワーカーから呼ばれるスクレイピング処理（プールのループ上で実行）"""
+        start_time = time.time()
+        params = job.params
+        locale = params.get('locale', 'jp/ja')
+        if params.get('use_cache'):
+            entry, state = result_cache.get(params['keyword'], locale)
+            if state == 'fresh':
+                return {
+                    'status': 'success',
+                    'keyword': params['keyword'],
+                    'worker_id': params.get('worker_id'),
+                    'total_products': len(entry['products']),
+                    'unique_products': entry['stats'].get('unique_products', len(entry['products'])),
+                    'files': entry['files'],
+                    'products': entry['products'],
+                    'stats': entry['stats'],
+                    'error': None,
+                    'cache_hit': True,
+                    'data_age_seconds': entry['age_seconds'],
+                    'execution_time': time.time() - start_time
+                }
+        
+        timer = RunTimer()
+        loop = asyncio.get_running_loop()
+        with timer.span('environment_check'):
+            env_ok, env_results = await loop.run_in_executor(None, check_environment_cached)
+        if not env_ok:
+            result_cache.end_refresh(params['keyword'], locale)
+            return {'status': 'error', 'error': "環境チェックに失敗しました", 'execution_time': time.time() - start_time}
+        
+        # 同時実行中のジョブとファイルが衝突しないよう実行ごとのワークスペースに出力
+        pipeline = ScrapePipeline(
+            browser_pool=browser_pool,
+            capture_api=params['capture_api'],
+            harvest=params['incremental'],
+            save_html=params['save_html'],
+            workspace=RunWorkspace(worker_id=params.get('worker_id')),
+            resource_profile=params.get('resource_profile', 'default'),
+            parallel_pages=params.get('parallel_pages', False),
+            timer=timer,
+            delta_index=delta_index,
+            product_store=product_store,
+            save_json=params.get('save_json', True),
+            output_format=params.get('output_format', 'json'),
+            on_products=job.products.extend
+        )
+        job.log_sources = [pipeline.scraper.logger, pipeline.parser.logger]
+        try:
+            success = await pipeline.run(search_keyword=params['keyword'], locale=locale)
+        finally:
+            result_cache.end_refresh(params['keyword'], locale)
+        
+        error = None
+        if not pipeline.scrape_success:
+            error = "スクレイピングに失敗しました"
+        elif not pipeline.parse_success:
+            error = "HTML解析に失敗しました"
+        
+        files = {}
+        if pipeline.html_file:
+            files['html'] = pipeline.html_file
+        if pipeline.json_file:
+            files['json'] = pipeline.json_file
+        
+        products = pipeline.get_products()
+        stats = pipeline.get_stats()
+        if success:
+            result_cache.put(params['keyword'], locale, products, stats=stats, files=files, partial=pipeline.partial)
+        return {
+            'status': 'success' if success else 'error',
+            'keyword': params['keyword'],
+            'worker_id': params.get('worker_id'),
+            'run_id': pipeline.run_id,
+            'total_products': len(products),
+            'unique_products': stats.get('unique_products', len(products)),
+            'files': files,
+            'products': products,
+            'products_url': _products_url(pipeline.run_id) if products else None,
+            'stats': stats,
+            'error': error,
+            'cache_hit': False,
+            'data_age_seconds': 0.0,
+            'timings': timer.breakdown(),
+            'delta': pipeline.delta,
+            'execution_time': time.time() - start_time
+        }
+
+    # 非同期ジョブキュー（ワーカー数はプールサイズ、待機数は上限付き）
+    job_manager = JobManager(
+        browser_pool,
+        run_scrape_job,
+        workers=int(os.environ.get("JOB_WORKERS", str(browser_pool.size))),
+        max_queue=int(os.environ.get("JOB_MAX_QUEUE", "20"))
+    )
+
     @app.get("/api/info")
     async def api_info():
         """API情報エンドポイント"""
@@ -203,68 +417,232 @@ if not is_hf_spaces:
             "version": "1.0.0",
             "endpoints": {
                 "health": "/api/v1/health",
-                "scrape": "/api/v1/scrape"
+                "environment_refresh": "/api/v1/admin/environment/refresh",
+                "scrape": "/api/v1/scrape",
+                "scrape_batch": "/api/v1/scrape/batch",
+                "jobs": "/api/v1/jobs",
+                "cache": "/api/v1/cache",
+                "artifacts": "/api/v1/artifacts",
+                "runs": "/api/v1/runs",
+                "run_products": "/api/v1/runs/{run_id}/products",
+                "reparse": "/api/v1/reparse",
+                "delta": "/api/v1/delta",
+                "products": "/api/v1/products",
+                "pool": "/api/v1/pool",
+                "metrics": "/metrics"
             }
         }
 
     @app.get("/api/v1/health", response_model=HealthResponse)
     async def health_check():
-        """ヘルスチェックエンドポイント"""
+        """ヘルスチェックエンドポイント（キャッシュ済みの環境チェック結果を含む）"""
+        environment = get_environment_status()
         return HealthResponse(
-            status="healthy",
+            status="degraded" if environment['ok'] is False else "healthy",
             version="1.0.0",
-            timestamp=datetime.now().isoformat()
+            timestamp=datetime.now().isoformat(),
+            environment=environment
         )
 
+    @app.post("/api/v1/admin/environment/refresh")
+    async def refresh_environment():
+        """環境チェックを再実行してキャッシュを更新する管理用エンドポイント"""
+        loop = asyncio.get_running_loop()
+        env_ok, env_results = await loop.run_in_executor(None, refresh_environment_cache)
+        return {
+            "environment": get_environment_status(),
+            "results": env_results
+        }
+
+    @app.get("/api/v1/pool")
+    async def pool_stats():
+        """ブラウザプールの統計情報エンドポイント"""
+        return browser_pool.get_stats()
+
+    @app.get("/metrics", response_class=PlainTextResponse)
+    async def metrics():
+        """Prometheus形式のメトリクス（フェーズ別所要時間・カウンタ・プール/キューの現在値）"""
+        pool = browser_pool.get_stats()
+        jobs = job_manager.get_stats()
+        gauges = {
+            'hermes_browser_pool_size': ('Browsers in the pool', pool['size']),
+            'hermes_browser_pool_in_use': ('Browsers currently leased', pool['in_use']),
+            'hermes_jobs_queued': ('Jobs waiting in the queue', jobs['queued']),
+            'hermes_jobs_running': ('Jobs currently running', jobs['jobs'].get('running', 0)),
+        }
+        return PlainTextResponse(
+            get_metrics().render(gauges),
+            media_type="text/plain; version=0.0.4; charset=utf-8"
+        )
+
+    @app.on_event("shutdown")
+    async def shutdown_browser_pool():
+        """アプリ終了時にプール内のブラウザを終了"""
+        await asyncio.get_running_loop().run_in_executor(None, browser_pool.shutdown)
+
+    async def run_reparse_job(job):
+        """一括再解析ジョブ（python -m modules.reparse を別プロセスで起動し、出力を進捗ログとして取り込む）"""
+        params = job.params
+        logger = create_logger()
+        job.log_sources = [logger]
+        command = reparse_command(
+            output_dir=os.path.join(reparse_root, params['output_dir']),
+            pattern=params['pattern'],
+            workers=params.get('workers'),
+            engine=params['engine'],
+            output_format=params['output_format'],
+            save_json=params['save_json'],
+            db_path=product_store.path if params['write_db'] else None,
+            resume=params['resume']
+        )
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(
+            filter(None, [os.path.dirname(os.path.abspath(__file__)), os.environ.get("PYTHONPATH")])
+        ))
+        process = await asyncio.create_subprocess_exec(
+            *command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT, env=env
+        )
+        async for line in process.stdout:
+            line = line.decode('utf-8', errors='replace').rstrip()
+            if line:
+                logger.log(line)
+        await process.wait()
+        summary = load_reparse_summary(os.path.join(reparse_root, params['output_dir']))
+        if summary is None:
+            return {'status': 'error', 'error': f"再解析プロセスが異常終了しました（終了コード {process.returncode}）"}
+        return summary
+
+    # 一括スクレイピングで1リクエストが同時に開けるタブ数の上限
+    batch_max_concurrency = int(os.environ.get("BATCH_MAX_CONCURRENCY", "8"))
+
+    # 一括再解析の出力先（APIからはこの直下の名前だけを指定できる）
+    reparse_root = os.environ.get("REPARSE_ROOT", "reparse")
+
+    # 一括再解析は重いため1件ずつ実行
+    reparse_manager = JobManager(
+        browser_pool,
+        run_reparse_job,
+        workers=1,
+        max_queue=int(os.environ.get("REPARSE_MAX_QUEUE", "5"))
+    )
+
+    def _check_resource_profile(profile):
+        if profile not in RESOURCE_PROFILES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"resource_profileは {', '.join(RESOURCE_PROFILES)} のいずれかを指定してください"
+            )
+
+    def _check_output_format(output_format):
+        if output_format not in HermesParser.OUTPUT_FORMATS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"output_formatは {', '.join(HermesParser.OUTPUT_FORMATS)} のいずれかを指定してください"
+            )
+
+    def _products_url(run_id):
+        return f"/api/v1/runs/{run_id}/products"
+
+    def _revalidate_in_background(request):
+        """古いキャッシュを返した後、ジョブキューで再取得してキャッシュを更新"""
+        if not result_cache.begin_refresh(request.keyword, request.locale):
+            return None
+        params = request.model_dump()
+        params['use_cache'] = False
+        try:
+            return job_manager.submit(params)
+        except QueueFullError:
+            result_cache.end_refresh(request.keyword, request.locale)
+            return None
+
     @app.post("/api/v1/scrape", response_model=ScrapeResponse)
     async def scrape_hermes(request: ScrapeRequest):
         """エルメスサイトをスクレイピングして商品情報を抽出"""
         start_time = time.time()
+        cache_state = None
+        _check_resource_profile(request.resource_profile)
+        _check_output_format(request.output_format)
         
         try:
-            # 環境チェック
-            env_ok, env_results = check_environment()
+            # キャッシュ確認（staleの場合は古い結果を即座に返し、裏で再取得する）
+            if request.use_cache:
+                entry, cache_state = result_cache.get(request.keyword, request.locale)
+                if entry is not None:
+                    if cache_state == 'stale':
+                        await asyncio.get_running_loop().run_in_executor(
+                            None, _revalidate_in_background, request
+                        )
+                    products = entry['products']
+                    return ScrapeResponse(
+                        status="success",
+                        timestamp=datetime.now().isoformat(),
+                        worker_id=request.worker_id,
+                        keyword=request.keyword,
+                        total_products=len(products),
+                        unique_products=entry['stats'].get('unique_products', len(products)),
+                        files={k: v for k, v in entry['files'].items() if FileHandler.file_exists(v)},
+                        products=products if len(products) <= 10 else None,
+                        stats=entry['stats'],
+                        cache_hit=True,
+                        cache_state=cache_state,
+                        data_age_seconds=entry['age_seconds'],
+                        execution_time=time.time() - start_time
+                    )
+            
+            # 環境チェック（キャッシュ済みの結果を参照）
+            # 起動直後でチェック実行中の場合に備え、イベントループを塞がないようスレッドで待つ
+            timer = RunTimer()
+            with timer.span('environment_check'):
+                env_ok, env_results = await asyncio.get_running_loop().run_in_executor(
+                    None, check_environment_cached
+                )
             if not env_ok:
                 raise HTTPException(
                     status_code=500,
                     detail="環境チェックに失敗しました"
                 )
             
-            # スクレイピング実行
-            scraper = HermesScraper()
-            success = await scraper.scrape_hermes_site(search_keyword=request.keyword)
+            # スクレイピング→解析を1パスで実行（HTMLはメモリ上で受け渡し、解析は1回のみ）
+            # 実行ごとのワークスペースに出力（同時リクエストとファイル名が衝突しない）
+            pipeline = ScrapePipeline(
+                browser_pool=browser_pool,
+                capture_api=request.capture_api,
+                harvest=request.incremental,
+                save_html=request.save_html,
+                workspace=RunWorkspace(worker_id=request.worker_id),
+                resource_profile=request.resource_profile,
+                parallel_pages=request.parallel_pages,
+                timer=timer,
+                delta_index=delta_index,
+                product_store=product_store,
+                save_json=request.save_json,
+                output_format=request.output_format
+            )
+            await browser_pool.run_async(pipeline.run(search_keyword=request.keyword, locale=request.locale))
             
-            if not success:
+            if not pipeline.scrape_success:
                 raise HTTPException(
                     status_code=500,
                     detail="スクレイピングに失敗しました"
                 )
             
-            # HTML解析
-            parser = HermesParser()
-            parse_success = parser.parse_html_file()
-            
-            if not parse_success:
+            if not pipeline.parse_success:
                 raise HTTPException(
                     status_code=500,
                     detail="HTML解析に失敗しました"
                 )
             
-            products = parser.get_products()
+            products = pipeline.get_products()
+            stats = pipeline.get_stats()
             
-            # ファイル名にタイムスタンプとワーカーIDを追加
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            worker_suffix = f"_{request.worker_id}" if request.worker_id else ""
+            # 出力ファイル（確定済みワークスペース内のパス）
+            files = {}
+            if pipeline.html_file:
+                files["html"] = pipeline.html_file
+            if pipeline.json_file:
+                files["json"] = pipeline.json_file
             
-            # ファイル名を変更
-            html_file = f"hermes_page_{timestamp}{worker_suffix}.html"
-            json_file = f"hermes_products_{timestamp}{worker_suffix}.json"
-            
-            # 既存のファイルをリネーム
-            if os.path.exists("hermes_page.html"):
-                os.rename("hermes_page.html", html_file)
-            if os.path.exists("hermes_products.json"):
-                os.rename("hermes_products.json", json_file)
+            result_cache.put(request.keyword, request.locale, products, stats=stats, files=files,
+                             partial=pipeline.partial)
             
             # 実行時間を計算
             execution_time = time.time() - start_time
@@ -276,12 +654,16 @@ if not is_hf_spaces:
                 worker_id=request.worker_id,
                 keyword=request.keyword,
                 total_products=len(products),
-                unique_products=len(products),
-                files={
-                    "html": html_file,
-                    "json": json_file
-                },
+                unique_products=stats.get('unique_products', len(products)),
+                files=files,
+                run_id=pipeline.run_id,
                 products=products if len(products) <= 10 else None,
+                products_url=_products_url(pipeline.run_id) if products else None,
+                stats=stats,
+                cache_state=cache_state,
+                data_age_seconds=0.0,
+                timings=timer.breakdown(),
+                delta=pipeline.delta,
                 execution_time=execution_time
             )
             
@@ -298,9 +680,335 @@ if not is_hf_spaces:
                 unique_products=0,
                 files={},
                 error=str(e),
+                cache_state=cache_state,
                 execution_time=execution_time
             )
 
+    @app.post("/api/v1/scrape/batch")
+    async def scrape_hermes_batch(request: BatchScrapeRequest):
+        """複数キーワードを並行タブでスクレイピングし、完了したキーワードから順にNDJSONで返す"""
+        keywords = [kw.strip() for kw in request.keywords if kw and kw.strip()]
+        if not keywords:
+            raise HTTPException(status_code=400, detail="keywordsが空です")
+        if not 1 <= request.concurrency <= batch_max_concurrency:
+            raise HTTPException(
+                status_code=400,
+                detail=f"concurrencyは1〜{batch_max_concurrency}で指定してください"
+            )
+        _check_resource_profile(request.resource_profile)
+        _check_output_format(request.output_format)
+        
+        env_ok, env_results = await asyncio.get_running_loop().run_in_executor(
+            None, check_environment_cached
+        )
+        if not env_ok:
+            raise HTTPException(
+                status_code=500,
+                detail="環境チェックに失敗しました"
+            )
+        
+        batch = BatchScraper(
+            browser_pool,
+            concurrency=request.concurrency,
+            browsers=request.browsers,
+            capture_api=request.capture_api,
+            harvest=request.incremental,
+            save_html=request.save_html,
+            worker_id=request.worker_id,
+            resource_profile=request.resource_profile,
+            parallel_pages=request.parallel_pages,
+            delta_index=delta_index,
+            product_store=product_store,
+            save_json=request.save_json,
+            output_format=request.output_format
+        )
+        
+        async def stream_results():
+            start_time = time.time()
+            succeeded = 0
+            async for result in browser_pool.iterate_async(batch.run(keywords)):
+                if result['status'] == 'success':
+                    succeeded += 1
+                result['type'] = 'result'
+                result['worker_id'] = request.worker_id
+                yield json.dumps(result, ensure_ascii=False) + "\n"
+            yield json.dumps({
+                'type': 'summary',
+                'worker_id': request.worker_id,
+                'keywords': len(keywords),
+                'succeeded': succeeded,
+                'failed': len(keywords) - succeeded,
+                'concurrency': batch.concurrency,
+                'browsers': batch.browsers,
+                'execution_time': time.time() - start_time
+            }, ensure_ascii=False) + "\n"
+        
+        return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+    @app.get("/api/v1/runs")
+    async def list_runs(limit: int = 50):
+        """確定済みの実行ワークスペース一覧（新しい順）"""
+        return {"runs": [RunWorkspace.load_manifest(run_id) for run_id in RunWorkspace.list_runs()[:limit]]}
+
+    @app.get("/api/v1/runs/{run_id}")
+    async def get_run(run_id: str):
+        """実行ワークスペースのマニフェストを取得"""
+        manifest = RunWorkspace.load_manifest(run_id)
+        if manifest is None:
+            raise HTTPException(status_code=404, detail="実行が見つかりません")
+        return manifest
+
+    def _iter_file_lines(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            yield from f
+
+    def _run_product_lines(run_id):
+        """実行の商品をNDJSONの行として返すイテレータ（商品DB、なければ実行ディレクトリのファイルから。見つからなければNone）"""
+        if product_store.has_run(run_id):
+            return (json.dumps(p, ensure_ascii=False) + "\n" for p in product_store.iter_run_products(run_id))
+        manifest = RunWorkspace.load_manifest(run_id)
+        if manifest is None:
+            return None
+        run_dir = os.path.join(RUNS_ROOT, os.path.basename(run_id))
+        for name in manifest.get('files', []):
+            if not name.startswith('hermes_products'):
+                continue
+            if name.endswith('.ndjson'):
+                return _iter_file_lines(os.path.join(run_dir, name))
+            if name.endswith('.json'):
+                data = FileHandler.load_json(os.path.join(run_dir, name)) or {}
+                return (json.dumps(p, ensure_ascii=False) + "\n" for p in data.get('products', []))
+        return None
+
+    @app.get("/api/v1/runs/{run_id}/products")
+    async def stream_run_products(run_id: str):
+        """実行の全商品をNDJSON（1行1商品）で逐次返す（商品DBから一定件数ずつ読み出すため件数によらずメモリ一定）"""
+        lines = await asyncio.get_running_loop().run_in_executor(None, _run_product_lines, run_id)
+        if lines is None:
+            raise HTTPException(status_code=404, detail="実行が見つかりません")
+        return StreamingResponse(lines, media_type="application/x-ndjson")
+
+    def _reparse_links(job):
+        return {"status": f"/api/v1/reparse/{job.id}"}
+
+    @app.post("/api/v1/reparse", response_model=JobSubmitResponse, status_code=202)
+    async def submit_reparse(request: ReparseRequest):
+        """保存済みHTMLスナップショットの一括再解析をジョブとして登録（解析規則の修正後に使う）"""
+        _check_output_format(request.output_format)
+        if request.engine not in HermesParser.ENGINES:
+            raise HTTPException(status_code=400, detail=f"engineは {', '.join(HermesParser.ENGINES)} のいずれかを指定してください")
+        if os.sep in request.pattern or '..' in request.pattern:
+            raise HTTPException(status_code=400, detail="patternにはファイル名のパターンのみ指定してください")
+        if not re.fullmatch(r'[A-Za-z0-9][A-Za-z0-9_.-]*', request.output_dir) or '..' in request.output_dir:
+            raise HTTPException(status_code=400, detail="output_dirには英数字・_・-・. からなる名前のみ指定してください")
+        if request.workers is not None and request.workers < 1:
+            raise HTTPException(status_code=400, detail="workersは1以上を指定してください")
+        try:
+            job = await asyncio.get_running_loop().run_in_executor(
+                None, reparse_manager.submit, request.model_dump()
+            )
+        except QueueFullError as e:
+            raise HTTPException(status_code=429, detail=str(e))
+        return JobSubmitResponse(
+            job_id=job.id,
+            status=job.status,
+            queue_position=reparse_manager.queue_position(job),
+            links=_reparse_links(job)
+        )
+
+    @app.get("/api/v1/reparse/{job_id}")
+    async def get_reparse(job_id: str, include_logs: bool = False):
+        """一括再解析ジョブの状態と集計（items/s・並列効果、include_logs=trueで進捗ログ）"""
+        job = reparse_manager.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="ジョブが見つかりません")
+        data = job.to_dict()
+        data['queue_position'] = reparse_manager.queue_position(job)
+        data['links'] = _reparse_links(job)
+        if include_logs:
+            data['logs'], _ = job.read_progress()
+        return data
+
+    @app.get("/api/v1/delta")
+    async def get_delta(keyword: Optional[str] = None, locale: str = "jp/ja", since: Optional[str] = None):
+        """商品の差分を取得（since指定時はその実行から現在の状態まで、未指定時は直近の実行の差分）"""
+        if since is None and not keyword:
+            raise HTTPException(status_code=400, detail="keywordまたはsinceを指定してください")
+        loop = asyncio.get_running_loop()
+        if since is not None:
+            delta = await loop.run_in_executor(None, delta_index.since, since, keyword, locale if keyword else None)
+            if delta is None:
+                raise HTTPException(status_code=404, detail="指定した実行または差分の状態が見つかりません")
+            return delta
+        delta = await loop.run_in_executor(None, delta_index.latest, keyword, locale)
+        if delta is None:
+            raise HTTPException(status_code=404, detail="このキーワードの実行履歴がありません")
+        return delta
+
+    @app.get("/api/v1/products")
+    async def search_products(
+        keyword: Optional[str] = None,
+        locale: Optional[str] = None,
+        sku: Optional[str] = None,
+        url: Optional[str] = None,
+        q: Optional[str] = None,
+        min_price: Optional[int] = None,
+        max_price: Optional[int] = None,
+        currency: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        run_id: Optional[str] = None,
+        latest: bool = True,
+        limit: int = 100,
+        offset: int = 0
+    ):
+        """商品DBを検索（min_price/max_priceはcurrencyの最小通貨単位（円・セント）、since/untilはISO形式の日時、latest=trueで同一商品は最新の取得分のみ）"""
+        if not 1 <= limit <= 1000:
+            raise HTTPException(status_code=400, detail="limitは1〜1000で指定してください")
+        if (min_price is not None or max_price is not None) and not currency:
+            raise HTTPException(status_code=400, detail="min_price/max_priceを指定する場合はcurrency（JPY・USD等）も指定してください")
+        try:
+            total, products = await asyncio.get_running_loop().run_in_executor(
+                None,
+                lambda: product_store.query(
+                    keyword=keyword, locale=locale, sku=sku, url=url, name=q,
+                    min_price=min_price, max_price=max_price, currency=currency,
+                    since=since, until=until, run_id=run_id, latest=latest,
+                    limit=limit, offset=offset
+                )
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"日時の形式が不正です: {e}")
+        return {
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+            "next_offset": offset + limit if offset + limit < total else None,
+            "products": products
+        }
+
+    @app.get("/api/v1/products/runs")
+    async def product_runs(keyword: Optional[str] = None, limit: int = 50):
+        """商品DBに保存された実行の一覧（新しい順）と統計"""
+        loop = asyncio.get_running_loop()
+        runs = await loop.run_in_executor(None, lambda: product_store.list_runs(keyword=keyword, limit=limit))
+        return {"runs": runs, "stats": await loop.run_in_executor(None, product_store.get_stats)}
+
+    @app.get("/api/v1/products/export")
+    async def export_products(run_id: str):
+        """1回の実行の商品をJSONファイルと同じ形式で出力"""
+        loop = asyncio.get_running_loop()
+        products = await loop.run_in_executor(None, product_store.get_run_products, run_id)
+        if products is None:
+            raise HTTPException(status_code=404, detail="実行が見つかりません")
+        run = product_store.list_runs(run_id=run_id)[0]
+        return {
+            "extraction_date": run['extracted_at'],
+            "total_products": len(products),
+            "products": products
+        }
+
+    @app.get("/api/v1/artifacts")
+    async def artifact_stats():
+        """HTML成果物ストアのディスク削減レポートとファイル一覧"""
+        store = get_artifact_store()
+        return {
+            "stats": store.get_stats(),
+            "files": store.list_entries()
+        }
+
+    @app.get("/api/v1/cache")
+    async def cache_stats():
+        """結果キャッシュの統計情報"""
+        return result_cache.get_stats()
+
+    @app.delete("/api/v1/cache")
+    async def clear_cache(keyword: Optional[str] = None, locale: str = "jp/ja"):
+        """結果キャッシュを削除（keyword省略時は全件）"""
+        await asyncio.get_running_loop().run_in_executor(None, result_cache.invalidate, keyword, locale)
+        return result_cache.get_stats()
+
+    def _job_links(job):
+        return {
+            "status": f"/api/v1/jobs/{job.id}",
+            "stream": f"/api/v1/jobs/{job.id}/stream"
+        }
+
+    @app.post("/api/v1/jobs", response_model=JobSubmitResponse, status_code=202)
+    async def submit_job(request: ScrapeRequest):
+        """スクレイピングをジョブとして登録し、ジョブIDを即座に返す（キュー満杯時は429）"""
+        _check_resource_profile(request.resource_profile)
+        _check_output_format(request.output_format)
+        try:
+            job = await asyncio.get_running_loop().run_in_executor(
+                None, job_manager.submit, request.model_dump()
+            )
+        except QueueFullError as e:
+            raise HTTPException(status_code=429, detail=str(e))
+        return JobSubmitResponse(
+            job_id=job.id,
+            status=job.status,
+            queue_position=job_manager.queue_position(job),
+            links=_job_links(job)
+        )
+
+    @app.get("/api/v1/jobs")
+    async def list_jobs():
+        """ジョブ一覧とキューの状態"""
+        return {
+            "queue": job_manager.get_stats(),
+            "jobs": [job.to_dict(include_result=False) for job in job_manager.list_jobs()]
+        }
+
+    @app.get("/api/v1/jobs/{job_id}")
+    async def get_job(job_id: str, include_products: bool = True):
+        """ジョブの状態を取得（完了済みなら商品リストとファイルパスを含む）"""
+        job = job_manager.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="ジョブが見つかりません")
+        data = job.to_dict()
+        data['queue_position'] = job_manager.queue_position(job)
+        data['links'] = _job_links(job)
+        if data['result'] and not include_products:
+            data['result'] = {k: v for k, v in data['result'].items() if k != 'products'}
+        return data
+
+    @app.get("/api/v1/jobs/{job_id}/stream")
+    async def stream_job(job_id: str, interval: float = 0.5):
+        """ジョブの進捗ログ（incremental=trueなら取得済みの商品も）をNDJSONで逐次返し、完了時に最終状態を返す"""
+        job = job_manager.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="ジョブが見つかりません")
+        interval = max(0.1, interval)
+        
+        async def stream_progress():
+            cursors = None
+            product_cursor = 0
+            last_status = None
+            while True:
+                done = job.done
+                if job.status != last_status:
+                    last_status = job.status
+                    yield json.dumps({
+                        'type': 'status',
+                        'status': job.status,
+                        'queue_position': job_manager.queue_position(job)
+                    }, ensure_ascii=False) + "\n"
+                messages, cursors = job.read_progress(cursors)
+                for message in messages:
+                    yield json.dumps({'type': 'log', 'message': message}, ensure_ascii=False) + "\n"
+                products, product_cursor = job.read_products(product_cursor)
+                if products:
+                    yield json.dumps({'type': 'products', 'products': products}, ensure_ascii=False) + "\n"
+                if done:
+                    break
+                await asyncio.sleep(interval)
+            data = job.to_dict()
+            data['type'] = 'done'
+            yield json.dumps(data, ensure_ascii=False) + "\n"
+        
+        return StreamingResponse(stream_progress(), media_type="application/x-ndjson")
+
 
 # Gradioインターフェース
 with gr.Blocks(title="Hermes商品情報抽出システム") as demo:
@@ -342,6 +1050,12 @@ with gr.Blocks(title="Hermes商品情報抽出システム") as demo:
         ## API利用
         - **Health Check**: `GET /api/v1/health`
         - **Scrape**: `POST /api/v1/scrape`
+        - **Batch Scrape**: `POST /api/v1/scrape/batch`（NDJSONで順次返却）
+        - **Runs**: `GET /api/v1/runs` / `GET /api/v1/runs/{run_id}`（実行ごとの作業ディレクトリ）
+        - **Artifacts**: `GET /api/v1/artifacts`（HTMLは圧縮・重複排除して保存、削減バイト数を表示）
+        - **Result Cache**: `GET /api/v1/cache` / `DELETE /api/v1/cache`（`use_cache`で同一キーワードの結果を再利用）
+        - **Jobs**: `POST /api/v1/jobs`（ジョブIDを即時返却）→ `GET /api/v1/jobs/{job_id}` / `GET /api/v1/jobs/{job_id}/stream`
+        - **Browser Pool**: `GET /api/v1/pool`
         - **Gradio UI**: `http://localhost:7860/app`
         """
     
@@ -355,6 +1069,11 @@ with gr.Blocks(title="Hermes商品情報抽出システム") as demo:
                 value="バッグ",
                 info="エルメス公式サイトで検索したい商品カテゴリを入力"
             )
+            capture_api_input = gr.Checkbox(
+                label="📡 APIレスポンスから抽出",
+                value=False,
+                info="検索APIのJSONから商品を構築（取得できない場合はHTML解析）"
+            )
             run_button = gr.Button("🚀 実行", variant="primary", size="lg")
             
             gr.Markdown("""
@@ -390,14 +1109,16 @@ with gr.Blocks(title="Hermes商品情報抽出システム") as demo:
     
     def prepare_download(selected_file):
         """選択されたファイルをダウンロード準備"""
-        if selected_file and os.path.exists(selected_file):
-            return gr.update(visible=True, value=selected_file)
+        # 圧縮保存されたファイルは展開済みのパスを渡す
+        path = FileHandler.resolve_path(selected_file) if selected_file else None
+        if path:
+            return gr.update(visible=True, value=path)
         return gr.update(visible=False)
     
     # イベントハンドラー
     run_button.click(
         fn=main_process,
-        inputs=search_input,
+        inputs=[search_input, capture_api_input],
         outputs=output_text
     ).then(
         fn=update_file_list,
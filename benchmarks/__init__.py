@@ -0,0 +1,3 @@
+"""
+ベンチマーク・検証用スクリプト
+"""
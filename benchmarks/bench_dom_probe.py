@@ -0,0 +1,133 @@
+"""
+DOMプローブのCDP往復回数と所要時間の比較（チェックごとのevaluate vs 1回のプローブ）
+
+fixture_site.py のページをヘッドレスChromiumで開き、本番で発行されるプローブ
+（LoadController._observe の状態チェックと HermesScraper._wait_for_page_load のコンテナ待機）を、
+1チェック（1セレクター）1回のevaluateで実行した場合と build_probe_script でまとめた場合で交互に計測する。
+--rtt-ms を指定すると evaluate 1回ごとに遅延を加え、リモートのブラウザを模擬する:
+    python benchmarks/bench_dom_probe.py --rounds 200
+    python benchmarks/bench_dom_probe.py --rounds 50 --rtt-ms 5
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixture_site import FixtureSite
+from modules.browser_pool import launch_browser, stop_browser
+from modules.dom_probe import build_probe_script, parse_probe_result
+from modules.load_controller import _STATE_CHECKS
+from modules.scraper import CONTAINER_SELECTORS
+
+
+# 本番と同じチェック（LoadControllerは1ステップごと、コンテナ待機は0.5秒ごとに発行）
+# container_wait はコンテナ出現前の空ページで計測する（待機中のポーリングは大半が未検出）
+SCENARIOS = [
+    ('state', 'page', _STATE_CHECKS),
+    ('container', 'page', [('container', 'first', CONTAINER_SELECTORS)]),
+    ('container_wait', 'blank', [('container', 'first', CONTAINER_SELECTORS)]),
+]
+
+
+class _Counter:
+    """evaluateの回数を数え、必要なら往復遅延を加える"""
+
+    def __init__(self, tab, rtt):
+        self.tab = tab
+        self.rtt = rtt
+        self.calls = 0
+
+    async def evaluate(self, expression):
+        self.calls += 1
+        if self.rtt:
+            await asyncio.sleep(self.rtt)
+        return await self.tab.evaluate(expression)
+
+
+async def _separate(evaluator, checks):
+    """1チェック（リストのセレクターは1セレクター）ごとに1回evaluateする（プローブ導入前の方式）"""
+    result = {}
+    for name, kind, selector in checks:
+        if kind == 'first':
+            result[name] = None
+            for candidate in selector:
+                probe = parse_probe_result(
+                    await evaluator.evaluate(build_probe_script([(name, 'exists', candidate)]))
+                )
+                if probe.get(name):
+                    result[name] = candidate
+                    break
+        else:
+            probe = parse_probe_result(await evaluator.evaluate(build_probe_script([(name, kind, selector)])))
+            result[name] = probe.get(name)
+    return result
+
+
+async def _probe(evaluator, checks):
+    """全チェックを1回のevaluateで実行"""
+    return parse_probe_result(await evaluator.evaluate(build_probe_script(checks)))
+
+
+async def _wait_for_items(tab, timeout=30):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        probe = parse_probe_result(await tab.evaluate(build_probe_script([('items', 'count', 'h-grid-result-item')])))
+        if probe.get('items'):
+            return probe['items']
+        await asyncio.sleep(0.2)
+    raise RuntimeError("フィクスチャページに商品が表示されませんでした")
+
+
+async def _bench(url, rounds, rtt):
+    browser = await launch_browser()
+    timings = {(scenario, mode): [] for scenario, _, _ in SCENARIOS for mode in ('separate', 'probe')}
+    calls = {}
+    try:
+        tabs = {'page': await browser.get(url)}
+        items = await _wait_for_items(tabs['page'])
+        print(f"  page ready: {items} items")
+        tabs['blank'] = await browser.get('about:blank', new_tab=True)
+        for round_index in range(rounds):
+            for scenario, tab_name, checks in SCENARIOS:
+                results = {}
+                # 交互に実行してページ状態・CPU負荷の偏りを抑える
+                order = ('separate', 'probe') if round_index % 2 == 0 else ('probe', 'separate')
+                for mode in order:
+                    evaluator = _Counter(tabs[tab_name], rtt)
+                    start = time.perf_counter()
+                    results[mode] = await (_separate if mode == 'separate' else _probe)(evaluator, checks)
+                    timings[(scenario, mode)].append(time.perf_counter() - start)
+                    calls[(scenario, mode)] = evaluator.calls
+                if results['separate'] != {name: results['probe'].get(name) for name, _, _ in checks}:
+                    raise RuntimeError(f"結果が一致しません（{scenario}）: {results}")
+    finally:
+        await stop_browser(browser)
+    return timings, calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DOMプローブのCDP往復回数・所要時間の比較")
+    parser.add_argument('--rounds', type=int, default=100)
+    parser.add_argument('--items', type=int, default=96)
+    parser.add_argument('--rtt-ms', type=float, default=0.0, help='evaluate 1回ごとに加える往復遅延（ミリ秒）')
+    args = parser.parse_args()
+
+    with FixtureSite(items=args.items, delay=0.05, bootstrap_delay=0.1) as site:
+        timings, calls = asyncio.run(_bench(site.search_url(), args.rounds, args.rtt_ms / 1000))
+
+    print(f"\n{'scenario':<16} {'mode':<10} {'round trips':>12} {'median (ms)':>12} {'p90 (ms)':>10}")
+    for scenario, _, _ in SCENARIOS:
+        for mode in ('separate', 'probe'):
+            values = sorted(timings[(scenario, mode)])
+            p90 = values[min(len(values) - 1, int(len(values) * 0.9))]
+            print(f"{scenario:<16} {mode:<10} {calls[(scenario, mode)]:>12} "
+                  f"{statistics.median(values) * 1000:>12.2f} {p90 * 1000:>10.2f}")
+        speedup = statistics.median(timings[(scenario, 'separate')]) / statistics.median(timings[(scenario, 'probe')])
+        print(f"{scenario}: probe {speedup:.1f}x 高速, 往復 {calls[(scenario, 'separate')]} → {calls[(scenario, 'probe')]} 回")
+
+if __name__ == '__main__':
+    main()
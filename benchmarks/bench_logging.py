@@ -0,0 +1,54 @@
+"""
+ロガーのオーバーヘッド比較（同期print+flush vs キュー経由の非同期出力）
+
+スクレイピング中のログ呼び出しで呼び出し側がどれだけ待たされるかを計測する:
+    python benchmarks/bench_logging.py > /dev/null
+    python benchmarks/bench_logging.py --messages 20000 > log.txt
+結果は標準エラー出力に表示される。
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.utils import create_logger
+
+
+class _SyncLogger:
+    """以前のLogger（無制限のリストに追加し、毎回print+flush）"""
+
+    def __init__(self):
+        self.results = []
+
+    def log(self, message):
+        self.results.append(message)
+        print(message)
+        sys.stdout.flush()
+
+
+def _measure(logger, messages):
+    start = time.perf_counter()
+    for i in range(messages):
+        logger.log(f"      [scroll] {i} → {i + 48}個 (0.42s, 次回待機上限 2.1s)")
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ロガーの呼び出しオーバーヘッド比較")
+    parser.add_argument('--messages', type=int, default=10000)
+    args = parser.parse_args()
+
+    sync_time = _measure(_SyncLogger(), args.messages)
+    queued_logger = create_logger()
+    queued_time = _measure(queued_logger, args.messages)
+    # 出力スレッドが書き終えるまでの時間は呼び出し側の待ち時間に含まれない
+    print(f"{'logger':<10} {'caller time (s)':>16} {'per message (µs)':>17}", file=sys.stderr)
+    for label, elapsed in (('sync', sync_time), ('queued', queued_time)):
+        print(f"{label:<10} {elapsed:>16.4f} {elapsed / args.messages * 1e6:>17.1f}", file=sys.stderr)
+    print(f"speedup: {sync_time / queued_time:.1f}x, buffered: {len(queued_logger.get_results())} lines", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,214 @@
+"""
+オフラインE2Eベンチマーク（ローカルのHermes風フィクスチャに対して実際のスクレイパーを実行）
+
+hermes.com に接続せず、fixture_site.py のページをヘッドレスChromiumで読み込み、
+ScrapePipeline（HermesScraper + HermesParser）を通しで実行する。フェーズ別の所要時間、
+取得率（抽出商品数 / 総商品数）、Python側とChromium側のCPU時間・RSSを表示する:
+    python benchmarks/bench_offline_scrape.py --items 480 --delay 0.4 --rounds 3
+    python benchmarks/bench_offline_scrape.py --modes html capture_api parallel_pages --profile aggressive
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+import psutil
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixture_site import FixtureSite
+from modules.browser_pool import launch_browser, stop_browser
+from modules.metrics import MetricsRegistry, RunTimer
+from modules.pipeline import ScrapePipeline
+from modules.resource_blocker import PROFILES
+from modules.workspace import RunWorkspace
+
+
+# 計測モード → ScrapePipelineの引数
+MODES = {
+    'html': {},
+    'capture_api': {'capture_api': True},
+    'incremental': {'harvest': True},
+    'parallel_pages': {'parallel_pages': True},
+}
+
+
+class _QuietLogger:
+    """計測中のログ出力を抑制"""
+
+    def __init__(self):
+        self.results = []
+
+    def log(self, message, level=None):
+        self.results.append(message)
+
+    def log_sampled(self, key, message, every=50):
+        pass
+
+    def flush_samples(self):
+        pass
+
+    def get_results(self):
+        return self.results
+
+
+class _ProcessSampler:
+    """このプロセスと子プロセス（Chromium）のCPU時間・RSSを定期的に計測"""
+
+    def __init__(self, interval=0.1):
+        self.interval = interval
+        self.peak_rss = {'python': 0, 'browser': 0}
+        self._stop = threading.Event()
+        self._thread = None
+        self._cpu_start = None
+        self.cpu = {}
+
+    def _snapshot(self):
+        me = psutil.Process()
+        rss = {'python': me.memory_info().rss, 'browser': 0}
+        cpu = {'python': sum(me.cpu_times()[:2]), 'browser': 0.0}
+        for child in me.children(recursive=True):
+            try:
+                rss['browser'] += child.memory_info().rss
+                cpu['browser'] += sum(child.cpu_times()[:2])
+            except psutil.Error:
+                pass
+        return rss, cpu
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            rss, _ = self._snapshot()
+            for key, value in rss.items():
+                self.peak_rss[key] = max(self.peak_rss[key], value)
+
+    def __enter__(self):
+        _, self._cpu_start = self._snapshot()
+        self._thread = threading.Thread(target=self._run, name='process-sampler', daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        rss, cpu_end = self._snapshot()
+        for key, value in rss.items():
+            self.peak_rss[key] = max(self.peak_rss[key], value)
+        self.cpu = {key: cpu_end[key] - self._cpu_start[key] for key in cpu_end}
+
+
+def _silence(pipeline):
+    logger = _QuietLogger()
+    scraper = pipeline.scraper
+    for owner in (scraper, scraper.agent, scraper.resource_blocker, scraper.api_capture, pipeline.parser):
+        owner.logger = logger
+
+
+async def _run_once(browser, site, mode, profile, runs_root):
+    # 計測はこの実行専用のレジストリに記録（アプリのメトリクスに混ぜない）
+    pipeline = ScrapePipeline(
+        browser=browser,
+        save_html=False,
+        resource_profile=profile,
+        workspace=RunWorkspace(root=runs_root),
+        timer=RunTimer(MetricsRegistry()),
+        **MODES[mode]
+    )
+    _silence(pipeline)
+    start = time.perf_counter()
+    with _ProcessSampler() as sampler:
+        success = await pipeline.run(url=site.search_url())
+    wall_time = time.perf_counter() - start
+
+    stats = pipeline.get_stats()
+    total = len(site.products)
+    return {
+        'success': success,
+        'wall_time': wall_time,
+        'phases': {phase: t['seconds'] for phase, t in stats['timings']['phases'].items()},
+        'completeness': stats.get('unique_products', 0) / total if total else 0.0,
+        'cpu_python': sampler.cpu['python'],
+        'cpu_browser': sampler.cpu['browser'],
+        'rss_python': sampler.peak_rss['python'],
+        'rss_browser': sampler.peak_rss['browser'],
+        'evaluate_calls': stats.get('evaluate_calls', 0),
+    }
+
+
+async def _bench(site, modes, profile, rounds, runs_root):
+    browser = await launch_browser()
+    results = {mode: [] for mode in modes}
+    try:
+        for round_index in range(rounds):
+            # モードを交互に実行してマシン負荷の偏りを抑える
+            for mode in modes:
+                run = await _run_once(browser, site, mode, profile, runs_root)
+                results[mode].append(run)
+                print(
+                    f"  round {round_index + 1} {mode:<15} wall={run['wall_time']:.2f}s "
+                    f"completeness={run['completeness'] * 100:.1f}% success={run['success']}",
+                    file=sys.stderr
+                )
+    finally:
+        await stop_browser(browser)
+    return results
+
+
+def _median(values):
+    values = [v for v in values if v is not None]
+    return statistics.median(values) if values else float('nan')
+
+
+def _report(results):
+    print(f"\n{'mode':<15} {'wall (s)':>9} {'complete':>9} {'cpu py (s)':>11} {'cpu chrome (s)':>15} "
+          f"{'rss py (MB)':>12} {'rss chrome (MB)':>16} {'evaluates':>10}")
+    for mode, runs in results.items():
+        print(
+            f"{mode:<15} {_median(r['wall_time'] for r in runs):>9.2f} "
+            f"{_median(r['completeness'] for r in runs) * 100:>8.1f}% "
+            f"{_median(r['cpu_python'] for r in runs):>11.2f} {_median(r['cpu_browser'] for r in runs):>15.2f} "
+            f"{_median(r['rss_python'] for r in runs) / 1024 / 1024:>12.1f} "
+            f"{_median(r['rss_browser'] for r in runs) / 1024 / 1024:>16.1f} "
+            f"{_median(r['evaluate_calls'] for r in runs):>10.0f}"
+        )
+
+    for mode, runs in results.items():
+        phases = []
+        for run in runs:
+            phases.extend(p for p in run['phases'] if p not in phases)
+        print(f"\n[{mode}] フェーズ別所要時間（中央値）")
+        for phase in phases:
+            print(f"  {phase:<22} {_median(run['phases'].get(phase) for run in runs):>8.3f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ローカルのフィクスチャサイトでスクレイパーを通しで計測")
+    parser.add_argument('--items', type=int, default=480, help='フィクスチャの総商品数')
+    parser.add_argument('--delay', type=float, default=0.4, help='Load More（検索API）の応答遅延（秒）')
+    parser.add_argument('--jitter', type=float, default=0.25, help='応答遅延の揺らぎ（割合）')
+    parser.add_argument('--bootstrap-delay', type=float, default=0.5, help='初期描画までの遅延（秒）')
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--modes', nargs='+', default=['html'], choices=list(MODES))
+    parser.add_argument('--profile', default='default', choices=list(PROFILES))
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    runs_root = tempfile.mkdtemp(prefix='hermes_bench_runs_')
+    site = FixtureSite(items=args.items, delay=args.delay, jitter=args.jitter,
+                       bootstrap_delay=args.bootstrap_delay, seed=args.seed)
+    try:
+        with site:
+            print(f"fixture: {site.search_url()} ({args.items} items, delay {args.delay}s)", file=sys.stderr)
+            results = asyncio.run(_bench(site, args.modes, args.profile, args.rounds, runs_root))
+        _report(results)
+        print(f"\nfixture requests: {site.requests}")
+    finally:
+        shutil.rmtree(runs_root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
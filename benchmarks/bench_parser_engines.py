@@ -0,0 +1,68 @@
+"""
+HermesParser 解析エンジン比較（lxml vs BeautifulSoup）
+
+一致確認（parity）とスループット計測を行う:
+    python benchmarks/bench_parser_engines.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.parser import HermesParser
+from benchmarks.synthetic_pages import generate_search_page
+
+
+SIZES = [48, 480, 2400, 10000]
+
+
+class _QuietLogger:
+    """計測中のログ出力を抑制"""
+
+    def log(self, message):
+        pass
+
+    def log_sampled(self, key, message, every=50):
+        pass
+
+    def flush_samples(self):
+        pass
+
+    def get_results(self):
+        return []
+
+
+def _extract(html_content, engine):
+    parser = HermesParser()
+    parser.logger = _QuietLogger()
+    start = time.perf_counter()
+    products = parser.extract_products(html_content, engine=engine)
+    return products, time.perf_counter() - start
+
+
+def main():
+    print(f"{'items':>7} {'bytes':>11} {'bs4 (s)':>9} {'lxml (s)':>9} {'bs4 items/s':>12} {'lxml items/s':>13} {'speedup':>8}")
+    for n_items in SIZES:
+        html_content = generate_search_page(n_items, seed=n_items)
+        bs4_products, bs4_time = _extract(html_content, 'bs4')
+        lxml_products, lxml_time = _extract(html_content, 'lxml')
+
+        # 一致確認: 両エンジンの出力は完全に同一でなければならない
+        if bs4_products != lxml_products:
+            for a, b in zip(bs4_products, lxml_products):
+                if a != b:
+                    print(f"❌ 出力不一致:\n  bs4:  {a}\n  lxml: {b}")
+                    break
+            sys.exit(1)
+        assert len(lxml_products) == n_items
+
+        print(
+            f"{n_items:>7} {len(html_content):>11,} {bs4_time:>9.3f} {lxml_time:>9.3f} "
+            f"{n_items / bs4_time:>12,.0f} {n_items / lxml_time:>13,.0f} {bs4_time / lxml_time:>7.1f}x"
+        )
+    print("✅ 全サイズで両エンジンの出力が一致")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,251 @@
+"""
+HermesParser ベンチマークスイート（合成コーパスに対する parse_html_file の計測と回帰判定）
+
+商品数（48〜10,000件以上）と項目構成（価格・カラー・SKUの有無、抽出規則のバリエーション、
+商品以外のマークアップ）を組み合わせた合成ページをファイルに書き出し、ケースごとに新しい
+プロセスで parse_html_file を実行して、スループット（items/s）・ピークメモリ・JSON書き込み時間を計測する。
+保存済みのベースラインより悪化したケースがあれば終了コード1で失敗する:
+    python benchmarks/bench_parser_suite.py
+    python benchmarks/bench_parser_suite.py --sizes 48 480 2400 10000 20000 --repeats 5
+    python benchmarks/bench_parser_suite.py --update-baseline   # 現在の結果をベースラインとして保存
+ベースラインはマシン依存のため、計測環境を変えた場合は --update-baseline で取り直す。
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_pages import FIELDS, write_search_page
+
+
+SIZES = [48, 480, 2400, 10000]
+
+# コーパスの構成 → write_search_page の引数
+PROFILES = {
+    'full': {'fields': FIELDS, 'variants': True, 'noise': True},
+    'uniform': {'fields': FIELDS, 'variants': False, 'noise': True},
+    'bare': {'fields': (), 'variants': True, 'noise': True},
+    'clean': {'fields': FIELDS, 'variants': True, 'noise': False},
+}
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines', 'parser_suite.json')
+
+# 小さいケースの揺らぎで失敗しないよう、悪化量が絶対値でもこれを超えた場合のみ回帰とする
+MIN_MEMORY_REGRESSION_MB = 2.0
+MIN_WRITE_REGRESSION_S = 0.005
+
+
+class _QuietLogger:
+    """計測中のログ出力を抑制"""
+
+    def log(self, message, level=None):
+        pass
+
+    def log_sampled(self, key, message, every=50):
+        pass
+
+    def flush_samples(self):
+        pass
+
+    def get_results(self):
+        return []
+
+
+def _read_status_kb(field):
+    with open('/proc/self/status', 'r') as f:
+        for line in f:
+            if line.startswith(field + ':'):
+                return int(line.split()[1])
+    return None
+
+
+def _reset_peak_rss():
+    """ピークRSSの計測を開始し、開始時のRSS（バイト）を返す
+
+    Linuxでは VmHWM（ピークRSS）をリセットして現在のRSSを基準にする。リセットできない環境では
+    ru_maxrss を基準にするため、インポート時のピークを超えない増加は0として計測される。
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return _read_status_kb('VmRSS') * 1024
+    except (OSError, TypeError):
+        return _max_rss_bytes()
+
+
+def _peak_rss_bytes():
+    try:
+        return _read_status_kb('VmHWM') * 1024
+    except (OSError, TypeError):
+        return _max_rss_bytes()
+
+
+def _max_rss_bytes():
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linuxはキロバイト、macOSはバイト単位
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+def _measure_case(html_path, json_path, engine, repeats, min_time=0.5, max_repeats=200):
+    """1ケースを計測（新しいプロセスで実行され、ピークメモリは最初の1回で測る）
+
+    小さいケースは1回が数ミリ秒で揺らぎが大きいため、合計 min_time 秒に達するまで繰り返す。
+    """
+    from modules.metrics import MetricsRegistry, RunTimer
+    from modules.parser import HermesParser
+
+    peak_bytes = None
+    runs = []
+    elapsed = 0.0
+    while len(runs) < repeats or (elapsed < min_time and len(runs) < max_repeats):
+        parser = HermesParser(output_file=json_path, timer=RunTimer(MetricsRegistry()))
+        parser.logger = _QuietLogger()
+        if peak_bytes is None:
+            rss_before = _reset_peak_rss()
+        start = time.perf_counter()
+        if not parser.parse_html_file(html_path, engine=engine):
+            raise RuntimeError(f"parse_html_file failed: {html_path}")
+        total = time.perf_counter() - start
+        elapsed += total
+        if peak_bytes is None:
+            peak_bytes = _peak_rss_bytes() - rss_before
+        runs.append({
+            'total': total,
+            'parse': parser.timer.phases['parse'][0],
+            'write_json': parser.timer.phases['write_json'][0],
+            'items': len(parser.get_products()),
+        })
+    return runs, peak_bytes
+
+
+def run_suite(sizes, profiles, engine='lxml', repeats=3):
+    """全ケースを計測し、{ケース名: 結果} を返す"""
+    context = multiprocessing.get_context('spawn')
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='hermes_parser_suite_') as corpus_dir:
+        for profile in profiles:
+            for n_items in sizes:
+                case = f"{profile}-{n_items}"
+                html_path = os.path.join(corpus_dir, f"{case}.html")
+                json_path = os.path.join(corpus_dir, f"{case}.json")
+                html_bytes = write_search_page(html_path, n_items, seed=n_items, **PROFILES[profile])
+
+                # ケースごとに新しいプロセスで実行し、前のケースのメモリ使用量の影響を受けないようにする
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                    runs, peak_bytes = executor.submit(_measure_case, html_path, json_path, engine, repeats).result()
+
+                items = runs[0]['items']
+                if items != n_items:
+                    raise RuntimeError(f"{case}: {items}件抽出（期待値 {n_items}件）")
+                # 時間は最小値（外乱の影響を最も受けていない回）を採用
+                total = min(run['total'] for run in runs)
+                results[case] = {
+                    'items': items,
+                    'html_bytes': html_bytes,
+                    'json_bytes': os.path.getsize(json_path),
+                    'items_per_sec': items / total,
+                    'parse_s': min(run['parse'] for run in runs),
+                    'write_json_s': min(run['write_json'] for run in runs),
+                    'peak_mb': peak_bytes / 1024 / 1024,
+                }
+                print(f"  {case:<14} {results[case]['items_per_sec']:>10,.0f} items/s", file=sys.stderr)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """ベースラインと比較し、回帰したケースの説明のリストを返す"""
+    regressions = []
+    for case, current in results.items():
+        base = baseline.get(case)
+        if base is None:
+            continue
+        if current['items_per_sec'] < base['items_per_sec'] * (1 - tolerance):
+            regressions.append(
+                f"{case}: スループット {base['items_per_sec']:,.0f} → {current['items_per_sec']:,.0f} items/s"
+            )
+        memory_growth = current['peak_mb'] - base['peak_mb']
+        if memory_growth > max(base['peak_mb'] * tolerance, MIN_MEMORY_REGRESSION_MB):
+            regressions.append(f"{case}: ピークメモリ {base['peak_mb']:.1f} → {current['peak_mb']:.1f} MB")
+        write_growth = current['write_json_s'] - base['write_json_s']
+        if write_growth > max(base['write_json_s'] * tolerance, MIN_WRITE_REGRESSION_S):
+            regressions.append(
+                f"{case}: JSON書き込み {base['write_json_s'] * 1000:.1f} → {current['write_json_s'] * 1000:.1f} ms"
+            )
+    return regressions
+
+
+def _report(results, baseline):
+    print(f"{'case':<14} {'items':>6} {'html (KB)':>10} {'items/s':>10} {'vs base':>8} {'parse (ms)':>11} "
+          f"{'json (ms)':>10} {'peak (MB)':>10}")
+    for case, r in results.items():
+        base = baseline.get(case)
+        ratio = f"{r['items_per_sec'] / base['items_per_sec']:.2f}x" if base else '-'
+        print(
+            f"{case:<14} {r['items']:>6} {r['html_bytes'] / 1024:>10.0f} {r['items_per_sec']:>10,.0f} {ratio:>8} "
+            f"{r['parse_s'] * 1000:>11.1f} {r['write_json_s'] * 1000:>10.1f} {r['peak_mb']:>10.1f}"
+        )
+
+
+def _load_baseline(path, engine):
+    """保存済みベースラインのケース別結果（ファイルがない・エンジンが異なる場合は空）"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return data.get('cases', {}) if data.get('engine') == engine else {}
+
+
+def _save_baseline(path, results, engine):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'engine': engine,
+            'python': sys.version.split()[0],
+            'cases': {case: {key: round(value, 4) if isinstance(value, float) else value
+                             for key, value in r.items()}
+                      for case, r in results.items()},
+        }, f, ensure_ascii=False, indent=2)
+        f.write('\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="合成コーパスによるHermesParserのベンチマークと回帰判定")
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--profiles', nargs='+', default=list(PROFILES), choices=list(PROFILES))
+    parser.add_argument('--engine', default='lxml', choices=['lxml', 'bs4'])
+    parser.add_argument('--repeats', type=int, default=3, help='最低実行回数（小さいケースは0.5秒分まで繰り返す）')
+    parser.add_argument('--tolerance', type=float, default=0.3, help='許容する悪化の割合（既定: 30%%）')
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--update-baseline', action='store_true', help='結果をベースラインとして保存')
+    args = parser.parse_args()
+
+    results = run_suite(args.sizes, args.profiles, engine=args.engine, repeats=args.repeats)
+    baseline = _load_baseline(args.baseline, args.engine)
+    _report(results, baseline)
+
+    if args.update_baseline:
+        _save_baseline(args.baseline, results, args.engine)
+        print(f"\n💾 ベースラインを保存: {args.baseline}")
+        return
+
+    if not baseline:
+        print(f"\n⚠️ ベースラインがありません（--update-baseline で作成）: {args.baseline}")
+        return
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n❌ ベースラインから{args.tolerance * 100:.0f}%以上の悪化:")
+        for message in regressions:
+            print(f"  - {message}")
+        sys.exit(1)
+    print(f"\n✅ 回帰なし（許容範囲 {args.tolerance * 100:.0f}%）")
+
+
+if __name__ == '__main__':
+    main()
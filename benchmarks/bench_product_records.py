@@ -0,0 +1,87 @@
+"""
+商品表現のメモリ・変換速度の比較（解析結果の辞書 vs ProductRecord）
+
+履歴の読み込みと同じく、NDJSON（1行1商品）から N 件を読み込んで保持した場合の
+保持メモリ（tracemalloc）と、辞書/JSONとの相互変換のスループットを計測する:
+    python benchmarks/bench_product_records.py
+    python benchmarks/bench_product_records.py --items 100000 --repeats 3
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_pages import generate_products
+from modules.parser import HermesParser
+from modules.records import ProductRecord, _parse_price_cached
+
+
+def _ndjson_lines(n_items, seed=0):
+    """解析結果と同じ形式の商品（価格・カラーは重複あり、一部の項目は 'N/A'）をNDJSONの行で返す"""
+    products = HermesParser.products_from_api_payloads([{'data': generate_products(n_items, seed=seed)}])
+    for i, product in enumerate(products):
+        if i % 7 == 0:
+            product['sku'] = 'N/A'
+        if i % 11 == 0:
+            product['price'] = 'N/A'
+    return [json.dumps(product, ensure_ascii=False) for product in products]
+
+
+def _retained_bytes(build):
+    """build() の戻り値を保持したまま解放されずに残るメモリ量"""
+    gc.collect()
+    _parse_price_cached.cache_clear()
+    tracemalloc.start()
+    value = build()
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return value, current, peak
+
+
+def _best_time(func, repeats):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="辞書とProductRecordのメモリ・変換速度を比較")
+    parser.add_argument('--items', type=int, default=100000)
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    lines = _ndjson_lines(args.items)
+    dicts, dict_bytes, dict_peak = _retained_bytes(lambda: [json.loads(line) for line in lines])
+    records, record_bytes, record_peak = _retained_bytes(lambda: [ProductRecord.from_json(line) for line in lines])
+    assert [record.to_dict() for record in records] == dicts
+
+    n = len(lines)
+    print(f"{n:,} products")
+    print(f"{'representation':<16} {'retained (MB)':>14} {'bytes/item':>11} {'peak (MB)':>10}")
+    for name, retained, peak in (('dict', dict_bytes, dict_peak), ('ProductRecord', record_bytes, record_peak)):
+        print(f"{name:<16} {retained / 1024 / 1024:>14.1f} {retained / n:>11.0f} {peak / 1024 / 1024:>10.1f}")
+    print(f"→ ProductRecord は辞書の {record_bytes / dict_bytes * 100:.0f}% のメモリ")
+
+    print(f"\n{'conversion':<26} {'items/s':>12}")
+    conversions = (
+        ('dict → record', lambda: [ProductRecord.from_dict(d) for d in dicts]),
+        ('record → dict', lambda: [r.to_dict() for r in records]),
+        ('json line → record', lambda: [ProductRecord.from_json(line) for line in lines]),
+        ('record → json line', lambda: [r.to_json() for r in records]),
+        ('json line → dict (参考)', lambda: [json.loads(line) for line in lines]),
+    )
+    for name, func in conversions:
+        print(f"{name:<26} {n / _best_time(func, args.repeats):>12,.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""
+リソースブロックの効果計測（ブロックなし vs プロファイル別）
+
+実ブラウザ（nodriver + Chromium）でページを読み込み、初期表示までの時間・全体時間・
+実転送バイト数を比較する。プロファイルは交互に実行して回線状況の偏りを抑える:
+    python benchmarks/bench_resource_blocking.py --keyword バッグ --rounds 3
+    python benchmarks/bench_resource_blocking.py --url http://localhost:8000/search.html --profiles off default aggressive
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.browser_pool import launch_browser, stop_browser
+from modules.resource_blocker import PROFILES
+from modules.scraper import HermesScraper
+
+
+class _QuietLogger:
+    """計測中のログ出力を抑制"""
+
+    def __init__(self):
+        self.results = []
+
+    def log(self, message):
+        self.results.append(message)
+
+    def get_results(self):
+        return self.results
+
+
+async def _run_once(browser, profile, keyword, url):
+    scraper = HermesScraper(browser=browser, save_html=False, resource_profile=profile)
+    scraper.logger = _QuietLogger()
+    scraper.agent.logger = scraper.logger
+    scraper.resource_blocker.logger = scraper.logger
+    scraper.api_capture.logger = scraper.logger
+    start = time.perf_counter()
+    success = await scraper.scrape_hermes_site(url=url, search_keyword=keyword)
+    total_time = time.perf_counter() - start
+    stats = scraper.resource_blocker.get_stats()
+    return {
+        'success': success,
+        'page_load_time': scraper.page_load_time,
+        'total_time': total_time,
+        'transferred_bytes': stats['transferred_bytes'],
+        'requests': stats['requests'],
+        'blocked': stats['blocked'],
+        'items': scraper.total_items,
+    }
+
+
+async def _bench(profiles, rounds, keyword, url):
+    browser = await launch_browser()
+    results = {profile: [] for profile in profiles}
+    try:
+        for round_index in range(rounds):
+            for profile in profiles:
+                run = await _run_once(browser, profile, keyword, url)
+                results[profile].append(run)
+                load = f"{run['page_load_time']:.2f}s" if run['page_load_time'] is not None else "N/A"
+                print(f"  round {round_index + 1} {profile:<10} load={load} total={run['total_time']:.2f}s "
+                      f"transfer={run['transferred_bytes']/1024/1024:.2f}MB blocked={run['blocked']} success={run['success']}")
+    finally:
+        await stop_browser(browser)
+    return results
+
+
+def _median(runs, key):
+    values = [run[key] for run in runs if run[key] is not None]
+    return statistics.median(values) if values else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="リソースブロックの読み込み時間・転送量比較")
+    parser.add_argument('--keyword', default='バッグ')
+    parser.add_argument('--url', default=None, help='検索URLの代わりに読み込むURL（オフライン計測用）')
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--profiles', nargs='+', default=['off', 'default'], choices=list(PROFILES))
+    args = parser.parse_args()
+
+    results = asyncio.run(_bench(args.profiles, args.rounds, args.keyword, args.url))
+
+    baseline = results.get('off')
+    print(f"\n{'profile':<10} {'load (s)':>9} {'total (s)':>10} {'transfer (MB)':>14} {'requests':>9} {'blocked':>8} {'items':>6}")
+    for profile, runs in results.items():
+        load = _median(runs, 'page_load_time')
+        transfer = _median(runs, 'transferred_bytes')
+        print(
+            f"{profile:<10} {load if load is not None else float('nan'):>9.2f} {_median(runs, 'total_time'):>10.2f} "
+            f"{transfer/1024/1024:>14.2f} {_median(runs, 'requests'):>9.0f} {_median(runs, 'blocked'):>8.0f} "
+            f"{_median(runs, 'items'):>6.0f}"
+        )
+    if baseline:
+        base_load = _median(baseline, 'page_load_time')
+        base_transfer = _median(baseline, 'transferred_bytes')
+        for profile, runs in results.items():
+            if profile == 'off':
+                continue
+            load = _median(runs, 'page_load_time')
+            transfer = _median(runs, 'transferred_bytes')
+            if base_load and load:
+                print(f"{profile}: 初期表示 {base_load/load:.2f}x 高速, 転送量 {(base_transfer - transfer)/1024/1024:.2f}MB 削減")
+
+
+if __name__ == '__main__':
+    main()
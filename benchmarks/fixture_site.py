@@ -0,0 +1,252 @@
+"""
+オフライン計測用のHermes風検索ページ（ローカルHTTPサーバー）
+
+スクレイパーが依存する要素だけを再現する:
+- JSで描画される h-grid-result-item（検索APIのJSONから描画、/api/search は APIキャプチャ・並列取得の対象）
+- 総商品数のラベル（h-total-result 内の「N アイテム」）
+- button[data-testid="Load more items"]（クリックで48件追加、APIの応答遅延は設定可能）
+- 画像の遅延読み込み（IntersectionObserverで表示範囲に入った画像だけ取得）
+
+単体で起動して手動確認や他のベンチマークの --url に使える:
+    python benchmarks/fixture_site.py --items 480 --delay 0.4 --port 8765
+    → http://127.0.0.1:8765/jp/ja/search/?s=バッグ
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_pages import generate_products
+
+
+PAGE_SIZE = 48
+
+# Angularアプリ相当の描画スクリプト（初期化遅延 → 1ページ目取得 → Load Moreで追記）
+_APP_SCRIPT = '''
+(() => {
+    const config = %(config)s;
+    const grid = document.querySelector('.product-grid-list');
+    const total = document.querySelector('h-total-result');
+    const button = document.querySelector('button[data-testid="Load more items"]');
+    let offset = 0;
+    let loading = false;
+
+    const lazy = new IntersectionObserver((entries) => {
+        for (const entry of entries) {
+            if (!entry.isIntersecting) continue;
+            entry.target.src = entry.target.dataset.src;
+            lazy.unobserve(entry.target);
+        }
+    }, {rootMargin: '200px'});
+
+    function escape(text) {
+        const div = document.createElement('div');
+        div.textContent = text;
+        return div.innerHTML;
+    }
+
+    function render(product) {
+        const item = document.createElement('h-grid-result-item');
+        item.className = 'grid-item';
+        const colors = product.colors.map(c => `<li class="color" data-color="${escape(c.name)}"></li>`).join('');
+        item.innerHTML =
+            `<div class="product-item"><a href="${product.url}" class="product-item-link">` +
+            `<div class="product-item-image"><img data-src="/img/${product.sku}.svg" alt="" width="240" height="240"></div>` +
+            `<div class="product-item-meta"><h3 class="product-item-name">${escape(product.title)}</h3>` +
+            `<span class="price notranslate">¥${product.price.value.toLocaleString('ja-JP')}</span></div></a>` +
+            `<ul class="colors">${colors}</ul><div data-sku="${product.sku}"></div></div>`;
+        lazy.observe(item.querySelector('img'));
+        return item;
+    }
+
+    async function loadPage() {
+        if (loading) return;
+        loading = true;
+        button.disabled = true;
+        try {
+            const query = new URLSearchParams(location.search);
+            const url = `/api/search?s=${encodeURIComponent(query.get('s') || '')}&offset=${offset}&pagesize=${config.pageSize}`;
+            const res = await fetch(url, {headers: {'Accept': 'application/json'}});
+            const data = await res.json();
+            const fragment = document.createDocumentFragment();
+            for (const product of data.products) fragment.appendChild(render(product));
+            grid.appendChild(fragment);
+            offset += data.products.length;
+            total.innerHTML = `<span>${data.total} アイテム</span>`;
+            button.style.display = offset < data.total ? '' : 'none';
+        } finally {
+            loading = false;
+            button.disabled = false;
+        }
+    }
+
+    button.addEventListener('click', loadPage);
+    setTimeout(loadPage, config.bootstrapDelay * 1000);
+})();
+'''
+
+_PAGE_TEMPLATE = '''<!DOCTYPE html>
+<html lang="ja"><head><meta charset="utf-8"><title>検索結果 | Hermès (fixture)</title>
+<style>
+body{margin:0;font-family:sans-serif}
+.product-grid-list{display:grid;grid-template-columns:repeat(4,1fr);gap:16px;padding:16px}
+.product-item-image{height:240px;background:#eee}
+button[data-testid="Load more items"]{display:block;margin:24px auto;padding:12px 32px}
+</style></head>
+<body>
+<header><nav>%(menu)s</nav></header>
+<main>
+<h-total-result></h-total-result>
+<h-grid-results><div class="product-grid-list"></div></h-grid-results>
+<button data-testid="Load more items" style="display:none">アイテムをもっと見る</button>
+</main>
+<script>%(script)s</script>
+</body></html>
+'''
+
+_IMAGE_SVG = (
+    '<svg xmlns="http://www.w3.org/2000/svg" width="240" height="240">'
+    '<rect width="240" height="240" fill="#f37021"/><text x="20" y="130" font-size="24">%s</text></svg>'
+)
+
+
+class FixtureSite:
+    """Hermes風の検索ページと検索APIを提供するローカルサーバー
+
+    delay は検索APIの応答遅延（秒）、jitter はその揺らぎの割合、bootstrap_delay はページ表示から
+    1ページ目の取得を始めるまでの時間（フレームワークの初期化に相当）。
+    """
+
+    def __init__(self, items=480, delay=0.4, jitter=0.25, bootstrap_delay=0.5, seed=0,
+                 host='127.0.0.1', port=0):
+        self.products = generate_products(items, seed=seed)
+        self.delay = delay
+        self.jitter = jitter
+        self.bootstrap_delay = bootstrap_delay
+        self.requests = {'page': 0, 'api': 0, 'image': 0}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def search_url(self, keyword='バッグ', locale='jp/ja'):
+        return f"{self.base_url}/{locale.strip('/')}/search/?s={urllib.parse.quote(keyword)}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name='fixture-site', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def serve_forever(self):
+        """現在のスレッドで待ち受け（単体起動用）"""
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def _count(self, kind):
+        with self._lock:
+            self.requests[kind] += 1
+
+    def _api_delay(self):
+        with self._lock:
+            factor = 1 + self._rng.uniform(-self.jitter, self.jitter)
+        return max(0.0, self.delay * factor)
+
+    def render_page(self):
+        menu = ''.join(f'<a href="/jp/ja/category/{i}/">カテゴリ {i}</a> ' for i in range(60))
+        script = _APP_SCRIPT % {
+            'config': json.dumps({'pageSize': PAGE_SIZE, 'bootstrapDelay': self.bootstrap_delay})
+        }
+        return _PAGE_TEMPLATE % {'menu': menu, 'script': script}
+
+    def search(self, query):
+        params = urllib.parse.parse_qs(query)
+        offset = int((params.get('offset') or ['0'])[0])
+        page_size = int((params.get('pagesize') or [str(PAGE_SIZE)])[0])
+        return {
+            'total': len(self.products),
+            'offset': offset,
+            'products': self.products[offset:offset + page_size],
+        }
+
+    def _handler_class(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                parts = urllib.parse.urlsplit(self.path)
+                if parts.path.startswith('/api/search'):
+                    site._count('api')
+                    time.sleep(site._api_delay())
+                    self._send(200, 'application/json; charset=utf-8', json.dumps(site.search(parts.query)))
+                elif '/search' in parts.path:
+                    site._count('page')
+                    self._send(200, 'text/html; charset=utf-8', site.render_page())
+                elif parts.path.startswith('/img/'):
+                    site._count('image')
+                    sku = os.path.splitext(os.path.basename(parts.path))[0]
+                    self._send(200, 'image/svg+xml', _IMAGE_SVG % sku)
+                else:
+                    self._send(404, 'text/plain; charset=utf-8', 'not found')
+
+            def _send(self, status, content_type, body):
+                data = body.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(data)))
+                self.send_header('Cache-Control', 'no-store')
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="オフライン計測用のHermes風検索ページを起動")
+    parser.add_argument('--items', type=int, default=480)
+    parser.add_argument('--delay', type=float, default=0.4, help='検索APIの応答遅延（秒）')
+    parser.add_argument('--jitter', type=float, default=0.25)
+    parser.add_argument('--bootstrap-delay', type=float, default=0.5)
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    site = FixtureSite(items=args.items, delay=args.delay, jitter=args.jitter,
+                       bootstrap_delay=args.bootstrap_delay, port=args.port)
+    print(f"fixture site: {site.search_url()}")
+    try:
+        site.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""
+HermesParser検証用の合成検索ページ生成
+"""
+import random
+
+
+_NAMES = ['バーキン', 'ケリー', 'ピコタン', 'エブリン', 'リンディ', 'ガーデンパーティ', 'コンスタンス', 'ボリード']
+_MATERIALS = ['トゴ', 'エプソン', 'トリヨンクレマンス', 'スイフト', 'ヴォー・エプソン']
+_COLORS = ['ノワール', 'ゴールド', 'エトゥープ', 'ブルーニュイ', 'ローズサクラ', 'ヴェールシプレ', 'クレ']
+
+# 任意項目（fields で出力有無を指定）
+FIELDS = ('price', 'colors', 'sku')
+
+
+def _item_html(rng, idx, fields=FIELDS, variants=True):
+    """h-grid-result-item 1件分のマークアップ（抽出規則のバリエーションを含む）
+
+    variants=False の場合は各項目を最も一般的な1パターンだけで出力する。
+    fields に含まれない項目は出力しない（乱数の消費は変えないため、他の項目の値は同じになる）。
+    """
+    name = f"{rng.choice(_NAMES)} {rng.choice([25, 28, 30, 32, 35])} 《{rng.choice(_MATERIALS)}》"
+    href = f"/jp/ja/product/item-{idx}-H{100000 + idx}/"
+    price = f"¥{rng.randrange(100, 5000) * 1000:,}"
+
+    # 商品名: h3 / h2 / class指定の3パターン
+    name_variant = idx % 3 if variants else 0
+    if name_variant == 0:
+        name_html = f'<h3 class="product-item-name">{name}</h3>'
+    elif name_variant == 1:
+        name_html = f'<h2>{name}</h2>'
+    else:
+        name_html = f'<span class="product-title">{name}</span>'
+
+    # 価格: class="price" / "product-price" / "amount" / なし
+    price_variant = idx % 4 if variants else 0
+    if 'price' not in fields:
+        price_html = ''
+    elif price_variant == 0:
+        price_html = f'<span class="price notranslate">{price}</span>'
+    elif price_variant == 1:
+        price_html = f'<div class="product-price">{price}</div>'
+    elif price_variant == 2:
+        price_html = f'<p><span class="amount">{price}</span></p>'
+    else:
+        price_html = ''
+
+    # カラー: class="color" / data-color属性 / なし
+    colors = rng.sample(_COLORS, rng.randint(1, 3))
+    color_variant = idx % 3 if variants else 0
+    if 'colors' not in fields:
+        color_html = ''
+    elif color_variant == 0:
+        color_html = ''.join(f'<li class="color" data-color="{c}"></li>' for c in colors)
+    elif color_variant == 1:
+        color_html = ''.join(f'<span data-color="{c}">{c}</span>' for c in colors)
+    else:
+        color_html = ''
+
+    # SKU: data-sku属性 / class="sku" / なし
+    sku_variant = idx % 3 if variants else 0
+    if 'sku' not in fields:
+        sku_html = ''
+    elif sku_variant == 0:
+        sku_html = f'<div data-sku="H{100000 + idx}"></div>'
+    elif sku_variant == 1:
+        sku_html = f'<span class="sku">H{100000 + idx}</span>'
+    else:
+        sku_html = ''
+
+    return (
+        '<h-grid-result-item class="grid-item ng-star-inserted">'
+        f'<div class="product-item"><a href="{href}" class="product-item-link">'
+        '<div class="product-item-image"><img src="data:," alt="" loading="lazy"></div>'
+        f'<div class="product-item-meta">{name_html}{price_html}</div></a>'
+        f'<ul class="colors">{color_html}</ul>{sku_html}'
+        '<button class="wishlist" aria-label="お気に入り"><svg><path d="M0 0h24v24H0z"></path></svg></button>'
+        '</div></h-grid-result-item>'
+    )
+
+
+def generate_search_page(n_items, seed=0, noise=True, fields=FIELDS, variants=True):
+    """n_items件の商品を含むHermes風の検索結果ページを生成"""
+    rng = random.Random(seed)
+    items = ''.join(_item_html(rng, idx, fields, variants) for idx in range(n_items))
+
+    noise_html = ''
+    if noise:
+        # ヘッダー・フッター・スクリプトなど商品以外のマークアップ
+        noise_html = ''.join(
+            f'<div class="menu-entry"><a href="/jp/ja/category/{i}/">カテゴリ {i}</a>'
+            f'<span class="title">メニュー {i}</span></div>'
+            for i in range(200)
+        ) + '<script>window.__STATE__ = {"items": []};</script>' * 20
+
+    return (
+        '<!DOCTYPE html><html lang="ja"><head><meta charset="utf-8"><title>検索結果 | Hermès</title>'
+        '<style>.grid-item{display:block}</style></head><body>'
+        f'<header>{noise_html}</header>'
+        f'<main><h-total-result><span>{n_items} アイテム</span></h-total-result>'
+        f'<h-grid-results><div class="product-grid-list">{items}</div></h-grid-results>'
+        '<button data-testid="Load more items">アイテムをもっと見る</button></main>'
+        f'<footer>{noise_html}</footer></body></html>'
+    )
+
+
+def write_search_page(path, n_items, seed=0, noise=True, fields=FIELDS, variants=True):
+    """合成ページをファイルに書き出し、バイト数を返す（parse_html_file の計測用）"""
+    html_content = generate_search_page(n_items, seed=seed, noise=noise, fields=fields, variants=variants)
+    data = html_content.encode('utf-8')
+    with open(path, 'wb') as f:
+        f.write(data)
+    return len(data)
+
+
+def generate_products(n_items, seed=0):
+    """n_items件の商品を検索APIのJSON形式（sku / title / url / price / colors）で生成"""
+    rng = random.Random(seed)
+    products = []
+    for idx in range(n_items):
+        products.append({
+            'sku': f"H{100000 + idx}",
+            'title': f"{rng.choice(_NAMES)} {rng.choice([25, 28, 30, 32, 35])} 《{rng.choice(_MATERIALS)}》",
+            'url': f"/jp/ja/product/item-{idx}-H{100000 + idx}/",
+            'price': {'value': rng.randrange(100, 5000) * 1000, 'currency': 'JPY'},
+            'colors': [{'name': color} for color in rng.sample(_COLORS, rng.randint(1, 3))],
+        })
+    return products
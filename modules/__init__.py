@@ -4,16 +4,63 @@
 """
 
 from .utils import normalize_nodriver_result, create_logger
-from .phase_checker import check_environment
+from .phase_checker import (
+    check_environment,
+    check_environment_cached,
+    refresh_environment_cache,
+    get_environment_status
+)
 from .scraper import HermesScraper
 from .parser import HermesParser
 from .file_handler import FileHandler
+from .browser_pool import BrowserPool
+from .pipeline import ScrapePipeline
+from .batch import BatchScraper
+from .jobs import JobManager, QueueFullError
+from .result_cache import ResultCache
+from .resource_blocker import ResourceBlocker, PROFILES as RESOURCE_PROFILES
+from .artifact_store import ArtifactStore, get_artifact_store
+from .workspace import RunWorkspace, RUNS_ROOT
+from .metrics import RunTimer, MetricsRegistry, get_metrics
+from .delta import DeltaIndex
+from .records import ProductRecord, parse_price, to_records, to_dicts
+from .product_store import ProductStore, get_product_store
+from .reparse import BulkReparser, find_snapshots, load_summary as load_reparse_summary, reparse_command
 
 __all__ = [
     'normalize_nodriver_result',
     'create_logger',
     'check_environment',
+    'check_environment_cached',
+    'refresh_environment_cache',
+    'get_environment_status',
     'HermesScraper',
     'HermesParser',
-    'FileHandler'
+    'FileHandler',
+    'BrowserPool',
+    'ScrapePipeline',
+    'BatchScraper',
+    'JobManager',
+    'QueueFullError',
+    'ResultCache',
+    'ResourceBlocker',
+    'RESOURCE_PROFILES',
+    'ArtifactStore',
+    'get_artifact_store',
+    'RunWorkspace',
+    'RUNS_ROOT',
+    'RunTimer',
+    'MetricsRegistry',
+    'get_metrics',
+    'DeltaIndex',
+    'ProductRecord',
+    'parse_price',
+    'to_records',
+    'to_dicts',
+    'ProductStore',
+    'get_product_store',
+    'BulkReparser',
+    'find_snapshots',
+    'load_reparse_summary',
+    'reparse_command'
 ]
\ No newline at end of file
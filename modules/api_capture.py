@@ -0,0 +1,100 @@
+"""
+検索APIレスポンスのキャプチャ（CDP Networkドメイン）
+"""
+import asyncio
+import base64
+import json
+
+
+# 商品一覧を返すAPIのURLパターン（Angularアプリが発行するXHR/fetch）
+API_URL_PATTERNS = [
+    'bck2.hermes.com/products',
+    '/products?',
+    '/search?',
+    '/api/search',
+]
+
+
+class ApiCapture:
+    """検索/一覧APIのJSONレスポンスを記録するクラス"""
+
+    def __init__(self, logger=None, url_patterns=None):
+        self.logger = logger
+        self.url_patterns = url_patterns or API_URL_PATTERNS
+        self.payloads = []
+        self.active = False
+        self._tab = None
+        self._pending = {}
+        self._tasks = []
+
+    async def install(self, tab):
+        """Networkドメインを有効化してレスポンス監視を開始（ページ遷移前に呼ぶ）"""
+        import nodriver as nd
+
+        try:
+            await tab.send(nd.cdp.network.enable())
+            tab.add_handler(nd.cdp.network.ResponseReceived, self._on_response)
+            tab.add_handler(nd.cdp.network.LoadingFinished, self._on_finished)
+            self._tab = tab
+            self.active = True
+        except Exception as e:
+            self.active = False
+            self._log(f"    ⚠️ APIキャプチャ登録失敗（HTML解析で続行）: {e}")
+        return self.active
+
+    async def uninstall(self):
+        """レスポンス監視を終了"""
+        if self._tab is None:
+            return
+        import nodriver as nd
+
+        tab, self._tab = self._tab, None
+        try:
+            if hasattr(tab, 'remove_handlers'):
+                tab.remove_handlers(nd.cdp.network.ResponseReceived, self._on_response)
+                tab.remove_handlers(nd.cdp.network.LoadingFinished, self._on_finished)
+        except Exception:
+            pass
+        self.active = False
+
+    def _matches(self, url):
+        return any(pattern in url for pattern in self.url_patterns)
+
+    def _on_response(self, event, connection=None):
+        """レスポンスヘッダー受信時：対象APIのJSONレスポンスを記録対象にする"""
+        response = event.response
+        mime_type = (response.mime_type or '').lower()
+        if 'json' in mime_type and self._matches(response.url):
+            self._pending[event.request_id] = response.url
+
+    def _on_finished(self, event, connection=None):
+        """レスポンス受信完了時：本文の取得を非同期で開始"""
+        url = self._pending.pop(event.request_id, None)
+        if url is None or self._tab is None:
+            return
+        # ハンドラー内でCDPコマンドを待つとイベント受信が止まるため、別タスクで取得する
+        self._tasks.append(asyncio.ensure_future(self._fetch_body(event.request_id, url)))
+
+    async def _fetch_body(self, request_id, url):
+        """レスポンス本文を取得してJSONとして保存"""
+        import nodriver as nd
+
+        try:
+            body, is_base64 = await self._tab.send(nd.cdp.network.get_response_body(request_id))
+            if is_base64:
+                body = base64.b64decode(body).decode('utf-8')
+            self.payloads.append({'url': url, 'data': json.loads(body)})
+            self._log(f"    📡 APIレスポンス取得: {url[:100]} ({len(body):,} bytes)")
+        except Exception as e:
+            self._log(f"    ⚠️ APIレスポンス取得失敗: {url[:100]} - {e}")
+
+    async def drain(self, timeout=10):
+        """取得中のレスポンス本文を待ち合わせる"""
+        tasks, self._tasks = self._tasks, []
+        if tasks:
+            await asyncio.wait(tasks, timeout=timeout)
+        return self.payloads
+
+    def _log(self, message):
+        if self.logger:
+            self.logger.log(message)
@@ -0,0 +1,225 @@
+"""
+HTML成果物の圧縮・内容アドレス保存（同一内容の重複排除）
+"""
+import contextlib
+import fcntl
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+
+
+class ArtifactStore:
+    """HTMLなどのテキスト成果物をgzip圧縮し、内容のSHA-256をキーに保存するクラス
+
+    ファイル名（例: hermes_page_20250101_120000.html）はインデックスで内容ハッシュに対応付け、
+    実体は objects/<ハッシュ先頭2文字>/<ハッシュ>.gz に1つだけ保存する。同じ内容のHTMLを
+    何度保存しても実体は増えない。読み出し時は透過的に展開する。
+
+    インデックス（index.jsonl）は追加・削除を1行ずつ追記するログで、書き込みはファイルロック
+    （index.lock）でプロセス間でも直列化する。他のプロセスが追記した分は参照時に読み足し、
+    ログが有効なエントリ数に比べて長くなったら現在の内容だけに書き直す。
+    """
+
+    COMPACT_MIN_LINES = 1000
+
+    def __init__(self, root='artifacts', compresslevel=6):
+        self.root = root
+        self.compresslevel = compresslevel
+        self.objects_dir = os.path.join(root, 'objects')
+        self.exports_dir = os.path.join(root, 'exports')
+        self.index_file = os.path.join(root, 'index.jsonl')
+        self.lock_file = os.path.join(root, 'index.lock')
+        self._lock = threading.Lock()
+        self._index = {}
+        self._index_inode = None
+        self._index_offset = 0
+        self._index_lines = 0
+        self._stats = {'writes': 0, 'dedup_hits': 0}
+
+    # --- インデックス ---
+
+    def _load_index(self):
+        """ログの未読分を読み足して現在のインデックスを返す（書き直された場合は最初から読む）"""
+        try:
+            stat = os.stat(self.index_file)
+        except FileNotFoundError:
+            self._index, self._index_inode, self._index_offset, self._index_lines = {}, None, 0, 0
+            return self._index
+        if stat.st_ino != self._index_inode or stat.st_size < self._index_offset:
+            self._index, self._index_inode, self._index_offset, self._index_lines = {}, stat.st_ino, 0, 0
+        if stat.st_size > self._index_offset:
+            with open(self.index_file, 'rb') as f:
+                f.seek(self._index_offset)
+                data = f.read()
+            # 追記中の最後の行（改行なし）は次回に読む
+            complete = data[:data.rfind(b'\n') + 1]
+            for line in complete.splitlines():
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                self._apply(record)
+                self._index_lines += 1
+            self._index_offset += len(complete)
+        return self._index
+
+    def _apply(self, record):
+        if record.get('op') == 'remove':
+            self._index.pop(record['name'], None)
+        else:
+            self._index[record['name']] = {key: record[key] for key in ('hash', 'size', 'stored_size', 'modified')}
+
+    @contextlib.contextmanager
+    def _locked(self):
+        """プロセス内（スレッド）とプロセス間の両方で排他し、最新のインデックスを読み込む"""
+        with self._lock:
+            os.makedirs(self.root, exist_ok=True)
+            with open(self.lock_file, 'a') as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                try:
+                    yield self._load_index()
+                finally:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _append(self, record):
+        """インデックスに1行追記（_locked() 内で呼ぶ）"""
+        with open(self.index_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._load_index()
+        if self._index_lines > max(self.COMPACT_MIN_LINES, 2 * len(self._index)):
+            self._compact()
+
+    def _compact(self):
+        """ログを現在のエントリだけに書き直す（_locked() 内で呼ぶ）"""
+        tmp_path = f"{self.index_file}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for name, entry in self._index.items():
+                f.write(json.dumps(dict(entry, op='put', name=name), ensure_ascii=False) + '\n')
+        os.replace(tmp_path, self.index_file)
+        self._load_index()
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], f"{digest}.gz")
+
+    # --- 書き込み ---
+
+    def put_text(self, name, text):
+        """テキストを保存し、{name, hash, size, stored_size, deduplicated} を返す"""
+        data = text.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+
+        with self._locked():
+            deduplicated = os.path.exists(path)
+            if deduplicated:
+                self._stats['dedup_hits'] += 1
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    # mtime=0 で同じ内容から常に同じ圧縮結果を生成
+                    f.write(gzip.compress(data, compresslevel=self.compresslevel, mtime=0))
+                os.replace(tmp_path, path)
+                self._stats['writes'] += 1
+
+            entry = {
+                'hash': digest,
+                'size': len(data),
+                'stored_size': os.path.getsize(path),
+                'modified': time.time(),
+            }
+            self._append(dict(entry, op='put', name=name))
+            return dict(entry, name=name, deduplicated=deduplicated)
+
+    def remove(self, name):
+        """ファイル名を削除し、参照されなくなった実体も削除"""
+        with self._locked() as index:
+            entry = index.get(name)
+            if entry is None:
+                return False
+            self._append({'op': 'remove', 'name': name})
+            if not any(e['hash'] == entry['hash'] for e in self._index.values()):
+                try:
+                    os.remove(self._object_path(entry['hash']))
+                except OSError:
+                    pass
+                shutil.rmtree(os.path.join(self.exports_dir, entry['hash'][:16]), ignore_errors=True)
+            return True
+
+    # --- 読み出し ---
+
+    def exists(self, name):
+        with self._lock:
+            return name in self._load_index()
+
+    def get(self, name):
+        """ファイル名のエントリを取得（存在しない場合はNone）"""
+        with self._lock:
+            entry = self._load_index().get(name)
+            return dict(entry, name=name) if entry else None
+
+    def read_bytes(self, name):
+        entry = self.get(name)
+        if entry is None:
+            raise FileNotFoundError(name)
+        with gzip.open(self._object_path(entry['hash']), 'rb') as f:
+            return f.read()
+
+    def read_text(self, name):
+        return self.read_bytes(name).decode('utf-8')
+
+    def export(self, name):
+        """展開済みファイルのパスを返す（ダウンロード用、内容ハッシュ単位で再利用）"""
+        entry = self.get(name)
+        if entry is None:
+            raise FileNotFoundError(name)
+        export_dir = os.path.join(self.exports_dir, entry['hash'][:16])
+        path = os.path.join(export_dir, os.path.basename(name))
+        if not os.path.exists(path):
+            os.makedirs(export_dir, exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(self.read_bytes(name))
+            os.replace(tmp_path, path)
+        return path
+
+    def list_entries(self):
+        """保存済みファイルの一覧（新しい順）"""
+        with self._lock:
+            entries = [dict(entry, name=name) for name, entry in self._load_index().items()]
+        entries.sort(key=lambda e: e['modified'], reverse=True)
+        return entries
+
+    def get_stats(self):
+        """ディスク使用量の削減レポート"""
+        entries = self.list_entries()
+        logical_bytes = sum(e['size'] for e in entries)
+        blobs = {e['hash']: e['stored_size'] for e in entries}
+        stored_bytes = sum(blobs.values())
+        return {
+            'files': len(entries),
+            'objects': len(blobs),
+            'logical_bytes': logical_bytes,
+            'stored_bytes': stored_bytes,
+            'bytes_saved': logical_bytes - stored_bytes,
+            'ratio': stored_bytes / logical_bytes if logical_bytes else None,
+            'writes': self._stats['writes'],
+            'dedup_hits': self._stats['dedup_hits'],
+        }
+
+
+_default_store = None
+_default_lock = threading.Lock()
+
+
+def get_artifact_store():
+    """プロセス共有の成果物ストア（保存先は環境変数 ARTIFACT_DIR、既定: artifacts）"""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = ArtifactStore(os.environ.get("ARTIFACT_DIR", "artifacts"))
+        return _default_store
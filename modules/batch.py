@@ -0,0 +1,124 @@
+"""
+複数キーワードの一括スクレイピング（共有ブラウザ上の並行タブ）
+"""
+import asyncio
+import time
+from datetime import datetime
+from .pipeline import ScrapePipeline
+from .workspace import RunWorkspace
+
+
+class BatchScraper:
+    """複数キーワードを1つ（または少数）のブラウザの別タブで並行実行するクラス
+
+    run() は非同期ジェネレーターで、キーワードごとの結果を完了順にyieldする。
+    """
+
+    def __init__(self, browser_pool, concurrency=3, browsers=1, capture_api=False, harvest=False,
+                 save_html=True, worker_id=None, resource_profile='default', parallel_pages=False,
+                 delta_index=None, product_store=None, save_json=True, output_format='json'):
+        self.browser_pool = browser_pool
+        self.concurrency = max(1, concurrency)
+        # ブラウザ数はプールサイズと並行数を超えない
+        self.browsers = max(1, min(browsers, browser_pool.size, self.concurrency))
+        self.capture_api = capture_api
+        self.harvest = harvest
+        self.save_html = save_html
+        self.worker_id = worker_id
+        self.resource_profile = resource_profile
+        self.parallel_pages = parallel_pages
+        self.delta_index = delta_index
+        self.product_store = product_store
+        self.save_json = save_json
+        self.output_format = output_format
+
+    async def run(self, keywords):
+        """キーワードごとの結果辞書を完了順にyield"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        leased = []
+        try:
+            # 待つのは1台目だけ。2台目以降は空いている分だけ借りる（複数バッチが互いに
+            # 1台ずつ保持したまま残りを待ち合うデッドロックを防ぐ）
+            leased.append(await self.browser_pool.acquire())
+            for _ in range(self.browsers - 1):
+                browser = await self.browser_pool.acquire(wait=False)
+                if browser is None:
+                    break
+                leased.append(browser)
+            failures = {id(browser): 0 for browser in leased}
+            assigned = {id(browser): 0 for browser in leased}
+
+            async def scrape_one(index, keyword):
+                browser = leased[index % len(leased)]
+                assigned[id(browser)] += 1
+                async with semaphore:
+                    result = await self._scrape_keyword(browser, keyword)
+                if result['status'] != 'success':
+                    failures[id(browser)] += 1
+                result['index'] = index
+                return result
+
+            tasks = [asyncio.ensure_future(scrape_one(i, kw)) for i, kw in enumerate(keywords)]
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    yield await next_done
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            for browser in leased:
+                # 割り当てたキーワードが全て失敗したブラウザはクラッシュとみなして再生成
+                failed = bool(assigned.get(id(browser))) and failures.get(id(browser)) == assigned.get(id(browser))
+                await self.browser_pool.release(browser, failed=failed)
+
+    async def _scrape_keyword(self, browser, keyword):
+        """1キーワード分のパイプラインを専用タブ・専用ワークスペースで実行"""
+        start_time = time.time()
+        pipeline = ScrapePipeline(
+            browser=browser,
+            capture_api=self.capture_api,
+            harvest=self.harvest,
+            save_html=self.save_html,
+            workspace=RunWorkspace(worker_id=self.worker_id),
+            resource_profile=self.resource_profile,
+            parallel_pages=self.parallel_pages,
+            delta_index=self.delta_index,
+            product_store=self.product_store,
+            save_json=self.save_json,
+            output_format=self.output_format
+        )
+        try:
+            success = await pipeline.run(search_keyword=keyword)
+            error = None
+            if not pipeline.scrape_success:
+                error = "スクレイピングに失敗しました"
+            elif not pipeline.parse_success:
+                error = "HTML解析に失敗しました"
+        except Exception as e:
+            success = False
+            error = f"{type(e).__name__}: {e}"
+
+        files = {}
+        if pipeline.html_file:
+            files['html'] = pipeline.html_file
+        if pipeline.json_file:
+            files['json'] = pipeline.json_file
+
+        products = pipeline.get_products()
+        stats = pipeline.get_stats()
+        return {
+            'keyword': keyword,
+            'run_id': pipeline.run_id,
+            'status': 'success' if success else 'error',
+            'timestamp': datetime.now().isoformat(),
+            'total_products': len(products),
+            'unique_products': stats.get('unique_products', len(products)),
+            'files': files,
+            'stats': stats,
+            'timings': stats.get('timings'),
+            'delta': pipeline.delta,
+            'error': error,
+            'execution_time': time.time() - start_time
+        }
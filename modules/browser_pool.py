@@ -0,0 +1,265 @@
+"""
+Chromiumブラウザプール（プロセス共有）
+"""
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager
+
+
+# start_browser()で使用していた起動オプション
+BROWSER_ARGS = [
+    '--headless',
+    '--no-sandbox',
+    '--disable-gpu',
+    '--disable-dev-shm-usage',
+    '--disable-blink-features=AutomationControlled',
+    '--exclude-switches=enable-automation',
+    '--disable-extensions',
+    # 複数タブを並行して操作するため、バックグラウンドタブのタイマー抑制を無効化
+    '--disable-background-timer-throttling',
+    '--disable-backgrounding-occluded-windows',
+    '--disable-renderer-backgrounding',
+    '--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    '--window-size=1920,15000',  # 超巨大縦長ウィンドウ（高さ15000ピクセル）
+    '--start-maximized'
+]
+
+
+async def launch_browser():
+    """nodriverでChromiumを起動"""
+    import nodriver as nd
+
+    return await nd.start(
+        headless=True,
+        sandbox=False,
+        browser_args=BROWSER_ARGS
+    )
+
+
+async def stop_browser(browser):
+    """ブラウザを終了（stop()が同期・非同期どちらでも対応）"""
+    if hasattr(browser, 'stop') and callable(browser.stop):
+        stop_result = browser.stop()
+        if hasattr(stop_result, '__await__'):
+            await stop_result
+
+
+class _PooledBrowser:
+    """プール内のブラウザと利用状況"""
+
+    def __init__(self, browser):
+        self.browser = browser
+        self.uses = 0
+        self.created_at = time.time()
+
+
+class BrowserPool:
+    """サイズ上限付きのブラウザプール
+
+    ブラウザは専用のイベントループ（バックグラウンドスレッド）上で管理されるため、
+    FastAPIのハンドラーからもGradioのワーカースレッドからも同じブラウザを共有できる。
+    スクレイピング処理は run() / run_async() でプールのループ上に投入する。
+    """
+
+    def __init__(self, size=2, max_uses=20, health_check_timeout=5):
+        self.size = size
+        self.max_uses = max_uses
+        self.health_check_timeout = health_check_timeout
+        self._idle = []
+        self._in_use = {}
+        self._condition = None
+        self._loop = None
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self._stats = {
+            'leases': 0,
+            'waits': 0,
+            'wait_time': 0.0,
+            'launches': 0,
+            'recycles': 0,
+            'health_check_failures': 0,
+        }
+
+    # --- イベントループ管理 ---
+
+    def _ensure_loop(self):
+        """プール専用のイベントループを起動"""
+        with self._thread_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever,
+                    name='browser-pool',
+                    daemon=True
+                )
+                self._thread.start()
+        return self._loop
+
+    def run(self, coro):
+        """同期コードからプールのループ上でコルーチンを実行"""
+        loop = self._ensure_loop()
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    async def run_async(self, coro):
+        """別ループの非同期コードからプールのループ上でコルーチンを実行"""
+        loop = self._ensure_loop()
+        future = asyncio.run_coroutine_threadsafe(coro, loop)
+        return await asyncio.wrap_future(future)
+
+    async def iterate_async(self, agen):
+        """プールのループ上で動く非同期ジェネレーターを別ループから順に受け取る"""
+        try:
+            while True:
+                try:
+                    item = await self.run_async(agen.__anext__())
+                except StopAsyncIteration:
+                    break
+                yield item
+        finally:
+            await self.run_async(agen.aclose())
+
+    # --- リース ---
+
+    async def acquire(self, wait=True):
+        """ブラウザを1つ借り出す（空きがなければ返却を待機、wait=Falseなら待たずにNoneを返す）"""
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+
+        async with self._condition:
+            if not wait and not self._idle and len(self._in_use) >= self.size:
+                return None
+            waited = False
+            wait_start = time.time()
+            while not self._idle and len(self._in_use) >= self.size:
+                if not waited:
+                    self._stats['waits'] += 1
+                    waited = True
+                await self._condition.wait()
+            if waited:
+                self._stats['wait_time'] += time.time() - wait_start
+
+            pooled = self._idle.pop() if self._idle else None
+            # 起動中の枠を確保するため、先にプレースホルダーを登録
+            slot = object()
+            self._in_use[id(slot)] = slot
+
+        try:
+            if pooled is not None and not await self._is_healthy(pooled):
+                self._stats['health_check_failures'] += 1
+                await self._recycle(pooled)
+                pooled = None
+            if pooled is None:
+                pooled = _PooledBrowser(await launch_browser())
+                self._stats['launches'] += 1
+        except BaseException:
+            async with self._condition:
+                self._in_use.pop(id(slot), None)
+                self._condition.notify()
+            raise
+
+        async with self._condition:
+            self._in_use.pop(id(slot), None)
+            self._in_use[id(pooled.browser)] = pooled
+            pooled.uses += 1
+            self._stats['leases'] += 1
+        return pooled.browser
+
+    async def release(self, browser, failed=False):
+        """ブラウザを返却（失敗時・使用回数上限時は破棄して再生成対象にする）"""
+        async with self._condition:
+            pooled = self._in_use.pop(id(browser), None)
+
+        if pooled is None:
+            return
+
+        if failed or pooled.uses >= self.max_uses:
+            await self._recycle(pooled)
+        else:
+            try:
+                # 前回のページを破棄してメモリを解放
+                await asyncio.wait_for(browser.get('about:blank'), timeout=self.health_check_timeout)
+            except Exception:
+                await self._recycle(pooled)
+                pooled = None
+
+        async with self._condition:
+            if pooled is not None and not failed and pooled.uses < self.max_uses:
+                self._idle.append(pooled)
+            self._condition.notify()
+
+    @asynccontextmanager
+    async def lease(self):
+        """async with でブラウザを借り出す"""
+        browser = await self.acquire()
+        failed = False
+        try:
+            yield browser
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            await self.release(browser, failed=failed)
+
+    async def _is_healthy(self, pooled):
+        """ブラウザプロセスとCDP接続が生きているか確認"""
+        browser = pooled.browser
+        if getattr(browser, 'stopped', False):
+            return False
+        try:
+            import nodriver as nd
+            await asyncio.wait_for(
+                browser.connection.send(nd.cdp.browser.get_version()),
+                timeout=self.health_check_timeout
+            )
+            return True
+        except Exception:
+            return False
+
+    async def _recycle(self, pooled):
+        """ブラウザを終了してプールから外す"""
+        self._stats['recycles'] += 1
+        try:
+            await stop_browser(pooled.browser)
+        except Exception:
+            pass
+
+    async def close(self):
+        """アイドル中のブラウザを全て終了"""
+        idle, self._idle = self._idle, []
+        for pooled in idle:
+            try:
+                await stop_browser(pooled.browser)
+            except Exception:
+                pass
+
+    @staticmethod
+    async def _cancel_tasks():
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def shutdown(self):
+        """プールのループを停止（アプリ終了時）"""
+        if self._loop is None:
+            return
+        self.run(self.close())
+        # ループ上に残ったタスク（ジョブのワーカー等）を中断してから停止する
+        self.run(self._cancel_tasks())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop = None
+        self._thread = None
+        self._condition = None
+
+    def get_stats(self):
+        """プールの統計情報を取得"""
+        stats = dict(self._stats)
+        stats.update({
+            'size': self.size,
+            'max_uses': self.max_uses,
+            'idle': len(self._idle),
+            'in_use': len(self._in_use),
+        })
+        return stats
@@ -0,0 +1,179 @@
+"""
+実行間の商品差分（URL/SKUをキーに追加・削除・価格変更だけを抽出）
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from .result_cache import DEFAULT_LOCALE, make_cache_key
+from .workspace import RunWorkspace, RUNS_ROOT
+
+
+# 差分の比較・保存に使う商品の項目
+_SNAPSHOT_FIELDS = ('name', 'url', 'sku', 'price')
+
+
+def product_key(product):
+    """商品の識別キー（URL優先、URLがなければSKU、どちらもなければNone）"""
+    url = product.get('url')
+    if url and url != 'N/A':
+        return url
+    sku = product.get('sku')
+    if sku and sku != 'N/A':
+        return f"sku:{sku}"
+    return None
+
+
+def _snapshot(products):
+    """商品リストを {キー: 比較用の項目} に変換（キーを持たない商品は追跡できないため除外）"""
+    snapshot = {}
+    for product in products:
+        key = product_key(product)
+        if key is not None:
+            snapshot[key] = {field: product.get(field) for field in _SNAPSHOT_FIELDS}
+    return snapshot
+
+
+def diff_snapshots(old, new):
+    """2つのスナップショットの差分（added / removed / price_changed と件数）"""
+    added = [new[key] for key in new if key not in old]
+    removed = [old[key] for key in old if key not in new]
+    price_changed = [
+        dict(new[key], old_price=old[key].get('price'))
+        for key in new
+        if key in old and old[key].get('price') != new[key].get('price')
+    ]
+    return {
+        'added': added,
+        'removed': removed,
+        'price_changed': price_changed,
+        'counts': {
+            'added': len(added),
+            'removed': len(removed),
+            'price_changed': len(price_changed),
+            'unchanged': len(new) - len(added) - len(price_changed),
+            'total': len(new),
+        },
+    }
+
+
+class DeltaIndex:
+    """キーワードごとの最新の商品状態を保持し、実行ごとの差分を算出するクラス
+
+    状態は root/<キーのハッシュ>.json に保存され、再起動後も引き継がれる。update() は
+    前回の状態と今回の商品を比較して差分を返し、状態を今回の内容に置き換える。
+    since() は過去の実行（runs/<run_id>/ のJSON、なければ商品DB）から現在の状態までの差分を返す。
+    """
+
+    def __init__(self, root='delta_index', runs_root=None, product_store=None):
+        self.root = root
+        self.runs_root = runs_root or RUNS_ROOT
+        self.product_store = product_store
+        self._lock = threading.Lock()
+
+    def _path(self, keyword, locale):
+        digest = hashlib.sha1(make_cache_key(keyword, locale).encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.root, f"{digest}.json")
+
+    def _load(self, keyword, locale):
+        path = self._path(keyword, locale)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save(self, keyword, locale, state):
+        os.makedirs(self.root, exist_ok=True)
+        path = self._path(keyword, locale)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def update(self, keyword, products, run_id=None, locale=DEFAULT_LOCALE, partial=False):
+        """今回の商品を前回の状態と比較して差分を返し、状態を更新
+
+        partial=True（一部の商品しか取得できなかった実行）の場合、未取得の商品を削除と
+        誤判定しないよう removed は空にし、状態も更新しない（次回の完全な実行と比較する）。
+        """
+        snapshot = _snapshot(products)
+        with self._lock:
+            previous = self._load(keyword, locale)
+            delta = diff_snapshots(previous['products'] if previous else {}, snapshot)
+            if partial:
+                delta['removed'] = []
+                delta['counts']['removed'] = 0
+            delta.update({
+                'keyword': keyword,
+                'locale': locale,
+                'base_run_id': previous.get('run_id') if previous else None,
+                'run_id': run_id,
+                'initial': previous is None,
+                'partial': partial,
+            })
+            if partial:
+                return delta
+            self._save(keyword, locale, {
+                'keyword': keyword,
+                'locale': locale,
+                'run_id': run_id,
+                'updated_at': time.time(),
+                'products': snapshot,
+                'last_delta': delta,
+            })
+        return delta
+
+    def latest(self, keyword, locale=DEFAULT_LOCALE):
+        """直近の実行で算出した差分（状態がない場合はNone）"""
+        state = self._load(keyword, locale)
+        return state.get('last_delta') if state else None
+
+    def since(self, run_id, keyword=None, locale=None):
+        """過去の実行から現在の状態までの差分（実行・状態が見つからない場合はNone）"""
+        manifest = RunWorkspace.load_manifest(run_id, root=self.runs_root) or {}
+        if not manifest and self.product_store is not None:
+            runs = self.product_store.list_runs(run_id=run_id)
+            manifest = runs[0] if runs else {}
+        keyword = keyword or manifest.get('keyword')
+        locale = locale or manifest.get('locale') or DEFAULT_LOCALE
+        if not keyword:
+            return None
+
+        old_products = self._load_run_products(run_id, manifest)
+        if old_products is None and self.product_store is not None:
+            old_products = self.product_store.get_run_products(run_id)
+        state = self._load(keyword, locale)
+        if old_products is None or state is None:
+            return None
+        delta = diff_snapshots(_snapshot(old_products), state['products'])
+        delta.update({
+            'keyword': keyword,
+            'locale': locale,
+            'base_run_id': run_id,
+            'run_id': state.get('run_id'),
+            'initial': False,
+            'partial': False,
+            'updated_at': datetime.fromtimestamp(state['updated_at']).isoformat(),
+        })
+        return delta
+
+    def _load_run_products(self, run_id, manifest):
+        """確定済み実行ディレクトリの商品JSON/NDJSONを読み込む"""
+        run_dir = os.path.join(self.runs_root, os.path.basename(run_id))
+        for name in manifest.get('files', []):
+            if not name.startswith('hermes_products'):
+                continue
+            try:
+                with open(os.path.join(run_dir, name), 'r', encoding='utf-8') as f:
+                    if name.endswith('.ndjson'):
+                        return [json.loads(line) for line in f if line.strip()]
+                    if name.endswith('.json'):
+                        return json.load(f).get('products', [])
+            except (OSError, ValueError):
+                return None
+        return None
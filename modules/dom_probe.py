@@ -0,0 +1,71 @@
+"""
+DOMプローブ（複数のDOMチェックを1回のevaluateで実行）
+"""
+import json
+from .utils import normalize_nodriver_result
+
+
+# 1要素あたりの判定処理（kind → JS式、elは対象要素）
+_PROBE_KINDS = {
+    'exists': 'document.querySelector(sel) !== null',
+    'count': 'document.querySelectorAll(sel).length',
+    'visible': '''(() => {
+        const el = document.querySelector(sel);
+        if (!el || el.offsetParent === null) return false;
+        const style = window.getComputedStyle(el);
+        return style.display !== 'none' && style.visibility !== 'hidden';
+    })()''',
+    'text': '''(() => {
+        const el = document.querySelector(sel);
+        return el ? (el.innerText || el.textContent || '').trim() : null;
+    })()''',
+    'first': '''(() => {
+        for (const s of sel) {
+            if (document.querySelector(s)) return s;
+        }
+        return null;
+    })()''',
+    'expr': 'sel',
+}
+
+
+def build_probe_script(checks):
+    """チェックのリストから1回で評価できるJSを組み立てる
+
+    checks: (name, kind, selector) のリスト
+      - kind: exists / count / visible / text / first / expr
+      - first はselectorにセレクターのリストを渡す
+      - expr はselectorにJS式をそのまま渡す
+    """
+    parts = []
+    for name, kind, selector in checks:
+        if kind not in _PROBE_KINDS:
+            raise ValueError(f"未対応のプローブ種別: {kind}")
+        if kind == 'expr':
+            body = selector
+        else:
+            body = f"((sel) => {_PROBE_KINDS[kind]})({json.dumps(selector, ensure_ascii=False)})"
+        parts.append(
+            f"try {{ r[{json.dumps(name)}] = {body}; }} "
+            f"catch (e) {{ r[{json.dumps(name)}] = null; errors[{json.dumps(name)}] = String(e); }}"
+        )
+
+    return (
+        "(() => { const r = {}; const errors = {};\n"
+        + "\n".join(parts)
+        + "\nif (Object.keys(errors).length) r.__errors__ = errors;"
+        + "\nreturn JSON.stringify(r); })()"
+    )
+
+
+def parse_probe_result(raw):
+    """evaluateの戻り値（JSON文字列）を辞書に変換"""
+    value = normalize_nodriver_result(raw)
+    if isinstance(value, dict) and 'value' in value:
+        value = value['value']
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return {}
+    return value if isinstance(value, dict) else {}
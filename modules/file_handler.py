@@ -5,6 +5,9 @@ import os
 import json
 import glob
 from datetime import datetime
+import shutil
+from .artifact_store import get_artifact_store
+from .workspace import RunWorkspace, RUNS_ROOT
 
 
 class FileHandler:
@@ -27,9 +30,10 @@ class FileHandler:
         other_html = glob.glob("before_click.html") + glob.glob("after_click.html")
         files.extend(other_html)
         
-        # JSONファイル
-        json_files = glob.glob("hermes_products*.json")
-        files.extend(json_files)
+        # JSON/NDJSONファイル（実行ごとのワークスペース内を含む）
+        for pattern in ("hermes_products*.json", "hermes_products*.ndjson"):
+            files.extend(glob.glob(pattern))
+            files.extend(glob.glob(os.path.join(RUNS_ROOT, "*", pattern)))
         
         # CSVファイル（将来の拡張用）
         csv_files = glob.glob("hermes_products*.csv")
@@ -52,27 +56,38 @@ class FileHandler:
                     'modified': datetime.fromtimestamp(mtime).strftime("%Y-%m-%d %H:%M:%S")
                 })
         
+        # 圧縮保存されたHTML（成果物ストア）
+        listed = {info['name'] for info in file_info}
+        for entry in get_artifact_store().list_entries():
+            if entry['name'] in listed:
+                continue
+            file_info.append({
+                'name': entry['name'],
+                'size': entry['size'],
+                'size_kb': f"{entry['size']/1024:.1f} KB",
+                'stored_size': entry['stored_size'],
+                'modified': datetime.fromtimestamp(entry['modified']).strftime("%Y-%m-%d %H:%M:%S")
+            })
+        
         # 更新時刻でソート（新しい順）
         file_info.sort(key=lambda x: x['modified'], reverse=True)
         
         return file_info
     
     @staticmethod
-    def clean_old_files(keep_latest=5):
-        """古いファイルを削除（最新N個を保持）"""
-        patterns = ["hermes_page*.html", "hermes_products*.json"]
-        
-        for pattern in patterns:
-            files = glob.glob(pattern)
-            if len(files) > keep_latest:
-                # 更新時刻でソート
-                files.sort(key=lambda x: os.path.getmtime(x))
-                # 古いファイルを削除
-                for file in files[:-keep_latest]:
-                    try:
-                        os.remove(file)
-                    except:
-                        pass
+    def clean_old_runs(keep_latest=20):
+        """古い実行ワークスペースを削除（最新N件を保持、成果物ストア内のHTMLも削除）し、削除した件数を返す"""
+        old_runs = RunWorkspace.list_runs()[keep_latest:]
+        if not old_runs:
+            return 0
+        store = get_artifact_store()
+        prefixes = tuple(os.path.join(RUNS_ROOT, run_id) + os.sep for run_id in old_runs)
+        for entry in store.list_entries():
+            if entry['name'].startswith(prefixes):
+                store.remove(entry['name'])
+        for run_id in old_runs:
+            shutil.rmtree(os.path.join(RUNS_ROOT, run_id), ignore_errors=True)
+        return len(old_runs)
     
     @staticmethod
     def save_json(data, filename):
@@ -90,5 +105,23 @@ class FileHandler:
     
     @staticmethod
     def file_exists(filename):
-        """ファイルの存在確認"""
-        return os.path.exists(filename)
\ No newline at end of file
+        """ファイルの存在確認（成果物ストア内のファイルを含む）"""
+        return os.path.exists(filename) or get_artifact_store().exists(filename)
+    
+    @staticmethod
+    def read_text(filename):
+        """テキストファイルを読み込み（圧縮保存されたファイルは透過的に展開）"""
+        if os.path.exists(filename):
+            with open(filename, 'r', encoding='utf-8') as f:
+                return f.read()
+        return get_artifact_store().read_text(filename)
+    
+    @staticmethod
+    def resolve_path(filename):
+        """ダウンロード用の実ファイルパスを取得（圧縮保存されたファイルは展開して返す）"""
+        if os.path.exists(filename):
+            return filename
+        store = get_artifact_store()
+        if store.exists(filename):
+            return store.export(filename)
+        return None
\ No newline at end of file
@@ -0,0 +1,194 @@
+"""
+スクレイピングジョブのキューとワーカープール
+"""
+import asyncio
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+
+
+class QueueFullError(Exception):
+    """ジョブキューが上限に達している"""
+
+
+class Job:
+    """1件のスクレイピングジョブ"""
+
+    def __init__(self, params):
+        self.id = uuid.uuid4().hex
+        self.params = params
+        self.status = 'queued'  # queued / running / succeeded / failed
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        self.log_sources = []  # 進捗ログ（get_results()を持つロガー）
+        self.products = []  # 逐次取得モードで実行中に取得済みの商品（追記のみ）
+
+    def read_progress(self, cursors=None):
+        """前回の位置以降の進捗ログと、次回用の位置リストを返す"""
+        cursors = list(cursors or [])
+        lines = []
+        for i, source in enumerate(self.log_sources):
+            if i >= len(cursors):
+                cursors.append(0)
+            new_lines, cursors[i] = source.read_since(cursors[i])
+            lines.extend(new_lines)
+        return lines, cursors
+
+    def read_products(self, cursor=0):
+        """前回の位置以降に取得した商品と、次回用の位置を返す"""
+        products = self.products[cursor:]
+        return products, cursor + len(products)
+
+    def to_dict(self, include_result=True):
+        """API応答用の辞書に変換"""
+        def iso(ts):
+            return datetime.fromtimestamp(ts).isoformat() if ts else None
+
+        data = {
+            'job_id': self.id,
+            'status': self.status,
+            'params': self.params,
+            'created_at': iso(self.created_at),
+            'started_at': iso(self.started_at),
+            'finished_at': iso(self.finished_at),
+            'queue_time': (self.started_at or time.time()) - self.created_at,
+            'run_time': (self.finished_at or time.time()) - self.started_at if self.started_at else None,
+            'error': self.error,
+        }
+        if include_result:
+            data['result'] = self.result
+        return data
+
+    @property
+    def done(self):
+        return self.status in ('succeeded', 'failed')
+
+
+class JobManager:
+    """上限付きキューと固定数のワーカーでジョブを実行するクラス
+
+    ワーカーはブラウザプールのイベントループ上で動作する。submit() はどのスレッドからも
+    呼び出せ、キューが上限に達している場合は QueueFullError を送出する。プールが停止・再起動
+    された場合は新しいループでワーカーを起動し直し、待機中のジョブを引き継ぐ。
+    """
+
+    def __init__(self, browser_pool, runner, workers=2, max_queue=20, keep_finished=200):
+        self.browser_pool = browser_pool
+        self.runner = runner  # async def runner(job) -> 結果辞書
+        self.workers = max(1, workers)
+        self.max_queue = max_queue
+        self.keep_finished = keep_finished
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._queue = None
+        self._pending = 0
+        self._loop = None  # ワーカーが動作しているプールのループ
+
+    def _ensure_workers(self):
+        """プールの現在のループ上でキューとワーカーを起動し、そのループを返す"""
+        with self._lock:
+            loop = self.browser_pool._ensure_loop()
+            if self._loop is not loop:
+                queued = [job for job in self._jobs.values() if job.status == 'queued']
+                # ロックを保持したままループの完了を待つとワーカーとデッドロックするため、投入のみ行う
+                loop.call_soon_threadsafe(self._start_workers, queued)
+                self._loop = loop
+            return loop
+
+    def _start_workers(self, queued):
+        self._queue = asyncio.Queue()
+        for job in queued:
+            self._queue.put_nowait(job)
+        for i in range(self.workers):
+            asyncio.ensure_future(self._worker(i, self._queue))
+
+    def _enqueue(self, job):
+        # ループ上で呼ばれるため、先に投入した _start_workers で作成したキューに入る
+        self._queue.put_nowait(job)
+
+    async def _worker(self, worker_index, queue):
+        """キューからジョブを取り出して実行"""
+        while True:
+            job = await queue.get()
+            with self._lock:
+                self._pending -= 1
+            job.status = 'running'
+            job.started_at = time.time()
+            try:
+                job.result = await self.runner(job)
+                job.status = 'succeeded' if job.result.get('status') == 'success' else 'failed'
+                job.error = job.result.get('error')
+            except Exception as e:
+                job.status = 'failed'
+                job.error = f"{type(e).__name__}: {e}"
+            except asyncio.CancelledError:
+                job.status = 'failed'
+                job.error = "ブラウザプールの停止により中断されました"
+                raise
+            finally:
+                job.finished_at = time.time()
+                queue.task_done()
+                self._evict_finished()
+
+    def submit(self, params):
+        """ジョブを登録してJobを返す（キュー満杯時はQueueFullError）"""
+        loop = self._ensure_workers()
+        with self._lock:
+            if self._pending >= self.max_queue:
+                raise QueueFullError(f"ジョブキューが上限（{self.max_queue}件）に達しています")
+            self._pending += 1
+            job = Job(params)
+            self._jobs[job.id] = job
+        loop.call_soon_threadsafe(self._enqueue, job)
+        return job
+
+    def get(self, job_id):
+        """ジョブを取得（存在しない場合はNone）"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self):
+        """ジョブ一覧（新しい順）"""
+        with self._lock:
+            return list(reversed(self._jobs.values()))
+
+    def queue_position(self, job):
+        """待機中ジョブの順番（1始まり、待機中でなければNone）"""
+        if job.status != 'queued':
+            return None
+        with self._lock:
+            jobs = list(self._jobs.values())
+        position = 0
+        for other in jobs:
+            if other.status == 'queued':
+                position += 1
+            if other is job:
+                return position
+        return None
+
+    def get_stats(self):
+        """キューの状態を取得"""
+        with self._lock:
+            jobs = list(self._jobs.values())
+            pending = self._pending
+        statuses = {}
+        for job in jobs:
+            statuses[job.status] = statuses.get(job.status, 0) + 1
+        return {
+            'workers': self.workers,
+            'max_queue': self.max_queue,
+            'queued': pending,
+            'jobs': statuses,
+        }
+
+    def _evict_finished(self):
+        """完了済みジョブを古い順に削除して保持件数を制限"""
+        with self._lock:
+            finished = [job_id for job_id, job in self._jobs.items() if job.done]
+            for job_id in finished[:max(0, len(finished) - self.keep_finished)]:
+                del self._jobs[job_id]
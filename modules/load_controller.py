@@ -0,0 +1,184 @@
+"""
+Load More / スクロールの適応制御（商品数の増加と通信状況から次の操作と待機時間を決める）
+"""
+import json
+import time
+
+
+LOAD_MORE_SELECTOR = 'button[data-testid="Load more items"]'
+ITEM_SELECTOR = 'h-grid-result-item'
+
+# 1回のプローブでページ状態を取得（商品数・ボタン可視性・スクロール位置）
+_STATE_CHECKS = [
+    ('count', 'count', ITEM_SELECTOR),
+    ('load_more', 'visible', LOAD_MORE_SELECTOR),
+    ('at_bottom', 'expr', 'window.scrollY + window.innerHeight >= document.body.scrollHeight - 2'),
+]
+
+_SCROLL_TO_BOTTOM = 'window.scrollTo(0, document.body.scrollHeight); document.body.scrollHeight'
+
+_CLICK_LOAD_MORE = '''
+(() => {
+    const button = document.querySelector(%s);
+    if (!button) return false;
+    button.scrollIntoView({block: 'center'});
+    button.click();
+    return true;
+})()
+''' % json.dumps(LOAD_MORE_SELECTOR)
+
+
+class LoadController:
+    """商品の追加読み込みを適応的に制御するクラス
+
+    毎ステップでページ状態を観測し、Load Moreボタンのクリック・最下部へのスクロール・
+    待機のいずれかを選ぶ。操作後の待機時間は、これまでに観測した「操作から商品が増えるまで」
+    の時間から学習する（平均 + 4×ばらつき、TCPの再送タイムアウトと同じ考え方）。
+    総商品数に到達するか、学習したタイムアウト内に商品が増えない状態が続いた時点で終了する。
+    """
+
+    def __init__(self, tab, agent, probe, evaluate, logger=None, on_growth=None, total_items=0,
+                 initial_timeout=8.0, min_timeout=1.5, max_timeout=12.0, max_stalls=2,
+                 max_actions=40, deadline=120.0, timer=None):
+        self.tab = tab
+        self.agent = agent
+        self.probe = probe  # async (tab, checks) -> dict
+        self.evaluate = evaluate  # async (tab, expression) -> 結果
+        self.logger = logger
+        self.on_growth = on_growth  # async (label) -> None（商品が増えた時に呼ぶ）
+        self.total_items = total_items or 0
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.max_stalls = max_stalls
+        self.max_actions = max_actions
+        self.deadline = deadline
+        self.timer = timer  # 指定時は各ステップ（操作〜増加待ち）の所要時間を記録
+        self._latency_mean = None
+        self._latency_dev = None
+        self._initial_timeout = initial_timeout
+        self.actions = []
+        self.stop_reason = None
+
+    @property
+    def timeout(self):
+        """次の操作後に商品の増加を待つ時間（学習値）"""
+        if self._latency_mean is None:
+            return self._initial_timeout
+        estimate = self._latency_mean + 4 * self._latency_dev
+        return max(self.min_timeout, min(self.max_timeout, estimate))
+
+    def _learn(self, latency):
+        """操作から商品が増えるまでの時間を学習（指数移動平均）"""
+        if self._latency_mean is None:
+            self._latency_mean = latency
+            self._latency_dev = latency / 2
+        else:
+            self._latency_dev = 0.75 * self._latency_dev + 0.25 * abs(latency - self._latency_mean)
+            self._latency_mean = 0.875 * self._latency_mean + 0.125 * latency
+
+    async def _observe(self):
+        state = await self.probe(self.tab, _STATE_CHECKS)
+        agent_state = self.agent.state if self.agent.active else {}
+        return {
+            'count': state.get('count') or 0,
+            'load_more': bool(state.get('load_more')),
+            'at_bottom': bool(state.get('at_bottom')),
+            'inflight': agent_state.get('inflight', 0),
+        }
+
+    def _complete(self, count):
+        return self.total_items > 0 and count >= self.total_items
+
+    def _choose(self, state, stalled_actions):
+        """次の操作を選ぶ（通信中なら待機、ボタンがあればクリック、なければ最下部へスクロール）"""
+        if state['inflight'] > 0:
+            return 'wait'
+        if state['load_more'] and 'click' not in stalled_actions:
+            return 'click'
+        if not state['at_bottom'] and 'scroll' not in stalled_actions:
+            return 'scroll'
+        if state['load_more']:
+            return 'click'
+        return 'scroll' if not state['at_bottom'] else 'wait'
+
+    async def _act(self, action):
+        if action == 'click':
+            clicked = await self.evaluate(self.tab, _CLICK_LOAD_MORE)
+            return bool(clicked)
+        if action == 'scroll':
+            await self.evaluate(self.tab, _SCROLL_TO_BOTTOM)
+        return True
+
+    async def run(self):
+        """全商品が揃うか増加が止まるまで操作を繰り返し、最終的な商品数を返す"""
+        start = time.time()
+        state = await self._observe()
+        count = state['count']
+        self._log(f"      [適応制御] 開始時の商品数: {count}個 / 総商品数: {self.total_items or '不明'}")
+
+        stalls = 0
+        stalled_actions = set()
+        while True:
+            if self._complete(count):
+                self.stop_reason = 'complete'
+                break
+            if stalls >= self.max_stalls:
+                self.stop_reason = 'stalled'
+                break
+            if len(self.actions) >= self.max_actions:
+                self.stop_reason = 'max_actions'
+                break
+            if time.time() - start >= self.deadline:
+                self.stop_reason = 'deadline'
+                break
+            # ボタンなし・最下部・通信なし: これ以上読み込む手段がない
+            exhausted = not state['load_more'] and state['at_bottom'] and state['inflight'] == 0
+            if exhausted and (stalls > 0 or self.agent.state.get('idle')):
+                self.stop_reason = 'exhausted'
+                break
+
+            action = self._choose(state, stalled_actions)
+            timeout = self.timeout
+            acted_at = time.time()
+            if not await self._act(action):
+                # ボタンが消えていた場合は状態を取り直して選び直す
+                stalls += 1
+                stalled_actions.add(action)
+                state = await self._observe()
+                continue
+
+            grew = await self.agent.wait_for_growth(count, timeout, phase=f'adaptive_{action}')
+            latency = time.time() - acted_at
+            if self.timer is not None:
+                self.timer.record(f'load_step_{action}', latency)
+            state = await self._observe()
+            new_count = state['count']
+
+            if new_count > count:
+                # エージェントが増加を検知した場合のみ待機時間を学習（固定待機の値は学習しない）
+                if grew:
+                    self._learn(latency)
+                self.actions.append((action, count, new_count, latency))
+                self._log(
+                    f"      [{action}] {count} → {new_count}個 ({latency:.2f}s, 次回待機上限 {self.timeout:.1f}s)"
+                )
+                count = new_count
+                stalls = 0
+                stalled_actions.clear()
+                if self.on_growth is not None:
+                    await self.on_growth(f'適応制御 {len(self.actions)}')
+            else:
+                self.actions.append((action, count, new_count, latency))
+                stalls += 1
+                stalled_actions.add(action)
+                self._log(f"      [{action}] 増加なし（{latency:.2f}s待機, 連続{stalls}回）")
+
+        elapsed = time.time() - start
+        self._log(
+            f"      [適応制御] 終了: {self.stop_reason} - {count}個 / 操作{len(self.actions)}回 / {elapsed:.1f}秒"
+        )
+        return count
+
+    def _log(self, message):
+        if self.logger:
+            self.logger.log(message)
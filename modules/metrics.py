@@ -0,0 +1,158 @@
+"""
+実行時間の計測（フェーズ単位のスパン）とPrometheus形式のメトリクス出力
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+
+# フェーズ所要時間のヒストグラム境界（秒）
+PHASE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# メトリクス名 → (種別, 説明)
+METRICS = {
+    'hermes_phase_duration_seconds': ('histogram', 'Time spent in each scrape phase'),
+    'hermes_runs_total': ('counter', 'Scrape runs by final status'),
+    'hermes_items_loaded_total': ('counter', 'Products extracted by scrape runs'),
+    'hermes_cdp_evaluate_calls_total': ('counter', 'CDP Runtime.evaluate round trips'),
+    'hermes_bytes_transferred_total': ('counter', 'Encoded bytes received by the browser'),
+}
+
+# RunTimer.count() のカウンタ名 → メトリクス名
+RUN_COUNTERS = {
+    'items_loaded': 'hermes_items_loaded_total',
+    'cdp_evaluate_calls': 'hermes_cdp_evaluate_calls_total',
+    'bytes_transferred': 'hermes_bytes_transferred_total',
+}
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        (key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for key, value in labels
+    )
+    return '{' + ','.join(f'{key}="{value}"' for key, value in escaped) + '}'
+
+
+def _format_value(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class MetricsRegistry:
+    """プロセス全体のカウンタ・ヒストグラムを保持し、Prometheusテキスト形式で出力するクラス"""
+
+    def __init__(self, buckets=PHASE_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._counters = {}  # (name, labels) → 値
+        self._histograms = {}  # (name, labels) → [バケット別件数, 合計, 件数]
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    histogram[0][i] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    def render(self, gauges=None):
+        """Prometheusテキスト形式（version 0.0.4）で出力（gauges: {名前: (説明, 値)} は出力時点の値）"""
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: [list(h[0]), h[1], h[2]] for key, h in self._histograms.items()}
+
+        lines = []
+        histogram_names = {name for name, _ in histograms}
+        for name in sorted({name for name, _ in counters} | histogram_names):
+            kind, description = METRICS.get(name, ('histogram' if name in histogram_names else 'counter', name))
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+            for (metric, labels), (bucket_counts, total, count) in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                for bound, bucket_count in zip(self.buckets, bucket_counts):
+                    bucket_labels = labels + (('le', _format_value(float(bound))),)
+                    lines.append(f"{name}_bucket{_format_labels(bucket_labels)} {bucket_count}")
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {count}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(total)}")
+                lines.append(f"{name}_count{_format_labels(labels)} {count}")
+
+        for name, (description, value) in sorted((gauges or {}).items()):
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+_registry = MetricsRegistry()
+
+
+def get_metrics():
+    """プロセス共有のメトリクスレジストリ"""
+    return _registry
+
+
+class RunTimer:
+    """1回の実行のフェーズ別所要時間とカウンタを記録するクラス
+
+    span() で囲んだ区間の時間をフェーズ名ごとに合計し（Load Moreの各ステップのように
+    同じ名前が繰り返される場合は回数も数える）、同時にプロセス共有のレジストリにも記録する。
+    """
+
+    def __init__(self, registry=None):
+        self.registry = registry or get_metrics()
+        self.started_at = time.time()
+        self.phases = {}  # フェーズ名 → [合計秒数, 回数]（開始順）
+        self.counters = {}
+
+    @contextmanager
+    def span(self, phase):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - start)
+
+    def record(self, phase, seconds):
+        entry = self.phases.setdefault(phase, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += 1
+        self.registry.observe('hermes_phase_duration_seconds', seconds, phase=phase)
+
+    def count(self, name, value=1):
+        if not value:
+            return
+        self.counters[name] = self.counters.get(name, 0) + value
+        self.registry.inc(RUN_COUNTERS.get(name, f'hermes_{name}_total'), value)
+
+    def breakdown(self):
+        """フェーズ別の所要時間（開始順）とカウンタ"""
+        return {
+            'total_seconds': round(time.time() - self.started_at, 3),
+            'phases': {
+                phase: {'seconds': round(seconds, 3), 'count': count}
+                for phase, (seconds, count) in self.phases.items()
+            },
+            'counters': dict(self.counters),
+        }
@@ -0,0 +1,279 @@
+"""
+ページ内エージェント（CDPバインディングによるプッシュ型イベント通知）
+"""
+import asyncio
+import json
+import time
+
+
+BINDING_NAME = '__hermesAgentPush'
+
+# document開始時に注入するエージェントスクリプト
+# 商品数・総商品数・Load Moreボタン・通信状況が変化した時だけPython側へ状態を送る
+AGENT_SCRIPT = '''
+(function() {
+    if (window.__hermesAgentInstalled) return;
+    window.__hermesAgentInstalled = true;
+
+    const BINDING = '%(binding)s';
+    const BUTTON_SELECTOR = 'button[data-testid="Load more items"]';
+    const IDLE_MS = 500;
+    const patterns = [
+        /(\\d+)\\s*アイテム/,
+        /(\\d+)\\s*items?/i,
+        /(\\d+)\\s*製品/,
+        /(\\d+)\\s*商品/,
+        /(\\d+)\\s*results?/i
+    ];
+
+    const items = document.getElementsByTagName('h-grid-result-item');
+    const state = {
+        itemCount: 0,
+        totalCount: null,
+        totalText: null,
+        loadMore: false,
+        inflight: 0,
+        idle: false
+    };
+    let lastSent = '';
+    let lastTotalScan = 0;
+    let idleTimer = null;
+    let pending = null;
+
+    function push(reason) {
+        const body = JSON.stringify(state);
+        if (body === lastSent) return;
+        lastSent = body;
+        try {
+            window[BINDING](JSON.stringify({reason: reason, state: state}));
+        } catch (e) {}
+    }
+
+    function scanTotal() {
+        if (state.totalCount !== null) return;
+        const now = Date.now();
+        if (now - lastTotalScan < 1000) return;
+        lastTotalScan = now;
+        const sources = [];
+        const totalElement = document.querySelector('h-total-result, .total-result, [class*="total"]');
+        if (totalElement) sources.push(totalElement.innerText || totalElement.textContent || '');
+        if (document.body) sources.push(document.body.innerText || document.body.textContent || '');
+        for (const text of sources) {
+            for (const pattern of patterns) {
+                const match = text.match(pattern);
+                if (match && match[1]) {
+                    state.totalCount = parseInt(match[1]);
+                    state.totalText = match[0];
+                    return;
+                }
+            }
+        }
+    }
+
+    function refresh(reason) {
+        pending = null;
+        state.itemCount = items.length;
+        const button = document.querySelector(BUTTON_SELECTOR);
+        state.loadMore = !!(button && button.offsetParent !== null);
+        scanTotal();
+        push(reason);
+    }
+
+    function schedule(reason) {
+        if (pending === null) pending = setTimeout(() => refresh(reason), 50);
+    }
+
+    function requestStarted() {
+        state.inflight += 1;
+        state.idle = false;
+        if (idleTimer) { clearTimeout(idleTimer); idleTimer = null; }
+    }
+
+    function requestFinished() {
+        state.inflight = Math.max(0, state.inflight - 1);
+        if (state.inflight === 0) {
+            idleTimer = setTimeout(() => {
+                idleTimer = null;
+                state.idle = true;
+                refresh('network_idle');
+            }, IDLE_MS);
+        }
+    }
+
+    const originalFetch = window.fetch;
+    if (originalFetch) {
+        window.fetch = function() {
+            requestStarted();
+            return originalFetch.apply(this, arguments).finally(requestFinished);
+        };
+    }
+    const originalSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function() {
+        requestStarted();
+        this.addEventListener('loadend', requestFinished, {once: true});
+        return originalSend.apply(this, arguments);
+    };
+
+    function observe() {
+        new MutationObserver(() => schedule('dom')).observe(document.documentElement, {
+            childList: true,
+            subtree: true
+        });
+        refresh('ready');
+        // 通信が一度も発生しない場合もアイドルを通知する
+        if (state.inflight === 0) {
+            idleTimer = setTimeout(() => { state.idle = true; refresh('network_idle'); }, IDLE_MS);
+        }
+    }
+
+    if (document.documentElement) {
+        observe();
+    } else {
+        document.addEventListener('DOMContentLoaded', observe, {once: true});
+    }
+})();
+''' % {'binding': BINDING_NAME}
+
+
+class PageAgent:
+    """ページ内エージェントからのイベントを受け取り、待機処理に提供するクラス
+
+    インストールに失敗した場合は inactive のまま動作し、wait_for() は従来通り
+    指定時間の固定スリープになる。
+    """
+
+    def __init__(self, logger=None):
+        self.logger = logger
+        self.active = False
+        self.state = {
+            'itemCount': 0,
+            'totalCount': None,
+            'totalText': None,
+            'loadMore': False,
+            'inflight': 0,
+            'idle': False
+        }
+        self.event_count = 0
+        self.wait_report = []
+        self._tab = None
+        self._script_id = None
+        self._condition = asyncio.Condition()
+
+    async def install(self, tab):
+        """CDPバインディングとエージェントスクリプトをタブに登録（ページ遷移前に呼ぶ）"""
+        import nodriver as nd
+
+        try:
+            await tab.send(nd.cdp.runtime.enable())
+            await tab.send(nd.cdp.page.enable())
+            await tab.send(nd.cdp.runtime.add_binding(name=BINDING_NAME))
+            tab.add_handler(nd.cdp.runtime.BindingCalled, self._on_binding)
+            self._script_id = await tab.send(
+                nd.cdp.page.add_script_to_evaluate_on_new_document(source=AGENT_SCRIPT)
+            )
+            self._tab = tab
+            self.active = True
+        except Exception as e:
+            self.active = False
+            self._log(f"    ⚠️ ページ内エージェント登録失敗（固定待機で続行）: {e}")
+        return self.active
+
+    async def uninstall(self):
+        """タブからエージェントを外す（プールでタブを再利用するため）"""
+        if self._tab is None:
+            return
+        import nodriver as nd
+
+        tab, self._tab = self._tab, None
+        try:
+            if hasattr(tab, 'remove_handlers'):
+                tab.remove_handlers(nd.cdp.runtime.BindingCalled, self._on_binding)
+            if self._script_id is not None:
+                await tab.send(nd.cdp.page.remove_script_to_evaluate_on_new_document(self._script_id))
+            await tab.send(nd.cdp.runtime.remove_binding(name=BINDING_NAME))
+        except Exception:
+            pass
+        self.active = False
+
+    async def _on_binding(self, event):
+        """バインディング呼び出し（ページからのプッシュ）を受信"""
+        if getattr(event, 'name', None) != BINDING_NAME:
+            return
+        try:
+            message = json.loads(event.payload)
+        except (TypeError, ValueError):
+            return
+        async with self._condition:
+            self.state.update(message.get('state', {}))
+            self.event_count += 1
+            self._condition.notify_all()
+
+    async def wait_for(self, predicate, timeout, phase=None):
+        """状態がpredicateを満たすまで最大timeout秒待機し、満たしたかを返す
+
+        phaseを指定すると、固定待機（timeout秒）との差分を wait_report に記録する。
+        """
+        start = time.time()
+        if not self.active:
+            await asyncio.sleep(timeout)
+            satisfied = False
+        else:
+            try:
+                async with self._condition:
+                    await asyncio.wait_for(
+                        self._condition.wait_for(lambda: predicate(self.state)),
+                        timeout=timeout
+                    )
+                satisfied = True
+            except asyncio.TimeoutError:
+                satisfied = False
+
+        self._record(phase, timeout, start)
+        return satisfied
+
+    def _record(self, phase, timeout, start):
+        """固定待機（timeout秒）と実際の待機時間の差分を記録"""
+        if not phase:
+            return
+        elapsed = time.time() - start
+        self.wait_report.append({
+            'phase': phase,
+            'fixed_wait': timeout,
+            'actual_wait': elapsed,
+            'saved': max(0.0, timeout - elapsed)
+        })
+
+    async def wait_for_growth(self, previous_count, timeout, phase=None):
+        """商品数がprevious_countから増えて通信が落ち着く（または総商品数に到達する）まで待機"""
+        return await self.wait_for(
+            lambda s: (s['itemCount'] > previous_count and s['inflight'] == 0)
+            or (s['totalCount'] is not None and s['itemCount'] >= s['totalCount']),
+            timeout,
+            phase=phase
+        )
+
+    def log_wait_report(self):
+        """フェーズ別の待機時間削減レポートをログ出力"""
+        if not self.wait_report:
+            return
+        phases = {}
+        for entry in self.wait_report:
+            summary = phases.setdefault(entry['phase'], {'count': 0, 'fixed': 0.0, 'actual': 0.0})
+            summary['count'] += 1
+            summary['fixed'] += entry['fixed_wait']
+            summary['actual'] += entry['actual_wait']
+
+        self._log("\n    ⏱️ 待機時間レポート（固定待機との比較）:")
+        total_fixed = total_actual = 0.0
+        for phase, summary in phases.items():
+            total_fixed += summary['fixed']
+            total_actual += summary['actual']
+            self._log(
+                f"       - {phase}: {summary['fixed']:.1f}s → {summary['actual']:.1f}s "
+                f"(削減 {summary['fixed'] - summary['actual']:.1f}s, {summary['count']}回)"
+            )
+        self._log(f"       合計: {total_fixed:.1f}s → {total_actual:.1f}s (削減 {total_fixed - total_actual:.1f}s)")
+
+    def _log(self, message):
+        if self.logger:
+            self.logger.log(message)
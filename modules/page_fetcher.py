@@ -0,0 +1,83 @@
+"""
+残りページの並列取得（検索APIのページングリクエストをページ内から一括発行）
+"""
+import json
+import urllib.parse
+from .dom_probe import parse_probe_result
+
+
+# ページング位置・件数を表すクエリパラメータ名の候補
+OFFSET_PARAMS = ('offset', 'start', 'from', 'skip')
+PAGE_PARAMS = ('page', 'pageNumber', 'page_number', 'pageIndex')
+SIZE_PARAMS = ('pagesize', 'pageSize', 'page_size', 'limit', 'size', 'rows')
+
+# ページ内で複数のURLを同時実行数を制限してfetchし、JSONをまとめて返す
+FETCH_SCRIPT = '''
+(async (urls, concurrency) => {
+    const results = new Array(urls.length);
+    let next = 0;
+    async function worker() {
+        while (next < urls.length) {
+            const i = next++;
+            try {
+                const res = await fetch(urls[i], {credentials: 'include', headers: {'Accept': 'application/json'}});
+                results[i] = {url: urls[i], status: res.status, data: res.ok ? await res.json() : null};
+            } catch (e) {
+                results[i] = {url: urls[i], status: 0, data: null, error: String(e)};
+            }
+        }
+    }
+    await Promise.all(Array.from({length: Math.min(concurrency, urls.length)}, worker));
+    return JSON.stringify({results: results});
+})(%s, %d)
+'''
+
+
+def _find_param(params, candidates):
+    lowered = {key.lower(): key for key in params}
+    for name in candidates:
+        if name.lower() in lowered:
+            return lowered[name.lower()]
+    return None
+
+
+def plan_page_urls(api_url, total_items, page_size=None):
+    """1ページ目のAPI URLから残りページのURLを生成（ページング位置が特定できなければ空リスト）"""
+    parts = urllib.parse.urlsplit(api_url)
+    params = dict(urllib.parse.parse_qsl(parts.query, keep_blank_values=True))
+
+    size_param = _find_param(params, SIZE_PARAMS)
+    if size_param and params[size_param].isdigit() and int(params[size_param]) > 0:
+        page_size = int(params[size_param])
+    if not page_size or total_items <= page_size:
+        return []
+
+    offset_param = _find_param(params, OFFSET_PARAMS)
+    page_param = _find_param(params, PAGE_PARAMS)
+    if offset_param and params[offset_param].isdigit():
+        first = int(params[offset_param])
+        values = range(first + page_size, total_items, page_size)
+        param = offset_param
+    elif page_param and params[page_param].isdigit():
+        first = int(params[page_param])
+        pages = -(-total_items // page_size)
+        # 0始まりか1始まりかは1ページ目の値に合わせる
+        values = range(first + 1, first + pages)
+        param = page_param
+    else:
+        return []
+
+    urls = []
+    for value in values:
+        page_params = dict(params, **{param: str(value)})
+        urls.append(urllib.parse.urlunsplit(parts._replace(query=urllib.parse.urlencode(page_params))))
+    return urls
+
+
+async def fetch_pages(evaluate, tab, urls, concurrency=6):
+    """ページ内で複数のAPI URLを並列にfetchし、{url, status, data} のリストを返す"""
+    if not urls:
+        return []
+    script = FETCH_SCRIPT % (json.dumps(urls), max(1, concurrency))
+    raw = await evaluate(tab, script, await_promise=True)
+    return parse_probe_result(raw).get('results') or []
@@ -1,50 +1,126 @@
 """
 Phase 6.5: HTML解析機能
 """
+import contextlib
 import json
 import os
+import time
+import uuid
 from datetime import datetime
 from bs4 import BeautifulSoup
+from lxml import etree, html as lxml_html
 from .utils import create_logger
+from .file_handler import FileHandler
+from .metrics import RunTimer
+from .records import to_records
+
+
+def _class_xpath(class_name, tag='*'):
+    """class属性に指定クラスを含む最初の要素（BeautifulSoupのclass_指定と同じ判定）"""
+    return f"(.//{tag}[contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')])[1]"
+
+
+# lxmlエンジン用のプリコンパイル済みXPath（_extract_product_infoと同じ優先順）
+_XP_ITEMS = etree.XPath('//h-grid-result-item')
+_XP_FIRST_LINK = etree.XPath('(.//a)[1]')
+_XP_NAMES = [
+    etree.XPath('(.//h3)[1]'),
+    etree.XPath('(.//h2)[1]'),
+    etree.XPath(_class_xpath('product-name')),
+    etree.XPath(_class_xpath('product-title')),
+    etree.XPath(_class_xpath('title')),
+]
+_XP_PRICES = [
+    etree.XPath(_class_xpath('price')),
+    etree.XPath(_class_xpath('product-price')),
+    etree.XPath(_class_xpath('amount')),
+    etree.XPath(_class_xpath('price', 'span')),
+    etree.XPath(_class_xpath('price', 'div')),
+]
+_XP_COLOR_CLASS = etree.XPath(".//*[contains(concat(' ', normalize-space(@class), ' '), ' color ')]")
+_XP_COLOR_ATTR = etree.XPath('.//*[@data-color]')
+_XP_SKU_ATTR = etree.XPath('(.//*[@data-sku])[1]')
+_XP_SKU_CLASS = etree.XPath(_class_xpath('sku'))
+_XP_TEXT = etree.XPath('string()')
 
 
 class HermesParser:
-    """保存されたHTMLファイルを解析するクラス"""
+    """保存されたHTMLファイルを解析するクラス
+    
+    engine='lxml'（既定）はプリコンパイル済みXPathで抽出する高速版、
+    engine='bs4' はBeautifulSoupによる参照実装。出力形式は同一。
+    output_format='ndjson' の場合は1行1商品のNDJSONを抽出しながら書き出す（出力全体の文字列は
+    組み立てないが、商品DB・差分・結果キャッシュで使うため商品リスト self.products は保持する）。
+    """
+    
+    ENGINES = ('lxml', 'bs4')
+    OUTPUT_FORMATS = ('json', 'ndjson')
     
-    def __init__(self):
+    def __init__(self, output_file='hermes_products.json', workspace=None, timer=None, product_store=None,
+                 save_json=True, output_format='json'):
         self.logger = create_logger()
+        self.timer = timer or RunTimer()  # フェーズ別の所要時間（パイプラインと共有）
         self.products = []
+        self.stats = {}
+        self.workspace = workspace  # 実行単位の作業ディレクトリ（指定時はJSONをその中に保存）
+        self.output_format = output_format if output_format in self.OUTPUT_FORMATS else 'json'
+        if self.output_format == 'ndjson' and output_file.endswith('.json'):
+            output_file = f"{output_file[:-len('.json')]}.ndjson"
+        self.output_file = workspace.path(output_file) if workspace else output_file
+        self.product_store = product_store  # 指定時は商品DBにも保存（検索・履歴の参照元）
+        self.save_json = save_json  # JSONファイルとしても出力するか
+        self.run_id = workspace.run_id if workspace else f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        self.context = {}  # 商品DBに記録する実行情報（keyword, locale）
+        self._streamed = False  # 解析中にNDJSONを書き出し済みか
     
-    def parse_html_file(self, filename='hermes_page.html'):
+    def parse_html_file(self, filename='hermes_page.html', engine='lxml'):
         """HTMLファイルを解析して商品情報を抽出"""
         self.logger.log("\n=== Phase 6.5: HTML解析 ===")
         self.logger.log(f"対象ファイル: {filename}")
         
-        if not os.path.exists(filename):
+        if not FileHandler.file_exists(filename):
             self.logger.log(f"❌ ファイルが見つかりません: {filename}")
             return False
         
         try:
-            # HTMLファイルを読み込み
-            with open(filename, 'r', encoding='utf-8') as f:
-                html_content = f.read()
+            # HTMLファイルを読み込み（成果物ストアに圧縮保存されたファイルも透過的に読む）
+            html_content = FileHandler.read_text(filename)
             
             self.logger.log(f"✅ ファイル読み込み成功: {len(html_content):,} bytes")
             
-            # BeautifulSoupで解析
-            soup = BeautifulSoup(html_content, 'lxml')
-            
-            # 商品要素を検索
-            product_items = soup.find_all('h-grid-result-item')
-            self.logger.log(f"📊 検出された商品数: {len(product_items)}")
+        except Exception as e:
+            self.logger.log(f"❌ 解析エラー: {e}")
+            return False
+        
+        return self.parse_html(html_content, engine=engine)
+    
+    def parse_html(self, html_content, engine='lxml'):
+        """メモリ上のHTML文字列を解析して商品情報を抽出・保存"""
+        if engine not in self.ENGINES:
+            self.logger.log(f"❌ 未対応の解析エンジン: {engine}")
+            return False
+        
+        try:
+            start_time = time.time()
+            with self.timer.span('parse'):
+                if self.save_json and self.output_format == 'ndjson' and not self.products:
+                    # 抽出した商品から順に書き出す（JSON文書全体の文字列は組み立てない）
+                    self._write_ndjson(self._collect(self.iter_products(html_content, engine=engine)))
+                    self._streamed = True
+                else:
+                    self.products.extend(self.extract_products(html_content, engine=engine))
             
-            # 各商品の情報を抽出
-            for idx, item in enumerate(product_items):
-                product_data = self._extract_product_info(item, idx + 1)
-                if product_data:
-                    self.products.append(product_data)
+            unique_urls = {p['url'] for p in self.products if p['url'] != 'N/A'}
+            self.stats.update({
+                'html_bytes': len(html_content.encode('utf-8')),
+                'products': len(self.products),
+                'unique_products': len(unique_urls),
+                'parse_time': time.time() - start_time,
+                'engine': engine
+            })
             
             self.logger.log(f"\n✅ 解析完了: {len(self.products)}個の商品情報を抽出")
+            self.logger.log(f"📊 ユニーク商品数: {len(unique_urls)}")
             
             # 結果を保存
             self._save_results()
@@ -55,6 +131,144 @@ class HermesParser:
             self.logger.log(f"❌ 解析エラー: {e}")
             return False
     
+    @staticmethod
+    def count_unique_urls(html_content):
+        """HTML内の商品リンク（ユニーク）数を数える"""
+        if not html_content.strip():
+            return 0
+        root = lxml_html.fromstring(html_content)
+        unique_urls = set()
+        for item in _XP_ITEMS(root):
+            links = _XP_FIRST_LINK(item)
+            href = links[0].get('href') if links else None
+            if href:
+                unique_urls.add(href)
+        return len(unique_urls)
+    
+    def extract_products(self, html_content, engine='lxml'):
+        """HTML文字列から商品リストを抽出（ファイル保存なし）"""
+        return list(self.iter_products(html_content, engine=engine))
+    
+    def iter_products(self, html_content, engine='lxml'):
+        """HTML文字列から商品を1件ずつ抽出するジェネレータ（ファイル保存なし）"""
+        if engine == 'bs4':
+            # BeautifulSoupで解析（参照実装）
+            soup = BeautifulSoup(html_content, 'lxml')
+            product_items = soup.find_all('h-grid-result-item')
+            extract = self._extract_product_info
+        else:
+            # lxml + プリコンパイル済みXPathで解析（空のHTMLはlxmlがParserErrorになるため0件扱い）
+            product_items = _XP_ITEMS(lxml_html.fromstring(html_content)) if html_content.strip() else []
+            extract = self._extract_product_info_lxml
+        
+        self.logger.log(f"📊 検出された商品数: {len(product_items)} (engine={engine})")
+        
+        # 各商品の情報を抽出
+        try:
+            for idx, item in enumerate(product_items):
+                product_data = extract(item, idx + 1)
+                if product_data:
+                    yield product_data
+        finally:
+            self.logger.flush_samples()
+    
+    def _collect(self, products):
+        """商品を self.products に蓄積しながらそのまま流す（リスト自体は保持するためメモリは商品数に比例する）"""
+        for product in products:
+            self.products.append(product)
+            yield product
+    
+    def load_products(self, products, source="APIレスポンス"):
+        """スクレイパー側で構築済みの商品リスト（API/逐次取得）を取り込んで保存"""
+        self.logger.log(f"\n=== Phase 6.5: 商品データ取り込み ({source}) ===")
+        self.logger.log(f"📊 {source}から構築された商品数: {len(products)}")
+        
+        self.products = list(products)
+        self.stats.update({
+            'products': len(self.products),
+            'unique_products': len({p['url'] for p in self.products if p['url'] != 'N/A'}),
+            'source': source
+        })
+        self.logger.log(f"\n✅ 解析完了: {len(self.products)}個の商品情報を抽出")
+        
+        self._save_results()
+        return bool(self.products)
+    
+    @staticmethod
+    def products_from_api_payloads(payloads):
+        """検索APIのJSONレスポンスから商品リストを構築（HTML解析と同じ形式）"""
+        products = []
+        seen_urls = set()
+        
+        for payload in payloads:
+            for item in HermesParser._find_api_items(payload.get('data')):
+                product = HermesParser._api_item_to_product(item, len(products) + 1)
+                if product['url'] != 'N/A':
+                    if product['url'] in seen_urls:
+                        continue
+                    seen_urls.add(product['url'])
+                products.append(product)
+        
+        return products
+    
+    @staticmethod
+    def _find_api_items(data):
+        """JSON内の商品配列（sku + 名前を持つ辞書のリスト）を再帰的に探索"""
+        if isinstance(data, list):
+            if data and all(isinstance(x, dict) for x in data) and any(
+                'sku' in x and ('title' in x or 'name' in x) for x in data
+            ):
+                yield from data
+                return
+            for value in data:
+                yield from HermesParser._find_api_items(value)
+        elif isinstance(data, dict):
+            for value in data.values():
+                yield from HermesParser._find_api_items(value)
+    
+    @staticmethod
+    def _api_item_to_product(item, index):
+        """API商品オブジェクトを商品辞書に変換"""
+        product = {
+            'index': index,
+            'name': 'N/A',
+            'url': 'N/A',
+            'price': 'N/A',
+            'colors': [],
+            'sku': 'N/A'
+        }
+        
+        name = item.get('title') or item.get('name')
+        if isinstance(name, str) and name.strip():
+            product['name'] = name.strip()
+        
+        url = item.get('url') or item.get('productUrl') or item.get('link')
+        if isinstance(url, str) and url:
+            product['url'] = f"https://www.hermes.com{url}" if url.startswith('/') else url
+        
+        price = item.get('price')
+        if isinstance(price, dict):
+            price = price.get('formatted') or price.get('value') or price.get('amount')
+        if isinstance(price, (int, float)) and not isinstance(price, bool):
+            product['price'] = f"¥{int(price):,}"
+        elif isinstance(price, str) and price.strip():
+            product['price'] = price.strip()
+        
+        colors = item.get('colors') or item.get('color')
+        if isinstance(colors, (str, dict)):
+            colors = [colors]
+        for color in colors or []:
+            if isinstance(color, dict):
+                color = color.get('name') or color.get('label') or color.get('value')
+            if isinstance(color, str) and color.strip():
+                product['colors'].append(color.strip())
+        
+        sku = item.get('sku')
+        if sku:
+            product['sku'] = str(sku)
+        
+        return product
+    
     def _extract_product_info(self, item, index):
         """個別の商品情報を抽出"""
         try:
@@ -125,30 +339,137 @@ class HermesParser:
             return product
             
         except Exception as e:
-            self.logger.log(f"  ⚠️ 商品{index}の解析エラー: {e}")
+            self.logger.log_sampled('商品の解析エラー', f"  ⚠️ 商品{index}の解析エラー: {e}")
+            return None
+    
+    def _extract_product_info_lxml(self, item, index):
+        """個別の商品情報を抽出（lxml版、_extract_product_infoと同じ規則）"""
+        try:
+            product = {
+                'index': index,
+                'name': 'N/A',
+                'url': 'N/A',
+                'price': 'N/A',
+                'colors': [],
+                'sku': 'N/A'
+            }
+            
+            # 商品リンクとURL
+            links = _XP_FIRST_LINK(item)
+            href = links[0].get('href') if links else None
+            if href:
+                product['url'] = f"https://www.hermes.com{href}" if href.startswith('/') else href
+            
+            # 商品名（各候補の最初の要素のみを確認）
+            for xpath in _XP_NAMES:
+                elems = xpath(item)
+                if elems:
+                    text = _XP_TEXT(elems[0]).strip()
+                    if text:
+                        product['name'] = text
+                        break
+            
+            # 価格情報
+            for xpath in _XP_PRICES:
+                elems = xpath(item)
+                if elems:
+                    text = _XP_TEXT(elems[0]).strip()
+                    if text:
+                        product['price'] = text
+                        break
+            
+            # カラー情報
+            color_elements = _XP_COLOR_CLASS(item) or _XP_COLOR_ATTR(item)
+            for color_elem in color_elements:
+                color_value = color_elem.get('data-color') or _XP_TEXT(color_elem).strip()
+                if color_value:
+                    product['colors'].append(color_value)
+            
+            # SKU/商品ID
+            sku_elems = _XP_SKU_ATTR(item) or _XP_SKU_CLASS(item)
+            if sku_elems:
+                product['sku'] = sku_elems[0].get('data-sku') or _XP_TEXT(sku_elems[0]).strip()
+            
+            return product
+            
+        except Exception as e:
+            self.logger.log_sampled('商品の解析エラー', f"  ⚠️ 商品{index}の解析エラー: {e}")
             return None
     
     def _save_results(self):
-        """解析結果を保存"""
+        """解析結果を保存（商品DB・JSONファイル）"""
         if not self.products:
             self.logger.log("⚠️ 保存する商品データがありません")
             return
         
-        # JSON形式で保存
-        filename = 'hermes_products.json'
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump({
-                'extraction_date': datetime.now().isoformat(),
-                'total_products': len(self.products),
-                'products': self.products
-            }, f, ensure_ascii=False, indent=2)
+        if self.product_store is not None:
+            with self.timer.span('write_db'):
+                self.product_store.save_run(
+                    self.run_id,
+                    self.products,
+                    keyword=self.context.get('keyword'),
+                    locale=self.context.get('locale'),
+                    source=self.stats.get('source', 'HTML')
+                )
+            self.logger.log(f"🗄️ 商品DBに保存: {len(self.products)}件 (run_id: {self.run_id})")
+        
+        if not self.save_json:
+            return
+        
+        if self.output_format == 'ndjson':
+            if not self._streamed:
+                with self.timer.span('write_json'):
+                    self._write_ndjson(self.products)
+            self.logger.log(f"💾 NDJSONファイル保存: {self.output_file}")
+            return
+        
+        # JSON形式で保存（一時ファイルに書いてから置き換え、途中の内容を読まれないようにする）
+        filename = self.output_file
+        tmp_filename = f"{filename}.tmp"
+        with self.timer.span('write_json'):
+            with open(tmp_filename, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'extraction_date': datetime.now().isoformat(),
+                    'total_products': len(self.products),
+                    'products': self.products
+                }, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_filename, filename)
         
         self.logger.log(f"💾 JSONファイル保存: {filename}")
     
+    def _write_ndjson(self, products):
+        """商品を1行1件のNDJSONで書き出し、件数を返す（0件ならファイルを作らない）"""
+        filename = self.output_file
+        tmp_filename = f"{filename}.tmp"
+        count = 0
+        try:
+            with open(tmp_filename, 'w', encoding='utf-8') as f:
+                for product in products:
+                    f.write(json.dumps(product, ensure_ascii=False))
+                    f.write('\n')
+                    count += 1
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(tmp_filename)
+            raise
+        if count:
+            os.replace(tmp_filename, filename)
+        else:
+            os.remove(tmp_filename)
+        return count
+    
     def get_results(self):
         """解析結果を取得"""
         return self.logger.get_results()
     
     def get_products(self):
         """抽出した商品リストを取得"""
-        return self.products
\ No newline at end of file
+        return self.products
+    
+    def get_records(self):
+        """抽出した商品をProductRecord（価格は整数と通貨コード、値なしはNone）のリストで取得"""
+        return to_records(self.products)
+    
+    def get_stats(self):
+        """解析統計（商品数・ユニーク数・HTMLサイズ・解析時間）を取得"""
+        return self.stats
\ No newline at end of file
@@ -5,9 +5,25 @@ import sys
 import os
 import subprocess
 import shutil
+import threading
+import time
+from datetime import datetime
 from .utils import create_logger, format_timestamp
 
 
+# 環境チェック結果のキャッシュ（有効期限: 秒）
+ENV_CHECK_TTL = int(os.environ.get("ENV_CHECK_TTL", "3600"))
+
+_cache = {
+    'ok': None,
+    'results': [],
+    'checked_at': None,
+    'duration': None,
+}
+_cache_lock = threading.Lock()
+_refreshing = threading.Event()
+
+
 def check_environment():
     """Phase 1-5の環境チェックを実行"""
     logger = create_logger()
@@ -87,4 +103,70 @@ def check_environment():
     else:
         logger.log("⚠️ 一部のPhaseでエラーがありました")
     
-    return all_phases_ok, logger.get_results()
\ No newline at end of file
+    return all_phases_ok, logger.get_results()
+
+
+def _run_check():
+    """環境チェックを実行してキャッシュに格納（_cache_lock取得済みで呼ぶ）"""
+    start_time = time.time()
+    ok, results = check_environment()
+    _cache.update({
+        'ok': ok,
+        'results': results,
+        'checked_at': time.time(),
+        'duration': time.time() - start_time,
+    })
+    return ok, results
+
+
+def refresh_environment_cache():
+    """環境チェックを実行してキャッシュを更新"""
+    with _cache_lock:
+        return _run_check()
+
+
+def _refresh_in_background():
+    """期限切れキャッシュをバックグラウンドで更新（多重起動しない）"""
+    if _refreshing.is_set():
+        return
+    _refreshing.set()
+
+    def worker():
+        try:
+            refresh_environment_cache()
+        finally:
+            _refreshing.clear()
+
+    threading.Thread(target=worker, name='env-check-refresh', daemon=True).start()
+
+
+def check_environment_cached(ttl=None):
+    """キャッシュ済みの環境チェック結果を返す（check_environment()と同じ戻り値）
+
+    未実行の場合のみその場でチェックする。期限切れの場合は前回の結果を返しつつ
+    バックグラウンドで再チェックするため、呼び出し側が待たされることはない。
+    """
+    ttl = ENV_CHECK_TTL if ttl is None else ttl
+    if _cache['checked_at'] is None:
+        with _cache_lock:
+            if _cache['checked_at'] is None:
+                _run_check()
+    elif time.time() - _cache['checked_at'] > ttl:
+        _refresh_in_background()
+
+    return _cache['ok'], list(_cache['results'])
+
+
+def get_environment_status():
+    """キャッシュされた環境チェックの状態を取得"""
+    checked_at = _cache['checked_at']
+    age = time.time() - checked_at if checked_at is not None else None
+    return {
+        'ok': _cache['ok'],
+        'checked_at': datetime.fromtimestamp(checked_at).isoformat() if checked_at is not None else None,
+        'age_seconds': age,
+        'ttl_seconds': ENV_CHECK_TTL,
+        'stale': age is None or age > ENV_CHECK_TTL,
+        'refreshing': _refreshing.is_set(),
+        'check_duration': _cache['duration'],
+    }
@@ -0,0 +1,188 @@
+"""
+Phase 6.0 + 6.5: スクレイピングから商品抽出までの一括パイプライン
+"""
+import asyncio
+import time
+from .scraper import HermesScraper
+from .parser import HermesParser
+from .metrics import RunTimer
+
+
+class ScrapePipeline:
+    """スクレイパーが取得したHTML（またはAPI/逐次取得の商品）を1回だけ解析して商品を返すクラス
+
+    HTMLはメモリ上で受け渡すため、ファイルへの書き出しと再読み込み・再解析は発生しない。
+    HTMLファイルは save_html=True の場合のみ副出力として保存される。
+    """
+
+    def __init__(self, browser_pool=None, capture_api=False, harvest=False, save_html=True, engine='lxml',
+                 browser=None, html_filename='hermes_page.html', json_filename='hermes_products.json',
+                 resource_profile='default', parallel_pages=False, workspace=None, timer=None,
+                 delta_index=None, product_store=None, save_json=True, output_format='json', on_products=None):
+        # スクレイパーと解析で計測を共有し、実行全体のフェーズ別内訳を作る
+        self.timer = timer or RunTimer()
+        self.scraper = HermesScraper(
+            browser_pool=browser_pool,
+            capture_api=capture_api,
+            harvest=harvest,
+            save_html=save_html,
+            browser=browser,
+            html_filename=html_filename,
+            resource_profile=resource_profile,
+            parallel_pages=parallel_pages,
+            workspace=workspace,
+            timer=self.timer
+        )
+        self.parser = HermesParser(
+            output_file=json_filename,
+            workspace=workspace,
+            timer=self.timer,
+            product_store=product_store,
+            save_json=save_json,
+            output_format=output_format
+        )
+        self.workspace = workspace
+        self.delta_index = delta_index  # 指定時は前回の実行からの差分（追加・削除・価格変更）を算出
+        self.delta = None
+        self.on_products = on_products  # 逐次取得モードで新しく出現した商品（差分リスト）を受け取る関数
+        self.engine = engine
+        self.scrape_success = False
+        self.parse_success = False
+        self.stats = {}
+
+    async def run(self, search_keyword="バッグ", url=None, locale="jp/ja"):
+        """スクレイピングと解析を実行し、成功したかを返す"""
+        start_time = time.time()
+        self.parser.context.update(keyword=search_keyword, locale=locale)
+        try:
+            if self.scraper.harvest:
+                # 読み込み中に出現した商品をスクレイピングの完了を待たずに渡す
+                async for delta in self.scraper.iter_harvest(url=url, search_keyword=search_keyword, locale=locale):
+                    if self.on_products is not None:
+                        self.on_products(delta)
+                self.scrape_success = self.scraper.harvest_success
+            else:
+                self.scrape_success = await self.scraper.scrape_hermes_site(
+                    url=url, search_keyword=search_keyword, locale=locale
+                )
+            scrape_time = time.time() - start_time
+
+            if self.scrape_success:
+                # 解析はCPU処理のため、ブラウザ操作中のイベントループを塞がないようスレッドで実行
+                loop = asyncio.get_running_loop()
+                self.parse_success = await loop.run_in_executor(None, self._parse)
+                if self.parse_success and self.delta_index is not None:
+                    self.delta = await loop.run_in_executor(None, self._update_delta, search_keyword, locale)
+        finally:
+            status = 'success' if self.scrape_success and self.parse_success else 'error'
+            # 成否にかかわらず作業ディレクトリを確定（確定後のパスでファイルを参照できる）
+            if self.workspace is not None:
+                with self.timer.span('finalize'):
+                    self.workspace.finalize(
+                        status=status,
+                        metadata={
+                            'keyword': search_keyword,
+                            'locale': locale,
+                            'html_file': self.scraper.html_file,
+                            'delta': self.delta['counts'] if self.delta else None
+                        }
+                    )
+            self.timer.count('items_loaded', len(self.parser.get_products()))
+            self.timer.registry.inc('hermes_runs_total', status=status)
+
+        self.stats = dict(self.parser.get_stats())
+        self.stats.update({
+            'run_id': self.run_id,
+            'keyword': search_keyword,
+            'locale': locale,
+            'total_items': self.scraper.total_items,
+            'scrape_time': scrape_time,
+            'total_time': time.time() - start_time,
+            'evaluate_calls': self.scraper.evaluate_calls,
+            'page_load_time': self.scraper.page_load_time,
+            'load_more': self.scraper.load_stats,
+            'resources': self.scraper.resource_blocker.get_stats(),
+            'timings': self.timer.breakdown(),
+            'delta': self.delta['counts'] if self.delta else None
+        })
+        return self.scrape_success and self.parse_success
+
+    def _parse(self):
+        """スクレイパーの出力元に応じて1回だけ解析"""
+        if self.scraper.api_products:
+            success = self.parser.load_products(self.scraper.api_products, source="APIレスポンス")
+        elif self.scraper.harvested:
+            success = self.parser.load_products(self.scraper.get_harvested_products(), source="逐次取得")
+        elif self.scraper.html_content is not None:
+            self.parser.logger.log("\n=== Phase 6.5: HTML解析 ===")
+            self.parser.logger.log("対象: スクレイパーから受け取ったHTML（メモリ上）")
+            success = self.parser.parse_html(self.scraper.html_content, engine=self.engine)
+            # 解析後は大きなHTML文字列を保持しない
+            self.scraper.html_content = None
+        else:
+            self.parser.logger.log("❌ 解析対象のデータがありません")
+            return False
+
+        # 総商品数との比較
+        total_items = self.scraper.total_items
+        unique_products = self.parser.get_stats().get('unique_products', 0)
+        if success and total_items > 0 and unique_products < total_items:
+            self.parser.logger.log(f"⚠️ 取得率: {unique_products}/{total_items} ({unique_products/total_items*100:.1f}%)")
+        return success
+
+    @property
+    def partial(self):
+        """部分結果か（途中で失敗した逐次取得、または検出した総商品数に届いていない）"""
+        total_items = self.scraper.total_items
+        unique_products = self.parser.get_stats().get('unique_products', 0)
+        return self.scraper.partial or (total_items > 0 and unique_products < total_items)
+
+    def _update_delta(self, search_keyword, locale):
+        """前回の状態と比較して差分を算出し、状態を今回の商品に更新（部分結果では状態を更新しない）"""
+        partial = self.partial
+        with self.timer.span('delta'):
+            delta = self.delta_index.update(
+                search_keyword, self.parser.get_products(), run_id=self.run_id, locale=locale, partial=partial
+            )
+        counts = delta['counts']
+        self.parser.logger.log(
+            f"🔀 前回からの差分: 追加 {counts['added']} / 削除 {counts['removed']} / 価格変更 {counts['price_changed']}"
+            + ("（初回）" if delta['initial'] else "")
+            + ("（部分結果のため削除は判定せず、状態は更新しません）" if partial else "")
+        )
+        return delta
+
+    def get_products(self):
+        """抽出した商品リストを取得"""
+        return self.parser.get_products()
+
+    def get_stats(self):
+        """実行統計を取得"""
+        return self.stats
+
+    def get_scraper_results(self):
+        """スクレイピングのログを取得"""
+        return self.scraper.get_results()
+
+    def get_parser_results(self):
+        """解析のログを取得"""
+        return self.parser.get_results()
+
+    @property
+    def run_id(self):
+        """実行ID（作業ディレクトリ使用時はその実行ID、商品DBの記録にも使う）"""
+        return self.parser.run_id
+
+    @property
+    def html_file(self):
+        """保存したHTMLファイル（保存しなかった場合はNone）"""
+        return self.scraper.html_file
+
+    @property
+    def json_file(self):
+        """保存したJSON/NDJSONファイル（商品がなかった・ファイルを出力しない場合はNone）"""
+        if not self.parser.get_products() or not self.parser.save_json:
+            return None
+        if self.workspace is not None:
+            return self.workspace.final_path(self.parser.output_file)
+        return self.parser.output_file
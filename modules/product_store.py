@@ -0,0 +1,299 @@
+"""
+商品データの永続化（SQLite、WALモード・一括挿入・検索用インデックス）
+"""
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+from .records import MISSING, ProductRecord
+
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    keyword TEXT,
+    locale TEXT,
+    source TEXT,
+    extracted_at REAL NOT NULL,
+    total_products INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS products (
+    id INTEGER PRIMARY KEY,
+    run_id TEXT NOT NULL,
+    keyword TEXT,
+    locale TEXT,
+    extracted_at REAL NOT NULL,
+    position INTEGER,
+    name TEXT,
+    url TEXT,
+    sku TEXT,
+    price_text TEXT,
+    price INTEGER,
+    currency TEXT,
+    colors TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_products_sku ON products (sku);
+CREATE INDEX IF NOT EXISTS idx_products_url ON products (url);
+CREATE INDEX IF NOT EXISTS idx_products_keyword_time ON products (keyword, extracted_at);
+CREATE INDEX IF NOT EXISTS idx_products_time ON products (extracted_at);
+CREATE INDEX IF NOT EXISTS idx_products_run_position ON products (run_id, position);
+'''
+
+_COLUMNS = ('run_id', 'keyword', 'locale', 'extracted_at', 'position', 'name', 'url', 'sku',
+            'price_text', 'price', 'currency', 'colors')
+
+
+def _to_timestamp(value):
+    """ISO形式の日時またはUNIX時刻をUNIX時刻に変換"""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def _row_to_product(row):
+    """検索結果の行を商品辞書（解析結果と同じ形式の項目 + 実行情報）に変換"""
+    return {
+        'name': MISSING if row['name'] is None else row['name'],
+        'url': MISSING if row['url'] is None else row['url'],
+        'price': MISSING if row['price_text'] is None else row['price_text'],
+        'colors': json.loads(row['colors']) if row['colors'] else [],
+        'sku': MISSING if row['sku'] is None else row['sku'],
+        'price_minor': row['price'],
+        'currency': row['currency'],
+        'keyword': row['keyword'],
+        'locale': row['locale'],
+        'run_id': row['run_id'],
+        'extracted_at': datetime.fromtimestamp(row['extracted_at']).isoformat(),
+    }
+
+
+class ProductStore:
+    """抽出した商品を実行単位で蓄積するSQLiteストア
+
+    WALモードのため書き込み中も検索はブロックされない。接続はスレッドごとに持ち、
+    書き込みはプロセス内でロックして1トランザクションずつ行う。1回の実行の商品は
+    batch_size件ずつ executemany でまとめて挿入する。price 列と検索の min_price / max_price は
+    最小通貨単位の整数（円・セント・ペンス）。
+    """
+
+    def __init__(self, path='hermes_products.db', batch_size=1000):
+        self.path = path
+        self.batch_size = batch_size
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._write_lock:
+            self._connection().executescript(_SCHEMA)
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    # --- 書き込み ---
+
+    def save_run(self, run_id, products, keyword=None, locale=None, source=None, extracted_at=None):
+        """1回の実行の商品（解析結果の辞書またはProductRecord）を保存（同じrun_idの既存データは置き換える）し、保存件数を返す"""
+        extracted_at = extracted_at or time.time()
+        conn = self._connection()
+        with self._write_lock, conn:
+            conn.execute('DELETE FROM products WHERE run_id = ?', (run_id,))
+            conn.execute(
+                'INSERT OR REPLACE INTO runs (run_id, keyword, locale, source, extracted_at, total_products) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (run_id, keyword, locale, source, extracted_at, len(products))
+            )
+            insert = f"INSERT INTO products ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})"
+            for start in range(0, len(products), self.batch_size):
+                conn.executemany(insert, [
+                    self._product_row(run_id, keyword, locale, extracted_at, position, product)
+                    for position, product in enumerate(products[start:start + self.batch_size], start + 1)
+                ])
+        return len(products)
+
+    @staticmethod
+    def _product_row(run_id, keyword, locale, extracted_at, position, product):
+        # レコードは解析済みの価格をそのまま使い、辞書はここで1回だけ解析する
+        record = product if isinstance(product, ProductRecord) else ProductRecord.from_dict(product)
+        return (
+            run_id, keyword, locale, extracted_at, position if record.index is None else record.index,
+            record.name, record.url, record.sku,
+            record.price_text, record.price, record.currency,
+            json.dumps(list(record.colors), ensure_ascii=False),
+        )
+
+    def delete_run(self, run_id):
+        conn = self._connection()
+        with self._write_lock, conn:
+            conn.execute('DELETE FROM products WHERE run_id = ?', (run_id,))
+            deleted = conn.execute('DELETE FROM runs WHERE run_id = ?', (run_id,)).rowcount
+        return deleted > 0
+
+    # --- 検索 ---
+
+    def query(self, keyword=None, locale=None, sku=None, url=None, name=None, min_price=None,
+              max_price=None, currency=None, since=None, until=None, run_id=None, latest=True,
+              limit=100, offset=0):
+        """条件に合う商品を (総件数, 商品リスト) で返す
+
+        latest=True の場合、同じ商品（URL、なければSKU）は条件に合う中で最後に取得したものだけを返す。
+        since / until はISO形式の日時またはUNIX時刻。結果は取得日時の新しい順。
+        min_price / max_price は通貨ごとの最小単位のため、指定時は currency も必要（なければValueError）。
+        """
+        if (min_price is not None or max_price is not None) and not currency:
+            raise ValueError("min_price / max_price を指定する場合は currency も指定してください")
+        conditions = []
+        params = []
+        for column, value in (('keyword', keyword), ('locale', locale), ('sku', sku), ('url', url),
+                              ('currency', currency), ('run_id', run_id)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        if name:
+            conditions.append("name LIKE ?")
+            params.append(f"%{name}%")
+        if min_price is not None:
+            conditions.append("price >= ?")
+            params.append(min_price)
+        if max_price is not None:
+            conditions.append("price <= ?")
+            params.append(max_price)
+        if since is not None:
+            conditions.append("extracted_at >= ?")
+            params.append(_to_timestamp(since))
+        if until is not None:
+            conditions.append("extracted_at < ?")
+            params.append(_to_timestamp(until))
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+
+        if latest:
+            source = (
+                f"SELECT * FROM products WHERE id IN ("
+                f"SELECT MAX(id) FROM products {where} GROUP BY COALESCE(url, sku, 'id:' || id))"
+            )
+        else:
+            source = f"SELECT * FROM products {where}"
+
+        conn = self._connection()
+        total = conn.execute(f"SELECT COUNT(*) FROM ({source})", params).fetchone()[0]
+        rows = conn.execute(
+            f"SELECT * FROM ({source}) ORDER BY extracted_at DESC, position ASC LIMIT ? OFFSET ?",
+            params + [max(0, limit), max(0, offset)]
+        ).fetchall()
+        return total, [_row_to_product(row) for row in rows]
+
+    def has_run(self, run_id):
+        return self._connection().execute('SELECT 1 FROM runs WHERE run_id = ?', (run_id,)).fetchone() is not None
+
+    def get_run_products(self, run_id):
+        """1回の実行の商品を取得順に返す（解析結果と同じ項目のみ、実行がなければNone）"""
+        if not self.has_run(run_id):
+            return None
+        return list(self.iter_run_products(run_id))
+
+    def iter_run_products(self, run_id, batch_size=None):
+        """1回の実行の商品を取得順に解析結果と同じ形式の辞書で返すジェネレータ"""
+        for record in self.iter_run_records(run_id, batch_size=batch_size):
+            yield record.to_dict()
+
+    def iter_run_records(self, run_id, batch_size=None):
+        """1回の実行の商品を取得順に batch_size 件ずつ読み出し、ProductRecordで返すジェネレータ
+
+        バッチごとに (position, id) の続きから検索し直すため、読み出し中にカーソルを保持せず、
+        呼び出しごとに別スレッドで進めてもよい（StreamingResponse からの逐次読み出し用）。
+        """
+        batch_size = batch_size or self.batch_size
+        position, last_id = -1, -1
+        while True:
+            rows = self._connection().execute(
+                'SELECT * FROM products WHERE run_id = ? AND (position, id) > (?, ?) '
+                'ORDER BY position, id LIMIT ?',
+                (run_id, position, last_id, batch_size)
+            ).fetchall()
+            for row in rows:
+                yield ProductRecord(
+                    index=row['position'],
+                    name=row['name'],
+                    url=row['url'],
+                    sku=row['sku'],
+                    price_text=row['price_text'],
+                    price=row['price'],
+                    currency=row['currency'] and sys.intern(row['currency']),
+                    colors=tuple(sys.intern(color) for color in json.loads(row['colors'])) if row['colors'] else (),
+                )
+            if len(rows) < batch_size:
+                return
+            position, last_id = rows[-1]['position'], rows[-1]['id']
+
+    def export_json(self, run_id, filename):
+        """1回の実行の商品を解析結果と同じ形式のJSONファイルに書き出す"""
+        products = self.get_run_products(run_id)
+        if products is None:
+            return None
+        run = self.list_runs(run_id=run_id)[0]
+        tmp_filename = f"{filename}.tmp"
+        with open(tmp_filename, 'w', encoding='utf-8') as f:
+            json.dump({
+                'extraction_date': run['extracted_at'],
+                'total_products': len(products),
+                'products': products
+            }, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_filename, filename)
+        return filename
+
+    def list_runs(self, keyword=None, run_id=None, limit=50):
+        """保存済みの実行（新しい順）"""
+        conditions, params = [], []
+        if keyword is not None:
+            conditions.append('keyword = ?')
+            params.append(keyword)
+        if run_id is not None:
+            conditions.append('run_id = ?')
+            params.append(run_id)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        rows = self._connection().execute(
+            f"SELECT * FROM runs {where} ORDER BY extracted_at DESC LIMIT ?", params + [limit]
+        ).fetchall()
+        return [
+            dict(row, extracted_at=datetime.fromtimestamp(row['extracted_at']).isoformat())
+            for row in rows
+        ]
+
+    def get_stats(self):
+        conn = self._connection()
+        return {
+            'path': self.path,
+            'runs': conn.execute('SELECT COUNT(*) FROM runs').fetchone()[0],
+            'products': conn.execute('SELECT COUNT(*) FROM products').fetchone()[0],
+            'distinct_products': conn.execute(
+                'SELECT COUNT(DISTINCT COALESCE(url, sku)) FROM products'
+            ).fetchone()[0],
+            'size_bytes': sum(
+                os.path.getsize(path) for path in (self.path, f"{self.path}-wal") if os.path.exists(path)
+            ),
+        }
+
+
+_default_store = None
+_default_lock = threading.Lock()
+
+
+def get_product_store():
+    """プロセス共有の商品ストア（保存先は環境変数 PRODUCT_DB、既定: hermes_products.db）"""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = ProductStore(os.environ.get("PRODUCT_DB", "hermes_products.db"))
+        return _default_store
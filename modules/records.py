@@ -0,0 +1,139 @@
+"""
+商品レコード（__slots__ による省メモリな商品表現、価格は最小通貨単位の整数と通貨コードで保持）
+"""
+import json
+import re
+import sys
+from decimal import Decimal, ROUND_HALF_UP
+from functools import lru_cache
+
+
+MISSING = 'N/A'  # 解析結果の辞書で「値なし」を表す文字列
+
+_CURRENCY_SYMBOLS = {'¥': 'JPY', '￥': 'JPY', '円': 'JPY', '€': 'EUR', '$': 'USD', '£': 'GBP'}
+# 通貨ごとの小数桁数（ISO 4217）。金額は 10**桁数 倍した整数（円・セント・ペンス）で保持する
+_MINOR_UNITS = {'JPY': 0, 'EUR': 2, 'USD': 2, 'GBP': 2}
+_DEFAULT_MINOR_UNIT = 2
+_NUMBER = re.compile(r'\d[\d,.\s\u00a0\u202f]*')
+
+
+def parse_price(text):
+    """表示価格を (最小通貨単位の整数, 通貨コード) に変換（"¥1,234,000" → (1234000, 'JPY')、"€2.450,50" → (245050, 'EUR')、読み取れなければ (None, None)）"""
+    if not isinstance(text, str):
+        return None, None
+    match = _NUMBER.search(text)
+    if match is None:
+        return None, None
+    number = re.sub(r'[\s\u00a0\u202f]', '', match.group()).rstrip(',.')
+    # 区切り文字が2種類ある場合は後ろの方が小数点（"1,234.50" / "2.450,00"）
+    # 1種類の場合は末尾が1〜2桁の時だけ小数点とみなす（"¥1,234,000" / "2450,5"）
+    decimal = None
+    if ',' in number and '.' in number:
+        decimal = max(',', '.', key=number.rfind)
+    else:
+        for separator in (',', '.'):
+            head, _, tail = number.rpartition(separator)
+            if head and number.count(separator) == 1 and len(tail) in (1, 2):
+                decimal = separator
+    if decimal is not None:
+        integer, _, fraction = number.rpartition(decimal)
+        number = f"{re.sub(r'[,.]', '', integer)}.{fraction}"
+    else:
+        number = re.sub(r'[,.]', '', number)
+    currency = next((code for symbol, code in _CURRENCY_SYMBOLS.items() if symbol in text), None)
+    exponent = _MINOR_UNITS.get(currency, _DEFAULT_MINOR_UNIT)
+    amount = int((Decimal(number) * 10 ** exponent).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+    return amount, currency
+
+
+@lru_cache(maxsize=8192)
+def _parse_price_cached(text):
+    # 同じ表示価格が繰り返し現れるため、解析結果と文字列自体を共有する
+    price, currency = parse_price(text)
+    return sys.intern(text), price, sys.intern(currency) if currency else None
+
+
+def _optional(value):
+    return None if value is None or value == MISSING or value == '' else value
+
+
+class ProductRecord:
+    """1商品分のレコード
+
+    値がない項目は None、価格は price（最小通貨単位の整数、円なら円・ユーロならセント）と currency（通貨コード）に解析済みで、
+    表示用の文字列は price_text に残す。カラーと通貨・表示価格の文字列はインターンして
+    商品間で共有する。to_dict() / from_dict() は解析結果の辞書（'N/A' を含む従来形式）と相互変換する。
+    """
+
+    __slots__ = ('index', 'name', 'url', 'sku', 'price_text', 'price', 'currency', 'colors')
+
+    def __init__(self, index=None, name=None, url=None, sku=None, price_text=None, price=None,
+                 currency=None, colors=()):
+        self.index = index
+        self.name = name
+        self.url = url
+        self.sku = sku
+        self.price_text = price_text
+        self.price = price
+        self.currency = currency
+        self.colors = colors  # インターン済み文字列のタプル
+
+    @classmethod
+    def from_dict(cls, product):
+        """解析結果の辞書からレコードを作成（'N/A' は None、価格は解析して保持）"""
+        price_text = _optional(product.get('price'))
+        if price_text is not None:
+            price_text, price, currency = _parse_price_cached(price_text)
+        else:
+            price, currency = None, None
+        sku = _optional(product.get('sku'))
+        return cls(
+            index=product.get('index'),
+            name=_optional(product.get('name')),
+            url=_optional(product.get('url')),
+            sku=str(sku) if sku is not None else None,
+            price_text=price_text,
+            price=price,
+            currency=currency,
+            colors=tuple(sys.intern(color) for color in product.get('colors') or ()),
+        )
+
+    def to_dict(self):
+        """解析結果と同じ形式の辞書に変換（APIレスポンス・JSON出力との互換用）"""
+        return {
+            'index': self.index,
+            'name': MISSING if self.name is None else self.name,
+            'url': MISSING if self.url is None else self.url,
+            'price': MISSING if self.price_text is None else self.price_text,
+            'colors': list(self.colors),
+            'sku': MISSING if self.sku is None else self.sku,
+        }
+
+    @classmethod
+    def from_json(cls, text):
+        return cls.from_dict(json.loads(text))
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), ensure_ascii=False)
+
+    def __eq__(self, other):
+        if not isinstance(other, ProductRecord):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"ProductRecord({fields})"
+
+
+def to_records(products):
+    """解析結果の辞書（またはレコード）のリストをレコードのリストに変換"""
+    return [
+        product if isinstance(product, ProductRecord) else ProductRecord.from_dict(product)
+        for product in products
+    ]
+
+
+def to_dicts(records):
+    """レコードのリストを解析結果と同じ形式の辞書のリストに変換"""
+    return [record.to_dict() for record in records]
@@ -0,0 +1,316 @@
+"""
+保存済みHTMLスナップショットの一括再解析（プロセスプールで並列実行、中断後の再開に対応）
+
+解析規則を修正した後、過去の hermes_page*.html をまとめて抽出し直す:
+    python -m modules.reparse                          # 全スナップショット → reparse/ に出力
+    python -m modules.reparse --workers 4 --write-db   # 商品DBの該当実行も置き換える
+    python -m modules.reparse --fresh                  # 進捗を破棄して最初からやり直す
+集計（items/s・並列効果）は output_dir/reparse_summary.json にも保存される。
+"""
+import argparse
+import fnmatch
+import glob
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from .artifact_store import get_artifact_store
+from .utils import create_logger, set_console_level
+from .workspace import RunWorkspace, RUNS_ROOT
+
+
+SNAPSHOT_PATTERN = 'hermes_page*.html'
+PROGRESS_FILE = 'reparse_progress.jsonl'
+SUMMARY_FILE = 'reparse_summary.json'
+
+
+def find_snapshots(pattern=SNAPSHOT_PATTERN, runs_root=None):
+    """再解析の対象となるHTMLスナップショット（作業ディレクトリ・実行ディレクトリ・成果物ストア内）を名前順で返す"""
+    runs_root = runs_root or RUNS_ROOT
+    names = set(glob.glob(pattern))
+    names.update(glob.glob(os.path.join(runs_root, '*', pattern)))
+    names.update(
+        entry['name'] for entry in get_artifact_store().list_entries()
+        if fnmatch.fnmatch(os.path.basename(entry['name']), pattern)
+    )
+    return sorted(names)
+
+
+def snapshot_task(path, runs_root=None):
+    """スナップショット1件分の解析条件（出力名・商品DBの実行ID・キーワード）
+
+    実行ディレクトリ内のHTMLは元の実行IDとマニフェストのキーワードを引き継ぎ、商品DBの
+    その実行を置き換える。それ以外は "hermes_page_<日時>_<ワーカー>" の接尾辞を識別子にする。
+    """
+    runs_root = runs_root or RUNS_ROOT
+    directory, name = os.path.split(path)
+    stem = os.path.splitext(name)[0]
+    suffix = stem[len('hermes_page'):].strip('_') if stem.startswith('hermes_page') else stem
+    task = {'path': path, 'keyword': None, 'locale': None}
+    if directory and os.path.abspath(os.path.dirname(directory)) == os.path.abspath(runs_root):
+        run_id = os.path.basename(directory)
+        manifest = RunWorkspace.load_manifest(run_id, root=runs_root) or {}
+        task.update(
+            snapshot_id=f"{run_id}_{suffix}" if suffix else run_id,
+            run_id=run_id,
+            keyword=manifest.get('keyword'),
+            locale=manifest.get('locale'),
+        )
+    else:
+        snapshot_id = suffix or stem
+        task.update(snapshot_id=snapshot_id, run_id=f"reparse_{snapshot_id}")
+    return task
+
+
+def _init_worker():
+    # 子プロセスは件数が多いため、標準出力には警告・エラーのみ出す
+    set_console_level(logging.WARNING)
+
+
+def _reparse_snapshot(task, output_dir, engine, output_format, save_json, db_path):
+    """子プロセスで1件を解析し、出力先と商品数を返す"""
+    from .parser import HermesParser
+    from .product_store import ProductStore
+
+    parser = HermesParser(
+        output_file=os.path.join(output_dir, f"hermes_products_{task['snapshot_id']}.json"),
+        product_store=ProductStore(db_path) if db_path else None,
+        save_json=save_json,
+        output_format=output_format
+    )
+    parser.run_id = task['run_id']
+    parser.context.update(keyword=task['keyword'], locale=task['locale'])
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    success = parser.parse_html_file(task['path'], engine=engine)
+    return {
+        'snapshot': task['path'],
+        'status': 'success' if success else 'error',
+        'output': parser.output_file if success and save_json and parser.get_products() else None,
+        'run_id': parser.run_id,
+        'products': len(parser.get_products()),
+        'seconds': time.perf_counter() - start,
+        'cpu_seconds': time.process_time() - cpu_start,
+        'pid': os.getpid(),
+    }
+
+
+class BulkReparser:
+    """HTMLスナップショットをプロセスプールに振り分けて再解析するクラス
+
+    スナップショットごとに output_dir/hermes_products_<識別子>.json（と指定時は商品DB）へ出力し、
+    完了した分を output_dir/reparse_progress.jsonl に1行ずつ記録する。中断・失敗した実行を
+    同じ output_dir で再実行すると記録済みのスナップショットは飛ばす。全件成功した時点で
+    進捗は破棄されるため、次の実行は全件を解析し直す。
+    """
+
+    def __init__(self, output_dir='reparse', workers=None, engine='lxml', output_format='json',
+                 save_json=True, db_path=None, runs_root=None):
+        self.output_dir = output_dir
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.engine = engine
+        self.output_format = output_format
+        self.save_json = save_json
+        self.db_path = db_path  # 指定時は商品DBにも保存（実行ディレクトリ内のHTMLは元の実行を置き換える）
+        self.runs_root = runs_root or RUNS_ROOT
+        self.progress_file = os.path.join(output_dir, PROGRESS_FILE)
+        self.logger = create_logger()
+        self.stats = {}
+
+    def load_progress(self):
+        """記録済みの結果を {スナップショット: 結果} で返す（失敗した分は含めず再試行する）"""
+        done = {}
+        if not os.path.exists(self.progress_file):
+            return done
+        with open(self.progress_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # 中断時に書きかけになった行
+                if entry.get('status') == 'success':
+                    done[entry['snapshot']] = entry
+        return done
+
+    def reset(self):
+        """記録済みの進捗を破棄（次回は全件を解析し直す）"""
+        if os.path.exists(self.progress_file):
+            os.remove(self.progress_file)
+
+    def run(self, snapshots=None, resume=True):
+        """スナップショットを並列に再解析し、集計結果を返す"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        summary_file = os.path.join(self.output_dir, SUMMARY_FILE)
+        if os.path.exists(summary_file):
+            os.remove(summary_file)  # 途中で終了した場合に前回の集計を返さない
+        if not resume:
+            self.reset()
+        snapshots = find_snapshots(runs_root=self.runs_root) if snapshots is None else list(snapshots)
+        done = self.load_progress() if resume else {}
+        pending = [path for path in snapshots if path not in done]
+
+        self.logger.log("\n=== スナップショット一括再解析 ===")
+        self.logger.log(
+            f"📂 対象: {len(snapshots)}件（記録済み {len(snapshots) - len(pending)}件をスキップ、"
+            f"解析 {len(pending)}件、{self.workers}プロセス）"
+        )
+
+        results = []
+        start = time.perf_counter()
+        if pending:
+            results = self._run_pool(pending, len(snapshots) - len(pending), len(snapshots))
+        wall_time = time.perf_counter() - start
+
+        succeeded = [r for r in results if r['status'] == 'success']
+        failed = [r for r in results if r['status'] != 'success']
+        products = sum(r['products'] for r in succeeded)
+        cpu_seconds = sum(r['cpu_seconds'] for r in results)
+        self.stats = {
+            'status': 'error' if failed else 'success',
+            'error': f"{len(failed)}件の解析に失敗しました" if failed else None,
+            'snapshots': len(snapshots),
+            'processed': len(results),
+            'skipped': len(snapshots) - len(pending),
+            'succeeded': len(succeeded),
+            'failed': len(failed),
+            'failures': [r['snapshot'] for r in failed],
+            'products': products,
+            'total_products': products + sum(r['products'] for path, r in done.items() if path in snapshots),
+            'workers': self.workers,
+            'processes_used': len({r['pid'] for r in results if r['pid']}),
+            'wall_time': wall_time,
+            'cpu_seconds': cpu_seconds,  # 子プロセスのCPU時間の合計（1コアで順に実行した場合の目安）
+            'items_per_sec': products / wall_time if wall_time > 0 else 0.0,
+            'speedup': cpu_seconds / wall_time if wall_time > 0 else 0.0,
+            'output_dir': self.output_dir,
+        }
+        self.logger.log(
+            f"\n✅ 再解析完了: {len(succeeded)}/{len(results)}件成功、{products:,}商品、"
+            f"{self.stats['items_per_sec']:,.0f} items/s（{wall_time:.1f}秒、並列効果 {self.stats['speedup']:.1f}倍）"
+        )
+        if failed:
+            self.logger.log(f"❌ 解析に失敗したスナップショット: {len(failed)}件（再実行で再試行されます）")
+        else:
+            # 全件完了したら進捗を破棄し、次回（解析規則の修正後など）は全件を解析し直す
+            self.reset()
+        with open(summary_file, 'w', encoding='utf-8') as f:
+            json.dump(self.stats, f, ensure_ascii=False, indent=2)
+        return self.stats
+
+    def _run_pool(self, pending, completed, total):
+        """実行中の件数をワーカー数の数倍に抑えて投入し、完了順に進捗を記録"""
+        context = multiprocessing.get_context('spawn')  # 呼び出し元のスレッド（ブラウザのループ等）を引き継がない
+        tasks = iter(pending)
+        results = []
+        in_flight = {}
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=context, initializer=_init_worker) as executor, \
+                open(self.progress_file, 'a', encoding='utf-8') as progress:
+            def submit_next():
+                path = next(tasks, None)
+                if path is not None:
+                    future = executor.submit(
+                        _reparse_snapshot, snapshot_task(path, self.runs_root), self.output_dir,
+                        self.engine, self.output_format, self.save_json, self.db_path
+                    )
+                    in_flight[future] = path
+
+            try:
+                for _ in range(self.workers * 4):
+                    submit_next()
+                while in_flight:
+                    finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        path = in_flight.pop(future)
+                        try:
+                            result = future.result()
+                        except Exception as e:
+                            result = {'snapshot': path, 'status': 'error', 'error': f"{type(e).__name__}: {e}",
+                                      'products': 0, 'seconds': 0.0, 'cpu_seconds': 0.0, 'pid': None}
+                        results.append(result)
+                        progress.write(json.dumps(result, ensure_ascii=False) + '\n')
+                        progress.flush()
+                        completed += 1
+                        mark = '✓' if result['status'] == 'success' else '❌'
+                        self.logger.log_sampled(
+                            '再解析の進捗',
+                            f"  {mark} [{completed}/{total}] {path}: {result['products']}件 ({result['seconds']:.2f}秒)"
+                        )
+                        submit_next()
+            except BaseException:
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+            finally:
+                self.logger.flush_samples()
+        return results
+
+    def get_results(self):
+        """再解析のログを取得"""
+        return self.logger.get_results()
+
+    def get_stats(self):
+        """直近の再解析の集計（件数・商品数・items/s・並列効果）を取得"""
+        return self.stats
+
+
+def load_summary(output_dir):
+    """直近の再解析の集計（reparse_summary.json、なければNone）"""
+    path = os.path.join(output_dir, SUMMARY_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def reparse_command(output_dir='reparse', pattern=SNAPSHOT_PATTERN, workers=None, engine='lxml',
+                    output_format='json', save_json=True, db_path=None, resume=True):
+    """一括再解析を別プロセスで実行するためのコマンドライン
+
+    プロセスプールの子プロセスは起動元のメインモジュールを読み込み直すため、Webアプリ内から
+    直接プールを作らず、このコマンドを別プロセスとして起動する。
+    """
+    command = [sys.executable, '-m', 'modules.reparse', '--pattern', pattern, '--output-dir', output_dir,
+               '--engine', engine, '--format', output_format]
+    if workers:
+        command += ['--workers', str(workers)]
+    if db_path:
+        command += ['--write-db', '--db', db_path]
+    if not save_json:
+        command.append('--no-files')
+    if not resume:
+        command.append('--fresh')
+    return command
+
+
+def main():
+    parser = argparse.ArgumentParser(description="保存済みHTMLスナップショットを並列に再解析")
+    parser.add_argument('snapshots', nargs='*', help='対象ファイル（省略時は hermes_page*.html をすべて検索）')
+    parser.add_argument('--pattern', default=SNAPSHOT_PATTERN, help='検索するファイル名のパターン')
+    parser.add_argument('--output-dir', default='reparse')
+    parser.add_argument('--workers', type=int, default=None, help='プロセス数（既定: CPUコア数）')
+    parser.add_argument('--engine', default='lxml', choices=['lxml', 'bs4'])
+    parser.add_argument('--format', default='json', choices=['json', 'ndjson'], dest='output_format')
+    parser.add_argument('--write-db', action='store_true', help='商品DBにも保存')
+    parser.add_argument('--db', default=os.environ.get("PRODUCT_DB", "hermes_products.db"),
+                        help='商品DBのパス（既定: 環境変数 PRODUCT_DB）')
+    parser.add_argument('--no-files', action='store_true', help='スナップショットごとのファイルを出力しない')
+    parser.add_argument('--fresh', action='store_true', help='記録済みの進捗を破棄して全件を解析し直す')
+    args = parser.parse_args()
+
+    reparser = BulkReparser(
+        output_dir=args.output_dir,
+        workers=args.workers,
+        engine=args.engine,
+        output_format=args.output_format,
+        save_json=not args.no_files,
+        db_path=args.db if args.write_db else None
+    )
+    snapshots = args.snapshots or find_snapshots(args.pattern)
+    stats = reparser.run(snapshots, resume=not args.fresh)
+    raise SystemExit(0 if stats['status'] == 'success' else 1)
+
+
+if __name__ == '__main__':
+    main()
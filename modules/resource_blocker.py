@@ -0,0 +1,213 @@
+"""
+不要リソースのブロック（CDP Fetchドメインによるリクエスト遮断）
+"""
+import asyncio
+
+
+# 解析・広告系のホスト（商品グリッドやLoad Moreボタンの動作には不要）
+# ボット判定系（Akamai等）のスクリプトは遮断するとアクセス拒否の原因になるため含めない
+ANALYTICS_HOSTS = [
+    'google-analytics.com',
+    'googletagmanager.com',
+    'doubleclick.net',
+    'googleadservices.com',
+    'googlesyndication.com',
+    'connect.facebook.net',
+    'facebook.com/tr',
+    'bat.bing.com',
+    'analytics.tiktok.com',
+    'ct.pinterest.com',
+    'sc-static.net',
+    'hotjar.com',
+    'contentsquare.net',
+    'criteo.com',
+    'criteo.net',
+    'taboola.com',
+    'scorecardresearch.com',
+    'quantserve.com',
+    'demdex.net',
+    'omtrdc.net',
+    'nr-data.net',
+]
+
+# 遮断しないURL（検索API・商品データ）
+ALLOW_URL_PATTERNS = [
+    'bck2.hermes.com',
+]
+
+# ブロックプロファイル: 遮断するリソース種別とホスト
+PROFILES = {
+    'off': {'resource_types': [], 'hosts': []},
+    'analytics': {'resource_types': [], 'hosts': ANALYTICS_HOSTS},
+    'default': {'resource_types': ['Image', 'Media', 'Font'], 'hosts': ANALYTICS_HOSTS},
+    # スタイルシートは要素の表示判定（Load Moreボタンの可視性）に必要なため遮断しない
+    'aggressive': {
+        'resource_types': ['Image', 'Media', 'Font', 'TextTrack', 'Manifest', 'Ping', 'CSPViolationReport', 'Prefetch'],
+        'hosts': ANALYTICS_HOSTS,
+    },
+}
+
+# 遮断したリクエストの推定サイズ（バイト、削減量の概算用）
+TYPICAL_BYTES = {
+    'Image': 60_000,
+    'Media': 500_000,
+    'Font': 40_000,
+    'Script': 80_000,
+    'XHR': 2_000,
+    'Fetch': 2_000,
+    'Ping': 500,
+    'Other': 5_000,
+}
+
+
+class ResourceBlocker:
+    """プロファイルに従って画像・フォント・動画・解析タグなどのリクエストを遮断するクラス
+
+    Fetchドメインのリクエスト段階で一時停止させ、その場で失敗させるため、
+    遮断したリソースは一切ダウンロードされない。実行ごとに遮断件数と推定削減バイト数、
+    実際の転送バイト数を集計する。
+    """
+
+    def __init__(self, profile='default', logger=None):
+        if profile not in PROFILES:
+            raise ValueError(f"未知のブロックプロファイル: {profile}（{', '.join(PROFILES)}）")
+        self.profile = profile
+        self.logger = logger
+        self.resource_types = PROFILES[profile]['resource_types']
+        self.hosts = PROFILES[profile]['hosts']
+        self.active = False
+        self._tab = None
+        self._tasks = []
+        self.stats = {
+            'profile': profile,
+            'requests': 0,
+            'blocked': 0,
+            'blocked_by_type': {},
+            'blocked_by_host': {},
+            'estimated_bytes_saved': 0,
+            'transferred_bytes': 0,
+        }
+
+    @property
+    def enabled(self):
+        return bool(self.resource_types or self.hosts)
+
+    def _patterns(self):
+        """一時停止させるリクエストのパターン（種別指定とホスト指定の和集合）"""
+        import nodriver as nd
+
+        patterns = []
+        for resource_type in self.resource_types:
+            patterns.append(nd.cdp.fetch.RequestPattern(
+                url_pattern='*',
+                resource_type=nd.cdp.network.ResourceType(resource_type),
+                request_stage=nd.cdp.fetch.RequestStage.REQUEST
+            ))
+        for host in self.hosts:
+            patterns.append(nd.cdp.fetch.RequestPattern(
+                url_pattern=f'*{host}*',
+                request_stage=nd.cdp.fetch.RequestStage.REQUEST
+            ))
+        return patterns
+
+    async def install(self, tab):
+        """遮断を開始（ページ遷移前に呼ぶ）"""
+        import nodriver as nd
+
+        try:
+            await tab.send(nd.cdp.network.enable())
+            tab.add_handler(nd.cdp.network.RequestWillBeSent, self._on_request)
+            tab.add_handler(nd.cdp.network.LoadingFinished, self._on_finished)
+            if self.enabled:
+                tab.add_handler(nd.cdp.fetch.RequestPaused, self._on_paused)
+                await tab.send(nd.cdp.fetch.enable(patterns=self._patterns()))
+            self._tab = tab
+            self.active = self.enabled
+        except Exception as e:
+            self.active = False
+            self._log(f"    ⚠️ リソースブロック登録失敗（ブロックなしで続行）: {e}")
+        return self.active
+
+    async def uninstall(self):
+        """遮断を終了（プールで再利用されるタブに設定を残さない）"""
+        if self._tab is None:
+            return
+        import nodriver as nd
+
+        tasks, self._tasks = self._tasks, []
+        if tasks:
+            await asyncio.wait(tasks, timeout=5)
+        tab, self._tab = self._tab, None
+        try:
+            if self.enabled:
+                await tab.send(nd.cdp.fetch.disable())
+            if hasattr(tab, 'remove_handlers'):
+                tab.remove_handlers(nd.cdp.fetch.RequestPaused, self._on_paused)
+                tab.remove_handlers(nd.cdp.network.RequestWillBeSent, self._on_request)
+                tab.remove_handlers(nd.cdp.network.LoadingFinished, self._on_finished)
+        except Exception:
+            pass
+        self.active = False
+
+    def _on_request(self, event, connection=None):
+        self.stats['requests'] += 1
+
+    def _on_finished(self, event, connection=None):
+        self.stats['transferred_bytes'] += int(event.encoded_data_length or 0)
+
+    def _on_paused(self, event, connection=None):
+        """一時停止したリクエストを遮断（許可リストに該当する場合は続行）"""
+        url = event.request.url
+        if any(pattern in url for pattern in ALLOW_URL_PATTERNS):
+            self._tasks.append(asyncio.ensure_future(self._continue(event.request_id)))
+            return
+
+        resource_type = event.resource_type.value if event.resource_type else 'Other'
+        self.stats['blocked'] += 1
+        by_type = self.stats['blocked_by_type']
+        by_type[resource_type] = by_type.get(resource_type, 0) + 1
+        host = next((h for h in self.hosts if h in url), None)
+        if host:
+            by_host = self.stats['blocked_by_host']
+            by_host[host] = by_host.get(host, 0) + 1
+        self.stats['estimated_bytes_saved'] += TYPICAL_BYTES.get(resource_type, TYPICAL_BYTES['Other'])
+        # ハンドラー内でCDPコマンドを待つとイベント受信が止まるため、別タスクで応答する
+        self._tasks.append(asyncio.ensure_future(self._fail(event.request_id)))
+
+    async def _fail(self, request_id):
+        import nodriver as nd
+
+        try:
+            await self._tab.send(nd.cdp.fetch.fail_request(
+                request_id, nd.cdp.network.ErrorReason.BLOCKED_BY_CLIENT
+            ))
+        except Exception:
+            pass
+
+    async def _continue(self, request_id):
+        import nodriver as nd
+
+        try:
+            await self._tab.send(nd.cdp.fetch.continue_request(request_id))
+        except Exception:
+            pass
+
+    def log_report(self):
+        """遮断結果をログに出力"""
+        if not self.enabled:
+            return
+        stats = self.stats
+        by_type = ', '.join(f"{k}: {v}" for k, v in sorted(stats['blocked_by_type'].items()))
+        self._log(
+            f"    🚫 リソースブロック（{self.profile}）: {stats['blocked']}/{stats['requests']}件遮断"
+            f"（{by_type or 'なし'}）, 推定削減 {stats['estimated_bytes_saved']/1024/1024:.1f}MB,"
+            f" 実転送 {stats['transferred_bytes']/1024/1024:.1f}MB"
+        )
+
+    def get_stats(self):
+        """遮断の統計情報を取得"""
+        return dict(self.stats)
+
+    def _log(self, message):
+        if self.logger:
+            self.logger.log(message)
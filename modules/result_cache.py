@@ -0,0 +1,230 @@
+"""
+キーワード単位の抽出結果キャッシュ（TTL・LRU・ディスク永続化）
+"""
+import atexit
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+DEFAULT_LOCALE = "jp/ja"
+
+
+def make_cache_key(keyword, locale=DEFAULT_LOCALE):
+    """キーワードとロケールからキャッシュキーを生成"""
+    return f"{locale.strip().strip('/').lower()}|{' '.join(keyword.split()).lower()}"
+
+
+class ResultCache:
+    """スクレイピング結果（商品リスト）のキャッシュ
+
+    ttl秒以内のエントリは fresh、ttl〜stale_ttl秒のエントリは stale として返す。
+    stale の場合、呼び出し側は古い結果を即座に返しつつバックグラウンドで再取得する
+    （stale-while-revalidate）。エントリ数が max_entries を超えると最も古く参照された
+    ものから削除する。内容は root ディレクトリにエントリ単位のJSONファイルとして保存され、
+    再起動後も引き継がれる。書き込みはバックグラウンドのスレッドで行うため、put() /
+    invalidate() は呼び出し元（イベントループ）をファイル書き込みで塞がない。
+    """
+
+    def __init__(self, root="result_cache", ttl=900, stale_ttl=86400, max_entries=100):
+        self.root = root
+        self.ttl = ttl
+        self.stale_ttl = max(stale_ttl, ttl)
+        self.max_entries = max(1, max_entries)
+        self._entries = OrderedDict()
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        # 書き込み待ちのエントリ（キー → エントリ、Noneは削除）。同じキーは最新の内容だけを書く
+        self._pending = {}
+        self._pending_cond = threading.Condition()
+        self._writing = False
+        self._writer = None
+        self._stats = {
+            'hits': 0,
+            'stale_hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'evictions': 0,
+            'refreshes': 0,
+            'partial_skips': 0,
+        }
+        self._load()
+
+    def get(self, keyword, locale=DEFAULT_LOCALE):
+        """(エントリ, 状態) を返す。状態は 'fresh' / 'stale' / 'miss'"""
+        key = make_cache_key(keyword, locale)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None, 'miss'
+
+            age = time.time() - entry['fetched_at']
+            if age > self.stale_ttl:
+                del self._entries[key]
+                self._schedule(key, None)
+                self._stats['misses'] += 1
+                return None, 'miss'
+
+            self._entries.move_to_end(key)
+            entry = dict(entry, age_seconds=age)
+            if age <= self.ttl:
+                self._stats['hits'] += 1
+                return entry, 'fresh'
+            self._stats['stale_hits'] += 1
+            return entry, 'stale'
+
+    def put(self, keyword, locale, products, stats=None, files=None, partial=False):
+        """取得結果を保存（上限を超えた分はLRUで削除）し、保存したかを返す
+
+        partial=True（一部の商品しか取得できなかった実行）の結果は完全な結果として返さないよう
+        保存しない（既存のエントリもそのまま残す）。
+        """
+        key = make_cache_key(keyword, locale)
+        with self._lock:
+            if partial:
+                self._refreshing.discard(key)
+                self._stats['partial_skips'] += 1
+                return False
+            self._entries[key] = {
+                'keyword': keyword,
+                'locale': locale,
+                'products': products,
+                'stats': stats or {},
+                'files': files or {},
+                'fetched_at': time.time(),
+            }
+            self._entries.move_to_end(key)
+            self._refreshing.discard(key)
+            self._stats['stores'] += 1
+            self._schedule(key, self._entries[key])
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+                self._schedule(evicted, None)
+        return True
+
+    def begin_refresh(self, keyword, locale=DEFAULT_LOCALE):
+        """バックグラウンド再取得を開始してよいか（同じキーの重複実行を防ぐ）"""
+        key = make_cache_key(keyword, locale)
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            self._stats['refreshes'] += 1
+            return True
+
+    def end_refresh(self, keyword, locale=DEFAULT_LOCALE):
+        """再取得の終了（失敗時など put() されなかった場合に呼ぶ）"""
+        with self._lock:
+            self._refreshing.discard(make_cache_key(keyword, locale))
+
+    def invalidate(self, keyword=None, locale=DEFAULT_LOCALE):
+        """指定キーワード（省略時は全件）のキャッシュを削除"""
+        with self._lock:
+            if keyword is None:
+                keys = list(self._entries)
+                self._entries.clear()
+            else:
+                key = make_cache_key(keyword, locale)
+                keys = [key] if self._entries.pop(key, None) is not None else []
+            for key in keys:
+                self._schedule(key, None)
+
+    def get_stats(self):
+        """キャッシュの統計情報を取得"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'stale_ttl_seconds': self.stale_ttl,
+                'refreshing': len(self._refreshing),
+                'root': self.root,
+                'pending_writes': len(self._pending),
+            })
+        return stats
+
+    def _entry_path(self, key):
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.root, f"{digest}.json")
+
+    def _load(self):
+        """ディスクからキャッシュを読み込み（期限切れは捨て、取得日時の古い順に並べる）"""
+        if not self.root or not os.path.isdir(self.root):
+            return
+        now = time.time()
+        entries = []
+        for name in os.listdir(self.root):
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.root, name), 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if now - entry.get('fetched_at', 0) > self.stale_ttl:
+                continue
+            entries.append(entry)
+        for entry in sorted(entries, key=lambda e: e['fetched_at']):
+            self._entries[make_cache_key(entry['keyword'], entry['locale'])] = entry
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _schedule(self, key, entry):
+        """エントリの書き込み（Noneなら削除）をバックグラウンドのスレッドに依頼"""
+        if not self.root:
+            return
+        with self._pending_cond:
+            self._pending[key] = entry
+            if self._writer is None:
+                os.makedirs(self.root, exist_ok=True)
+                self._writer = threading.Thread(target=self._write_loop, name='result-cache-writer', daemon=True)
+                self._writer.start()
+                atexit.register(self.flush)
+            self._pending_cond.notify()
+
+    def _write_loop(self):
+        while True:
+            with self._pending_cond:
+                while not self._pending:
+                    self._pending_cond.wait()
+                pending, self._pending = self._pending, {}
+                self._writing = True
+            try:
+                for key, entry in pending.items():
+                    self._write_entry(key, entry)
+            finally:
+                with self._pending_cond:
+                    self._writing = False
+                    self._pending_cond.notify_all()
+
+    def _write_entry(self, key, entry):
+        """1エントリをファイルに保存（一時ファイル経由で置き換え）または削除"""
+        path = self._entry_path(key)
+        try:
+            if entry is None:
+                if os.path.exists(path):
+                    os.remove(path)
+                return
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+
+    def flush(self, timeout=10):
+        """書き込み待ちがなくなるまで待つ（終了時・テスト用）"""
+        deadline = time.time() + timeout
+        with self._pending_cond:
+            while self._pending or self._writing:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return False
+                self._pending_cond.wait(remaining)
+        return True
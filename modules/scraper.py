@@ -3,70 +3,251 @@ Phase 6.0: Hermesサイトスクレイピング機能
 """
 import asyncio
 import time
-import json
-from datetime import datetime
 from .utils import create_logger, normalize_nodriver_result, safe_get
+from .browser_pool import launch_browser, stop_browser
+from .page_agent import PageAgent
+from .dom_probe import build_probe_script, parse_probe_result
+from .api_capture import ApiCapture
+from .resource_blocker import ResourceBlocker
+from .load_controller import LoadController
+from .page_fetcher import plan_page_urls, fetch_pages
+from .parser import HermesParser
+from .artifact_store import get_artifact_store
+from .metrics import RunTimer
+
+
+# 商品コンテナ要素の候補（優先順）
+CONTAINER_SELECTORS = [
+    'h-grid-results',
+    'h-grid-result-item',  # 個別の商品要素を優先
+    '[data-testid="product-grid"]',
+    '.product-grid-list',  # これが問題になることがあるので後ろに
+    '.search-results'
+]
+
+# 新しく出現したh-grid-result-itemから商品レコードを抽出するJS（HermesParserと同じ抽出規則）
+HARVEST_SCRIPT = '''
+(function(start) {
+    const items = document.getElementsByTagName('h-grid-result-item');
+    if (items.length < start) start = 0;  // 再描画された場合は先頭から取り直す
+    const firstText = (item, selectors) => {
+        for (const selector of selectors) {
+            const el = item.querySelector(selector);
+            const text = el ? (el.textContent || '').trim() : '';
+            if (text) return text;
+        }
+        return null;
+    };
+    const records = [];
+    for (let i = start; i < items.length; i++) {
+        const item = items[i];
+        const link = item.querySelector('a');
+        const href = link ? link.getAttribute('href') : null;
+        let colorElems = item.querySelectorAll('.color');
+        if (!colorElems.length) colorElems = item.querySelectorAll('[data-color]');
+        const colors = [];
+        colorElems.forEach(el => {
+            const value = el.getAttribute('data-color') || (el.textContent || '').trim();
+            if (value) colors.push(value);
+        });
+        const skuElem = item.querySelector('[data-sku]') || item.querySelector('.sku');
+        records.push({
+            href: href,
+            name: firstText(item, ['h3', 'h2', '.product-name', '.product-title', '.title']),
+            price: firstText(item, ['.price', '.product-price', '.amount', 'span.price', 'div.price']),
+            colors: colors,
+            sku: skuElem ? (skuElem.getAttribute('data-sku') || (skuElem.textContent || '').trim()) : null
+        });
+    }
+    return JSON.stringify({total: items.length, records: records});
+})(%d)
+'''
 
 
 class HermesScraper:
     """エルメスサイトのスクレイピングを実行するクラス"""
     
-    def __init__(self):
+    def __init__(self, browser_pool=None, capture_api=False, harvest=False, save_html=True,
+                 browser=None, html_filename='hermes_page.html', resource_profile='default',
+                 parallel_pages=False, page_concurrency=6, workspace=None, timer=None):
         self.logger = create_logger()
+        self.timer = timer or RunTimer()  # フェーズ別の所要時間・カウンタ（パイプラインと共有）
         self.browser = None
+        self.browser_pool = browser_pool
+        self.shared_browser = browser  # 他のスクレイパーと共有するブラウザ（専用タブで動作）
+        self.tab = None  # 共有ブラウザ上で開いた専用タブ
+        self.workspace = workspace  # 実行単位の作業ディレクトリ（指定時はHTMLをその配下の名前で保存）
+        self.html_filename = workspace.final_path(html_filename) if workspace else html_filename
+        self.saved_files = []  # この実行で保存したHTML（成果物ストア上の名前）
+        self.browser_failed = False
         self.results = []
         self.total_items = 0
         self.console_logs = []  # ブラウザのコンソールログを保持するリストを追加
+        self.agent = PageAgent(logger=self.logger)  # ページ内エージェント（未登録時は固定待機）
+        self.evaluate_calls = 0  # CDP evaluate往復回数
+        self.capture_api = capture_api  # 検索APIのJSONから商品を構築するモード
+        self.api_capture = ApiCapture(logger=self.logger)
+        self.api_products = []
+        self.harvest = harvest  # 読み込み中に商品を逐次取得するモード（最終HTMLダンプ不要）
+        self.harvested = {}  # URL → 商品辞書
+        self.partial = False  # 途中で失敗し、逐次取得済みの部分結果を返したか
+        self._harvest_offset = 0
+        self._harvest_queue = None
+        self.harvest_success = False
+        self.save_html = save_html  # HTMLをファイルにも保存するか
+        self.resource_blocker = ResourceBlocker(resource_profile, logger=self.logger)  # 画像・フォント・解析タグ等の遮断
+        self.page_load_time = None  # ページ遷移開始から初期表示完了までの秒数
+        self.load_stats = {}  # 追加読み込み（Load More/スクロール）の実行結果
+        self.parallel_pages = parallel_pages  # 残りページを検索APIで並列取得するモード（APIキャプチャを伴う）
+        self.page_concurrency = page_concurrency
+        self.html_content = None  # 取得したHTML（メモリ上）
+        self.html_file = None  # この実行で保存したHTMLファイル
     
     async def start_browser(self):
-        """ブラウザを起動"""
-        import nodriver as nd
+        """ブラウザを起動（プール指定時はプールから借り出す）"""
+        if self.shared_browser is not None:
+            self.logger.log("  Step 1: 共有ブラウザで専用タブを使用")
+            self.browser = self.shared_browser
+            self.logger.log("")
+            return
+        
+        if self.browser_pool is not None:
+            self.logger.log("  Step 1: ブラウザプールからブラウザを取得")
+            self.browser = await self.browser_pool.acquire()
+            stats = self.browser_pool.get_stats()
+            self.logger.log(f"    ✅ Browserリース成功: {type(self.browser)}")
+            self.logger.log(f"    ♻️ プール状況: 使用中 {stats['in_use']}/{stats['size']}, 起動 {stats['launches']}回, 再生成 {stats['recycles']}回")
+            self.logger.log("")
+            return
+        
         import nest_asyncio
         nest_asyncio.apply()
         
         self.logger.log("  Step 1: 特殊ブラウザ設定でnodriver起動")
         
-        browser_args = [
-            '--headless',
-            '--no-sandbox',
-            '--disable-gpu',
-            '--disable-dev-shm-usage',
-            '--disable-blink-features=AutomationControlled',
-            '--exclude-switches=enable-automation',
-            '--disable-extensions',
-            '--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            '--window-size=1920,15000',  # 超巨大縦長ウィンドウ（高さ15000ピクセル）
-            '--start-maximized'
-        ]
-        
-        self.browser = await nd.start(
-            headless=True,
-            sandbox=False,
-            browser_args=browser_args
-        )
+        self.browser = await launch_browser()
         
         self.logger.log(f"    ✅ Browser開始成功: {type(self.browser)}")
         self.logger.log(f"    📐 ウィンドウサイズ: 1920x15000 (超巨大縦長設定)")
         self.logger.log("")
     
     async def close_browser(self):
-        """ブラウザを終了"""
+        """ブラウザを終了（プール指定時はプールへ返却、共有ブラウザ時は専用タブのみ閉じる）"""
+        if self.shared_browser is not None:
+            tab, self.tab = self.tab, None
+            self.browser = None
+            if tab is not None:
+                try:
+                    await tab.close()
+                    self.logger.log("🧹 専用タブを閉じました")
+                except Exception as e:
+                    self.logger.log(f"⚠️ タブ終了時の警告: {e}")
+            return
+        
+        if self.browser and self.browser_pool is not None:
+            browser, self.browser = self.browser, None
+            try:
+                await self.browser_pool.release(browser, failed=self.browser_failed)
+                self.logger.log("♻️ ブラウザをプールへ返却しました")
+            except Exception as e:
+                self.logger.log(f"⚠️ ブラウザ返却時の警告: {e}")
+            return
+        
         if self.browser:
             try:
                 self.logger.log("🧹 ブラウザクリーンアップ開始...")
                 # エラーを回避するため、browser.stop()の結果を確認
-                if hasattr(self.browser, 'stop') and callable(self.browser.stop):
-                    stop_result = self.browser.stop()
-                    # awaitableかどうかを確認
-                    if hasattr(stop_result, '__await__'):
-                        await stop_result
+                await stop_browser(self.browser)
                 self.logger.log("✅ ブラウザが正常に終了しました")
             except Exception as e:
                 self.logger.log(f"⚠️ ブラウザ終了時の警告: {e}")
                 # エラーが発生してもプロセスは継続
     
-    async def scrape_hermes_site(self, url=None, search_keyword="バッグ"):
-        """エルメスサイトをスクレイピング"""
+    async def _evaluate(self, tab, expression, **kwargs):
+        """tab.evaluateを実行（CDP往復回数を計測）"""
+        self.evaluate_calls += 1
+        return await tab.evaluate(expression, **kwargs)
+    
+    async def _probe(self, tab, checks):
+        """複数のDOMチェックを1回のevaluateでまとめて実行"""
+        raw = await self._evaluate(tab, build_probe_script(checks))
+        return parse_probe_result(raw)
+    
+    async def _harvest(self, tab, label):
+        """新しく出現した商品を取得し、差分（URLキーの新規分）を記録"""
+        if not self.harvest:
+            return []
+        try:
+            raw = await self._evaluate(tab, HARVEST_SCRIPT % self._harvest_offset)
+            data = parse_probe_result(raw)
+        except Exception as e:
+            self.logger.log(f"      ⚠️ 逐次取得エラー ({label}): {e}")
+            return []
+        
+        self._harvest_offset = data.get('total', self._harvest_offset)
+        delta = []
+        for record in data.get('records', []):
+            href = record.get('href')
+            if href:
+                url = f"https://www.hermes.com{href}" if href.startswith('/') else href
+                key = url
+            else:
+                url = 'N/A'
+                key = f"N/A:{len(self.harvested) + 1}"
+            if key in self.harvested:
+                continue
+            product = {
+                'index': len(self.harvested) + 1,
+                'name': record.get('name') or 'N/A',
+                'url': url,
+                'price': record.get('price') or 'N/A',
+                'colors': record.get('colors') or [],
+                'sku': record.get('sku') or 'N/A'
+            }
+            self.harvested[key] = product
+            delta.append(product)
+        
+        if delta:
+            self.logger.log(f"      📥 逐次取得 ({label}): +{len(delta)}商品（累計 {len(self.harvested)}）")
+            if self._harvest_queue is not None:
+                self._harvest_queue.put_nowait(delta)
+        return delta
+    
+    def get_harvested_products(self):
+        """逐次取得した商品リストを取得（失敗時も取得済み分を保持）"""
+        return list(self.harvested.values())
+    
+    async def iter_harvest(self, url=None, search_keyword="バッグ", locale="jp/ja"):
+        """スクレイピングを実行し、新しく出現した商品を差分リストとして逐次yieldする
+        
+        完了後の成否は self.harvest_success に格納される。
+        """
+        self.harvest = True
+        queue = self._harvest_queue = asyncio.Queue()
+        task = asyncio.ensure_future(self.scrape_hermes_site(url=url, search_keyword=search_keyword, locale=locale))
+        try:
+            while True:
+                getter = asyncio.ensure_future(queue.get())
+                done, _ = await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+                if getter in done:
+                    yield getter.result()
+                    continue
+                getter.cancel()
+                break
+            while not queue.empty():
+                yield queue.get_nowait()
+            self.harvest_success = task.result()
+        finally:
+            if not task.done():
+                task.cancel()
+                try:
+                    await task
+                except (asyncio.CancelledError, Exception):
+                    pass
+            self._harvest_queue = None
+    
+    async def scrape_hermes_site(self, url=None, search_keyword="バッグ", locale="jp/ja"):
+        """エルメスサイトをスクレイピング（locale は国/言語のURLパス、例: "jp/ja"）"""
         success = False
         
         try:
@@ -74,20 +255,37 @@ class HermesScraper:
             if url is None:
                 import urllib.parse
                 encoded_keyword = urllib.parse.quote(search_keyword)
-                url = f"https://www.hermes.com/jp/ja/search/?s={encoded_keyword}#"
+                url = f"https://www.hermes.com/{locale.strip('/')}/search/?s={encoded_keyword}#"
             
-            await self.start_browser()
+            with self.timer.span('browser_start'):
+                await self.start_browser()
             
             self.logger.log("  Step 2: エルメス公式サイト接続テスト")
             self.logger.log(f"    🔍 検索キーワード: {search_keyword}")
             self.logger.log(f"    URL: {url}")
             self.logger.log(f"    ⏳ 接続中 (タイムアウト: 45秒)...")
             
+            # ページ遷移前にエージェントを登録（document開始時から状態変化をプッシュさせる）
+            if self.shared_browser is not None:
+                # 共有ブラウザでは他のキーワードと干渉しないよう専用タブを開く
+                self.tab = await self.browser.get('about:blank', new_tab=True)
+                main_tab = self.tab
+            else:
+                main_tab = getattr(self.browser, 'main_tab', None)
+            if main_tab is not None and await self.resource_blocker.install(main_tab):
+                self.logger.log(f"    🚫 リソースブロック有効（プロファイル: {self.resource_blocker.profile}）")
+            if main_tab is not None and await self.agent.install(main_tab):
+                self.logger.log(f"    📡 ページ内エージェント登録完了（イベント駆動待機）")
+            if (self.capture_api or self.parallel_pages) and main_tab is not None and await self.api_capture.install(main_tab):
+                self.logger.log(f"    📡 APIレスポンスキャプチャ開始（Networkドメイン）")
+            
             # ページアクセス
-            tab = await asyncio.wait_for(
-                self.browser.get(url), 
-                timeout=45
-            )
+            load_start = time.time()
+            with self.timer.span('navigation'):
+                tab = await asyncio.wait_for(
+                    self.tab.get(url) if self.tab is not None else self.browser.get(url),
+                    timeout=45
+                )
             
             if tab is None:
                 self.logger.log(f"    ❌ タブ取得失敗")
@@ -96,7 +294,7 @@ class HermesScraper:
             self.logger.log(f"    ✅ ページアクセス成功")
             
             # ウィンドウサイズを確認
-            window_size = await tab.evaluate('''
+            window_size = await self._evaluate(tab, '''
                 ({
                     width: window.innerWidth,
                     height: window.innerHeight,
@@ -107,18 +305,61 @@ class HermesScraper:
             self.logger.log(f"    📐 実際のビューポート: {ws.get('width', 'N/A')}x{ws.get('height', 'N/A')}px")
             
             # ページ読み込み待機とスクロール処理
-            await self._wait_for_page_load(tab)
-            await self._scroll_page(tab)
+            with self.timer.span('page_load'):
+                await self._wait_for_page_load(tab)
+            self.page_load_time = time.time() - load_start
+            self.logger.log(f"    ⏱️ 初期表示までの時間: {self.page_load_time:.2f}秒")
+            await self._harvest(tab, '初期表示')
+            fetched = False
+            if self.parallel_pages:
+                with self.timer.span('parallel_fetch'):
+                    fetched = await self._fetch_pages_parallel(tab)
+            if not fetched:
+                await self._scroll_page(tab)
+            self.agent.log_wait_report()
+            self.resource_blocker.log_report()
+            self.logger.log(f"    🔁 CDP evaluate往復回数（読み込み完了まで）: {self.evaluate_calls}回")
+            
+            # APIキャプチャモード: 検索APIのJSONから商品を構築（取得できなければHTMLへフォールバック）
+            if self.api_capture.active:
+                with self.timer.span('build_from_api'):
+                    success = await self._build_products_from_api()
+                if success:
+                    return success
+            
+            # 逐次取得モード: 読み込み中に取得済みのため最終HTMLダンプは不要
+            if self.harvest:
+                await self._harvest(tab, '最終確認')
+                success = bool(self.harvested)
+                self.logger.log(f"  Step 3: 逐次取得完了 - {len(self.harvested)}商品（HTMLダンプなし）")
+                if self.total_items > 0 and len(self.harvested) < self.total_items:
+                    self.logger.log(f"    ⚠️ 取得率: {len(self.harvested)}/{self.total_items} ({len(self.harvested)/self.total_items*100:.1f}%)")
+                return success
             
             # HTMLダウンロード
-            success = await self._download_html(tab)
+            with self.timer.span('download_html'):
+                success = await self._download_html(tab)
             
         except asyncio.TimeoutError:
             self.logger.log(f"    ❌ タイムアウト: 45秒以内に接続できませんでした")
+            self.browser_failed = True
         except Exception as e:
             self.logger.log(f"    ❌ 接続エラー: {type(e).__name__}: {str(e)}")
+            self.browser_failed = True
         finally:
-            await self.close_browser()
+            with self.timer.span('browser_close'):
+                await self.agent.uninstall()
+                await self.api_capture.uninstall()
+                await self.resource_blocker.uninstall()
+                await self.close_browser()
+            self.timer.count('cdp_evaluate_calls', self.evaluate_calls)
+            self.timer.count('bytes_transferred', self.resource_blocker.stats['transferred_bytes'])
+        
+        # 途中で失敗しても逐次取得済みの商品は部分結果として返す
+        if not success and self.harvest and self.harvested:
+            self.logger.log(f"    ⚠️ 処理は途中で失敗しましたが、逐次取得済みの{len(self.harvested)}商品を部分結果として保持します")
+            self.partial = True
+            success = True
         
         return success
     
@@ -126,645 +367,168 @@ class HermesScraper:
         """ページの読み込みを待機"""
         self.logger.log(f"    ⏳ Angular初期化・商品リスト読み込み待機...")
         
-        # 基本待機（サンダルなど一部のキーワードでは読み込みが遅いため15秒に増加）
-        await asyncio.sleep(15)
+        # 基本待機（サンダルなど一部のキーワードでは読み込みが遅いため最大15秒）
+        # エージェントが商品表示・総商品数・通信完了を通知した時点で待機を終える
+        await self.agent.wait_for(
+            lambda s: s['itemCount'] > 0 and s['totalCount'] is not None and s['inflight'] == 0,
+            15,
+            phase='page_load'
+        )
         
-        # 総商品数を取得
-        try:
-            total_count_raw = await tab.evaluate('''
-                (function() {
-                    // 複数のパターンで総商品数を検索
-                    const patterns = [
-                        /(\d+)\s*アイテム/,
-                        /(\d+)\s*items?/i,
-                        /(\d+)\s*製品/,
-                        /(\d+)\s*商品/,
-                        /(\d+)\s*results?/i
-                    ];
-                    
-                    // ページ全体のテキストから検索
-                    const pageText = document.body.innerText || document.body.textContent || '';
+        # 総商品数を取得（エージェントが検出済みならそれを使う）
+        agent_total = self.agent.state.get('totalCount')
+        if agent_total is not None:
+            self.total_items = agent_total
+            self.logger.log(f"    📊 総商品数を検出: {self.total_items} ({self.agent.state.get('totalText')})")
+            self.logger.log(f"    📍 取得元: ページ内エージェント")
+        
+        if agent_total is None:
+            try:
+                total_count_raw = await self._evaluate(tab, '''
+                    (function() {
+                        // 複数のパターンで総商品数を検索
+                        const patterns = [
+                            /(\d+)\s*アイテム/,
+                            /(\d+)\s*items?/i,
+                            /(\d+)\s*製品/,
+                            /(\d+)\s*商品/,
+                            /(\d+)\s*results?/i
+                        ];
                     
-                    for (let pattern of patterns) {
-                        const match = pageText.match(pattern);
-                        if (match && match[1]) {
-                            return {
-                                found: true,
-                                count: parseInt(match[1]),
-                                text: match[0]
-                            };
-                        }
-                    }
+                        // ページ全体のテキストから検索
+                        const pageText = document.body.innerText || document.body.textContent || '';
                     
-                    // h-total-result要素から取得を試行
-                    const totalElement = document.querySelector('h-total-result, .total-result, [class*="total"]');
-                    if (totalElement) {
-                        const text = totalElement.innerText || totalElement.textContent || '';
                         for (let pattern of patterns) {
-                            const match = text.match(pattern);
+                            const match = pageText.match(pattern);
                             if (match && match[1]) {
                                 return {
                                     found: true,
                                     count: parseInt(match[1]),
-                                    text: match[0],
-                                    element: 'h-total-result'
+                                    text: match[0]
                                 };
                             }
                         }
-                    }
                     
-                    return { found: false };
-                })()
-            ''')
+                        // h-total-result要素から取得を試行
+                        const totalElement = document.querySelector('h-total-result, .total-result, [class*="total"]');
+                        if (totalElement) {
+                            const text = totalElement.innerText || totalElement.textContent || '';
+                            for (let pattern of patterns) {
+                                const match = text.match(pattern);
+                                if (match && match[1]) {
+                                    return {
+                                        found: true,
+                                        count: parseInt(match[1]),
+                                        text: match[0],
+                                        element: 'h-total-result'
+                                    };
+                                }
+                            }
+                        }
+                    
+                        return { found: false };
+                    })()
+                ''')
             
-            total_count_info = normalize_nodriver_result(total_count_raw)
-            if safe_get(total_count_info, 'found'):
-                self.total_items = safe_get(total_count_info, 'count', 0)
-                self.logger.log(f"    📊 総商品数を検出: {self.total_items} ({safe_get(total_count_info, 'text')})")
-                element_source = safe_get(total_count_info, 'element', None)
-                if element_source:
-                    self.logger.log(f"    📍 取得元: {element_source}要素")
+                total_count_info = normalize_nodriver_result(total_count_raw)
+                if safe_get(total_count_info, 'found'):
+                    self.total_items = safe_get(total_count_info, 'count', 0)
+                    self.logger.log(f"    📊 総商品数を検出: {self.total_items} ({safe_get(total_count_info, 'text')})")
+                    element_source = safe_get(total_count_info, 'element', None)
+                    if element_source:
+                        self.logger.log(f"    📍 取得元: {element_source}要素")
+                    else:
+                        self.logger.log(f"    📍 取得元: ページ全体のテキスト")
                 else:
-                    self.logger.log(f"    📍 取得元: ページ全体のテキスト")
-            else:
-                self.logger.log(f"    ⚠️ 総商品数を検出できませんでした")
+                    self.logger.log(f"    ⚠️ 総商品数を検出できませんでした")
                 
-        except Exception as e:
-            self.logger.log(f"    ⚠️ 総商品数取得エラー: {e}")
+            except Exception as e:
+                self.logger.log(f"    ⚠️ 総商品数取得エラー: {e}")
         
         # 商品コンテナ要素の出現を待機
-        container_selectors = [
-            'h-grid-results',
-            'h-grid-result-item',  # 個別の商品要素を優先
-            '[data-testid="product-grid"]',
-            '.product-grid-list',  # これが問題になることがあるので後ろに
-            '.search-results'
-        ]
+        container_selectors = list(CONTAINER_SELECTORS)
         
         container_found = False
-        for selector in container_selectors:
-            try:
-                self.logger.log(f"      要素待機: {selector}")
-                for attempt in range(40):  # 0.5秒 × 40回 = 20秒
-                    element_exists_raw = await tab.evaluate(f'document.querySelector("{selector}") ? true : false')
-                    element_exists = normalize_nodriver_result(element_exists_raw)
-                    if isinstance(element_exists, dict):
-                        element_exists = element_exists.get('exists', element_exists.get('value', False))
-                    if element_exists:
+        if self.agent.active:
+            # エージェントが商品要素の出現を通知するまで待機（ポーリング不要）
+            self.logger.log(f"      要素待機: h-grid-result-item（エージェント通知）")
+            container_found = await self.agent.wait_for(
+                lambda s: s['itemCount'] > 0, 20, phase='container_wait'
+            )
+            if container_found:
+                self.logger.log(f"      ✅ 要素発見: h-grid-result-item ({self.agent.state['itemCount']}個)")
+            container_selectors = []
+        
+        if container_selectors:
+            # 全セレクターを1回のevaluateで確認（優先順に最初に見つかったものを採用）
+            self.logger.log(f"      要素待機: {', '.join(container_selectors)}")
+            for attempt in range(40):  # 0.5秒 × 40回 = 20秒
+                try:
+                    probe = await self._probe(tab, [('container', 'first', container_selectors)])
+                    selector = probe.get('container')
+                    if selector:
                         self.logger.log(f"      ✅ 要素発見: {selector}")
                         container_found = True
                         break
-                    await asyncio.sleep(0.5)
-                
-                if container_found:
-                    break
-                    
-            except Exception as wait_error:
-                self.logger.log(f"      ⚠️ 要素待機エラー: {selector} - {wait_error}")
+                except Exception as wait_error:
+                    self.logger.log(f"      ⚠️ 要素待機エラー: {wait_error}")
+                await asyncio.sleep(0.5)
         
         if not container_found:
             self.logger.log(f"    ⚠️ 商品コンテナ要素が見つかりません（20秒経過）")
     
-    async def _analyze_load_more_buttons(self, tab):
-        """ページ内のLoad Moreボタンを事前分析"""
-        self.logger.log(f"    🔍 ページ全体のボタン分析を開始...")
-        
-        try:
-            page_analysis = await tab.evaluate('''
-                (function() {
-                    // 全ボタンを収集
-                    const allButtons = Array.from(document.querySelectorAll('button, a[role="button"], [role="button"]'));
-                    
-                    // キーワードリスト（日本語・英語）
-                    const keywords = [
-                        // 日本語（エルメス固有を追加）
-                        'アイテムをもっと見る', 'もっと見る', 'もっと表示', '続きを見る', '次へ', '追加',
-                        'さらに表示', 'すべて表示', '全て表示', 'より多く',
-                        // 英語
-                        'load more items', 'load more', 'show more', 'view more', 'see more',
-                        'next', 'continue', 'expand', 'additional'
-                    ];
-                    
-                    const results = {
-                        totalElements: allButtons.length,
-                        byText: [],
-                        byAriaLabel: [],
-                        byClassName: [],
-                        byDataAttribute: []
-                    };
-                    
-                    allButtons.forEach((btn, index) => {
-                        const text = (btn.textContent || '').trim().toLowerCase();
-                        const ariaLabel = (btn.getAttribute('aria-label') || '').toLowerCase();
-                        const className = (btn.className || '').toLowerCase();
-                        const dataTestId = btn.getAttribute('data-testid') || '';
-                        
-                        // テキストマッチ
-                        keywords.forEach(keyword => {
-                            if (text.includes(keyword.toLowerCase())) {
-                                results.byText.push({
-                                    keyword: keyword,
-                                    text: btn.textContent.trim(),
-                                    index: index
-                                });
-                            }
-                        });
-                        
-                        // aria-labelマッチ
-                        keywords.forEach(keyword => {
-                            if (ariaLabel.includes(keyword.toLowerCase())) {
-                                results.byAriaLabel.push({
-                                    keyword: keyword,
-                                    ariaLabel: btn.getAttribute('aria-label'),
-                                    index: index
-                                });
-                            }
-                        });
-                        
-                        // クラス名マッチ
-                        ['load', 'more', 'show', 'expand'].forEach(term => {
-                            if (className.includes(term)) {
-                                results.byClassName.push({
-                                    term: term,
-                                    className: btn.className,
-                                    text: btn.textContent.trim(),
-                                    index: index
-                                });
-                            }
-                        });
-                        
-                        // data属性マッチ
-                        if (dataTestId.includes('load') || dataTestId.includes('more')) {
-                            results.byDataAttribute.push({
-                                dataTestId: dataTestId,
-                                text: btn.textContent.trim(),
-                                index: index
-                            });
-                        }
-                    });
-                    
-                    return results;
-                })()
-            ''')
-            
-            analysis = normalize_nodriver_result(page_analysis)
-            
-            self.logger.log(f"    📊 ボタン分析結果:")
-            self.logger.log(f"       - 総要素数: {safe_get(analysis, 'totalElements', 0)}")
-            self.logger.log(f"       - テキストマッチ: {len(safe_get(analysis, 'byText', []))}件")
-            self.logger.log(f"       - aria-labelマッチ: {len(safe_get(analysis, 'byAriaLabel', []))}件")
-            self.logger.log(f"       - クラス名マッチ: {len(safe_get(analysis, 'byClassName', []))}件")
-            self.logger.log(f"       - data属性マッチ: {len(safe_get(analysis, 'byDataAttribute', []))}件")
-            
-            # 詳細をログ出力
-            if safe_get(analysis, 'byText'):
-                self.logger.log(f"    📝 テキストによる候補:")
-                for item in safe_get(analysis, 'byText', [])[:3]:  # 最初の3件のみ
-                    self.logger.log(f"       - '{safe_get(item, 'text')}' (キーワード: {safe_get(item, 'keyword')})")
-            
-            return analysis
-            
-        except Exception as e:
-            self.logger.log(f"    ⚠️ ボタン分析エラー: {e}")
-            return None
-    
     async def _scroll_page(self, tab):
-        """ページをスクロールして全商品を読み込む（エルメスサイト仕様に特化）"""
-        self.logger.log(f"    📜 動的読み込み処理開始 (エルメスサイト特化版)")
-
-        # 初期商品数を確認
-        initial_count_raw = await tab.evaluate("document.querySelectorAll('h-grid-result-item').length")
-        initial_count = normalize_nodriver_result(initial_count_raw)
-        if isinstance(initial_count, dict):
-            initial_count = initial_count.get('value', 0)
-        self.logger.log(f"\n    [初期状態] ボタンクリック前の商品数: {initial_count}個")
-        
-        
-        # --- フェーズ1: ボタンクリック（成功実績のあるコード）---
-        self.logger.log("\n    --- フェーズ1: 「アイテムをもっと見る」ボタンのクリック試行 ---")
-        
-        # 総商品数が48以下の場合はボタンが存在しない
-        total_products = getattr(self, 'total_items', 0)
-        skip_button = False
-        if total_products > 0 and total_products <= 48:
-            self.logger.log(f"      [スキップ] 総商品数が{total_products}個のため、Load Moreボタンは存在しません")
-            self.logger.log(f"      [完了] 全商品が既に表示されています")
-            return  # ボタンもスクロールも不要
-        
-        try:
-            button_selector = 'button[data-testid="Load more items"]'
-            # まずボタンの存在を確認
-            button_exists = await tab.evaluate(f'!!document.querySelector("{button_selector}")')
-            button_exists = normalize_nodriver_result(button_exists)
-            
-            if not button_exists or skip_button:
-                self.logger.log("      [情報] Load Moreボタンが見つかりません（スキップしてスクロール処理へ）")
-                skip_button = True
-            
-            if not skip_button:
-                button = await tab.wait_for(button_selector, timeout=5000)
-                
-                # ボタンの可視性を確認
-                is_visible = await tab.evaluate(f'''
-                    (function() {{
-                        const button = document.querySelector('{button_selector}');
-                        return button && button.offsetParent !== null;
-                    }})()
-                ''')
-                is_visible = normalize_nodriver_result(is_visible)
-                
-                if button and is_visible:
-                    self.logger.log("      [成功] ボタンを発見。クリックを実行します。")
-                    await tab.evaluate(f'''
-                        document.querySelector('{button_selector}').scrollIntoView({{behavior: 'smooth', block: 'center'}});
-                    ''')
-                    await asyncio.sleep(1)
-                    await button.click()
-                    self.logger.log("      [待機] クリック後の商品読み込み待機中（10秒）...")
-                    await asyncio.sleep(10)
-        except Exception:
-            self.logger.log("      [情報] ボタン処理でタイムアウトまたはエラー。")
-        
-        # --- フェーズ2: 商品数に応じた段階的スクロール処理 ---
-        self.logger.log("\n    --- フェーズ2: 商品数に応じた段階的スクロール処理 ---")
-        
-        # 総商品数に基づいてスクロール回数を決定
-        total_products = getattr(self, 'total_items', 0)
-        if total_products <= 96:
-            self.logger.log(f"      [スキップ] 総商品数が{total_products}個のため、スクロール不要")
-            return
-        
-        # 48の倍数で必要なスクロール回数を計算
-        scroll_rounds = max(1, (total_products - 48) // 48)
-        self.logger.log(f"      [計画] 総商品数{total_products}個に対して{scroll_rounds}回のスクロールを実行")
-        
-        # 固定値スクロール戦略（7500pxずつ100%まで）
-        self.logger.log(f"\n      [スクロール戦略] 7500pxずつ固定スクロール（100%到達まで）")
-        
-        scroll_position = 0
-        scroll_increment = 7500
-        scroll_count = 0
-        previous_count = 0
-        
-        while True:
-            scroll_count += 1
-            scroll_position += scroll_increment
-            
-            self.logger.log(f"\n      [スクロール {scroll_count}] {scroll_position}px地点へ")
-            
-            scroll_result = await tab.evaluate(f'''
-                (() => {{
-                    const before = window.scrollY;
-                    window.scrollTo(0, {scroll_position});
-                    const after = window.scrollY;
-                    const itemCount = document.querySelectorAll('h-grid-result-item').length;
-                    const bodyHeight = document.body.scrollHeight;
-                    return {{
-                        before: before,
-                        after: after,
-                        itemCount: itemCount,
-                        bodyHeight: bodyHeight,
-                        reachedBottom: after + window.innerHeight >= bodyHeight
-                    }};
-                }})()
-            ''')
-            
-            result = normalize_nodriver_result(scroll_result)
-            current_count = result.get('itemCount', 0)
-            self.logger.log(f"      スクロール位置: {result.get('before', 0)} → {result.get('after', 0)}")
-            self.logger.log(f"      現在の商品数: {current_count}個")
-            
-            # 取得率を計算
-            if self.total_items > 0:
-                current_rate = (current_count / self.total_items) * 100
-                self.logger.log(f"      取得率: {current_rate:.1f}%")
-                
-                # 95%以上到達したら成功判定
-                if current_rate >= 95.0:
-                    self.logger.log(f"      ✅ {current_rate:.1f}%到達！成功判定（{current_count}/{self.total_items}商品）")
-                    break
-            
-            # ページ最下部に到達したら終了
-            if result.get('reachedBottom', False):
-                self.logger.log(f"      ⚠️ ページ最下部に到達（商品数: {current_count}個）")
-                break
-            
-            # 商品数が増えなくなったらもう少し待機
-            if current_count == previous_count:
-                self.logger.log(f"      [追加待機] 商品数が増えないため5秒待機...")
-                await asyncio.sleep(5)
-            else:
-                await asyncio.sleep(3)
-            
-            previous_count = current_count
-            
-            # 安全のため最大10回まで
-            if scroll_count >= 10:
-                self.logger.log(f"      ⚠️ 最大スクロール回数に到達")
-                break
-        
-        
-        self.logger.log("      [待機] 最終読み込み待機中（10秒）...")
-        await asyncio.sleep(10)
-        
-        # 読み込み状況を確認
-        item_count = await tab.evaluate("document.querySelectorAll('h-grid-result-item').length")
-        count = normalize_nodriver_result(item_count)
-        if isinstance(count, dict):
-            count = count.get('value', 0)
-        self.logger.log(f"      [確認] 最終的な商品数: {count}個")
+        """Load Moreクリックとスクロールで全商品を読み込む（商品数の増加に応じた適応制御）"""
+        self.logger.log(f"    📜 動的読み込み処理開始（適応制御）")
+        controller = LoadController(
+            tab,
+            self.agent,
+            self._probe,
+            self._evaluate,
+            logger=self.logger,
+            on_growth=lambda label: self._harvest(tab, label),
+            total_items=self.total_items,
+            timer=self.timer
+        )
+        count = await controller.run()
+        self.load_stats = {
+            'actions': len(controller.actions),
+            'stop_reason': controller.stop_reason,
+            'final_count': count,
+            'learned_timeout': controller.timeout,
+        }
         
-        # 85%以上だが95%に達していない場合、追加スクロールを試行
-        if self.total_items > 0 and count < self.total_items and count / self.total_items >= 0.85 and count / self.total_items < 0.95:
-            self.logger.log(f"      [追加処理] 85%以上95%未満（{count}/{self.total_items}）- 追加スクロール実行")
-            
-            # 最下部で微小なスクロールを複数回実行
-            for i in range(3):
-                await tab.evaluate('''
-                    window.scrollTo(0, document.body.scrollHeight - 100);
-                ''')
-                await asyncio.sleep(2)
-                await tab.evaluate('''
-                    window.scrollTo(0, document.body.scrollHeight);
-                ''')
-                await asyncio.sleep(3)
-            
-            # 最終確認
-            final_count = await tab.evaluate("document.querySelectorAll('h-grid-result-item').length")
-            final_count = normalize_nodriver_result(final_count)
-            if isinstance(final_count, dict):
-                final_count = final_count.get('value', 0)
-            self.logger.log(f"      [最終確認] 追加スクロール後の商品数: {final_count}個")
-
-        # --- フェーズ3: 商品読み込みのトリガー探索（不要になったが念のため残す）---
-        self.logger.log("\n    --- フェーズ2: エルメスサイトの読み込みトリガー探索 ---")
-        
-        last_count_raw = await tab.evaluate("document.querySelectorAll('h-grid-result-item').length")
-        last_count = normalize_nodriver_result(last_count_raw)
-        if isinstance(last_count, dict):
-            last_count = last_count.get('value', 0)
-        no_new_items_streak = 0
-        max_scrolls = 15
-
-        # 現在の取得率を計算
         if self.total_items > 0:
-            current_rate = (last_count / self.total_items) * 100
-            self.logger.log(f"\n    [現状] 取得率: {current_rate:.1f}% ({last_count}/{self.total_items})")
-            
-        # 巨大ウィンドウの効果を確認
-        self.logger.log("\n    [確認] 超巨大ウィンドウ(1920x15000)での初期表示商品数を検証中...")
-        
-        # 取得結果を評価
-        if last_count >= self.total_items:
-            self.logger.log(f"    🎉🎉 [完全成功] 全{self.total_items}商品を取得完了！")
-            self.logger.log("    [結論] 100%の商品取得に成功しました！")
-            return
-        elif last_count > 144:
-            self.logger.log(f"    🎉 [大成功] 巨大ウィンドウにより{last_count}商品を取得！")
-            self.logger.log(f"    [進捗] 前回の144商品から{last_count - 144}商品増加")
-            self.logger.log("    [結論] ウィンドウサイズ15000px戦略がさらに有効でした。")
-            return
-        elif last_count > 96:
-            self.logger.log(f"    ✅ [成功] 巨大ウィンドウにより{last_count}商品を取得")
-            self.logger.log("    [結論] ウィンドウサイズ拡大戦略が有効でした。")
-            return
-        
-        # 96商品のままの場合
-        self.logger.log("\n    [分析結果] 巨大ウィンドウでも96商品が上限:")
-        self.logger.log("      - エルメスサイトは表示領域に関わらず96商品までしか初期ロードしない")
-        self.logger.log("      - 無限スクロール: JavaScript/bot検知により無効化")
-        self.logger.log("\n    [結論] ウィンドウサイズ拡大でも96商品が取得上限です。")
-        
-        return  # スクロール試行をスキップ
-        
-        for i in range(max_scrolls):
-            scroll_attempt = i + 1
-            self.logger.log(f"\n      --- スクロール試行 {scroll_attempt}/{max_scrolls} ---")
-
-            # [実行] nodriverのscroll_downメソッドを使用
-            self.logger.log("        [実行] nodriverのscroll_downメソッドで物理的なスクロールを実行します。")
-            
-            # スクロール前の状態を取得
-            before_state = await tab.evaluate('''
-                ({
-                    scrollY: window.scrollY,
-                    itemCount: document.querySelectorAll('h-grid-result-item').length
-                })
-            ''')
-            before_state = normalize_nodriver_result(before_state)
-            
-            # スクロール実行（複数の方法を試行）
-            try:
-                # 方法1: nodriverのscroll_downメソッドを試行
-                await tab.scroll_down(800)
-                await asyncio.sleep(0.5)
-            except Exception as e:
-                self.logger.log(f"        [情報] scroll_downメソッドが使用できません: {e}")
-            
-            # 方法2: JavaScriptでの確実なスクロール（フォールバック）
-            # ページ最下部付近までジャンプ
-            scroll_js_result = await tab.evaluate('''
-                (() => {
-                    const beforeY = window.scrollY;
-                    const viewHeight = window.innerHeight;
-                    const pageHeight = document.body.scrollHeight;
-                    
-                    // 現在位置から1画面分スクロール
-                    const targetY = Math.min(beforeY + viewHeight * 0.8, pageHeight - viewHeight);
-                    
-                    // 即座にジャンプ（アニメーションなし）
-                    window.scrollTo(0, targetY);
-                    
-                    return {
-                        before: beforeY,
-                        after: window.scrollY,
-                        pageHeight: pageHeight,
-                        scrolled: window.scrollY > beforeY
-                    };
-                })()
-            ''')
-            
-            scroll_result = normalize_nodriver_result(scroll_js_result)
-            if scroll_result.get('scrolled'):
-                self.logger.log(f"        [成功] JavaScriptスクロール: {scroll_result.get('before', 0)} → {scroll_result.get('after', 0)}")
-            
-            # 追加の待機
-            await asyncio.sleep(1)
-            
-            # スクロール後の状態を取得
-            after_state = await tab.evaluate('''
-                ({
-                    scrollY: window.scrollY,
-                    itemCount: document.querySelectorAll('h-grid-result-item').length
-                })
-            ''')
-            after_state = normalize_nodriver_result(after_state)
-            
-            # スクロール結果をログ
-            if after_state.get('scrollY', 0) > before_state.get('scrollY', 0):
-                self.logger.log(f"        [成功] スクロール実行: {before_state.get('scrollY', 0)} → {after_state.get('scrollY', 0)}")
-            else:
-                self.logger.log(f"        [警告] スクロール位置が変わりませんでした: {after_state.get('scrollY', 0)}")
-            
-            self.logger.log("        [待機] 自動読み込みとレンダリングを待機中 (8秒)...")
-            await asyncio.sleep(8)
-
-            # [検証] スクロール後の状態を分析
-            current_state_raw = await tab.evaluate('''
-                ({
-                    itemCount: document.querySelectorAll('h-grid-result-item').length,
-                    scrollY: window.scrollY,
-                    scrollHeight: document.body.scrollHeight
-                })
-            ''')
-            current_state = normalize_nodriver_result(current_state_raw)
-            current_count = current_state.get('itemCount', 0)
-            
-            self.logger.log(f"        [検証] 現在の商品数: {current_count}個")
-            self.logger.log(f"        [検証] スクロール位置: {current_state.get('scrollY', 'N/A')} / {current_state.get('scrollHeight', 'N/A')}")
-
-            # [判断] と [終了条件]
-            if current_count > last_count:
-                self.logger.log(f"        [判断] ✅ 新規商品 {current_count - last_count}個を検出しました！")
-                no_new_items_streak = 0
-            else:
-                no_new_items_streak += 1
-                self.logger.log(f"        [判断] ⏸️ 新規商品はありませんでした。(連続 {no_new_items_streak}回)")
-            
-            if no_new_items_streak >= 3:
-                self.logger.log("\n      [終了] 3回連続で新規商品がなかったため、全件取得完了と判断します。")
-                break
-            
-            if self.total_items > 0 and current_count >= self.total_items:
-                self.logger.log(f"\n      [終了] 宣言されている総商品数 ({self.total_items}個) に到達しました。")
-                break
-
-            last_count = current_count
-            if scroll_attempt == max_scrolls:
-                self.logger.log(f"\n      [警告] 最大スクロール回数 ({max_scrolls}回) に到達しました。")
-        
-        # 最終結果サマリー（変更なし）
-        final_count_raw = await tab.evaluate("document.querySelectorAll('h-grid-result-item').length")
-        final_count = normalize_nodriver_result(final_count_raw)
-        if isinstance(final_count, dict):
-            final_count = final_count.get('value', 0)
-        self.logger.log(f"\n    [最終結果] スクロール処理完了。最終的な取得見込み商品数: {final_count}個")
-    
-    async def _click_hermes_button(self, tab, selector):
-        """エルメスボタンの確実クリック"""
-        try:
-            # nodriverでボタンを見つけてクリック
-            self.logger.log("           🔍 ボタンを検索中...")
-            
-            # 方法1: wait_forを使用してボタンを取得
-            try:
-                button = await tab.wait_for(selector, timeout=5000)
-                if button:
-                    self.logger.log("           🎯 ボタンを発見（wait_for）")
-                    
-                    # スクロールしてボタンを表示
-                    await tab.evaluate(f'''
-                        const button = document.querySelector('{selector}');
-                        if (button) {{
-                            button.scrollIntoView({{behavior: 'smooth', block: 'center'}});
-                        }}
-                    ''')
-                    await asyncio.sleep(1)
-                    
-                    # ボタンをクリック
-                    await button.click()
-                    self.logger.log("           ✅ ボタンクリック実行（nodriver API）")
-                    
-                    # 読み込み待機
-                    await asyncio.sleep(5)
-                    return True
-            except:
-                # 方法1が失敗した場合、方法2を試す
-                self.logger.log("           ⚠️ wait_forメソッドが失敗、代替方法を試行")
-            
-            # 方法2: evaluateでクリック
-            result = await tab.evaluate(f'''
-                (async () => {{
-                    const button = document.querySelector('{selector}');
-                    if (!button) return {{success: false, error: 'Button not found'}};
-                    
-                    // ボタンの状態確認
-                    const isVisible = button.offsetParent !== null;
-                    const isDisabled = button.disabled || button.getAttribute('aria-disabled') === 'true';
-                    
-                    if (!isVisible) return {{success: false, error: 'Button not visible'}};
-                    if (isDisabled) return {{success: false, error: 'Button disabled'}};
-                    
-                    // スクロール
-                    button.scrollIntoView({{behavior: 'smooth', block: 'center'}});
-                    await new Promise(resolve => setTimeout(resolve, 1000));
-                    
-                    // クリック
-                    button.click();
-                    
-                    return {{success: true}};
-                }})()
-            ''')
-            
-            result_normalized = normalize_nodriver_result(result)
-            if safe_get(result_normalized, 'success'):
-                self.logger.log("           ✅ ボタンクリック実行（evaluate）")
-                await asyncio.sleep(5)
-                return True
+            rate = count / self.total_items * 100
+            if count >= self.total_items:
+                self.logger.log(f"    🎉 [完全成功] 全{self.total_items}商品を読み込み完了")
             else:
-                error_msg = safe_get(result_normalized, 'error', 'Unknown error')
-                self.logger.log(f"           ❌ クリック失敗: {error_msg}")
-                return False
-            
-        except Exception as e:
-            self.logger.log(f"           💥 クリック処理エラー: {e}")
-            import traceback
-            self.logger.log(traceback.format_exc())
-            return False
-    
+                self.logger.log(f"    ⚠️ 取得率: {rate:.1f}% ({count}/{self.total_items})")
     
     async def _download_html(self, tab):
-        """HTMLをダウンロード"""
+        """HTMLを取得（メモリ上に保持し、save_html指定時のみファイルにも保存）"""
         self.logger.log("  Step 3: HTMLダウンロード")
         
         try:
             # 完全なHTMLを取得
-            full_html_raw = await tab.evaluate('document.documentElement.outerHTML')
+            full_html_raw = await self._evaluate(tab, 'document.documentElement.outerHTML')
             full_html = normalize_nodriver_result(full_html_raw)
             if isinstance(full_html, dict):
                 full_html = full_html.get('html', full_html.get('value', str(full_html_raw)))
             
-            # HTMLを保存
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = 'hermes_page.html'
-            
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write(full_html)
-            
+            # 解析はパイプライン側でこの文字列をそのまま使う（ファイルの再読み込み・再解析なし）
+            self.html_content = full_html
             file_size = len(full_html.encode('utf-8'))
-            self.logger.log(f"    ✅ HTMLファイル保存完了: {filename}")
-            self.logger.log(f"    📁 ファイルサイズ: {file_size:,} bytes ({file_size/1024:.1f} KB)")
-            
-            # 商品数の確認（重複考慮）
-            from bs4 import BeautifulSoup
-            soup = BeautifulSoup(full_html, 'lxml')
-            items = soup.find_all('h-grid-result-item')
-            unique_urls = set()
-            for item in items:
-                link = item.find('a')
-                if link and link.get('href'):
-                    unique_urls.add(link['href'])
-            
-            # 商品タグ数を直接カウント（元の実装通り）
-            tag_count = full_html.count('h-grid-result-item')
-            
-            self.logger.log(f"    📊 HTML内の商品タグ数: {tag_count}（総数）")
-            self.logger.log(f"    📊 ユニーク商品数: {len(unique_urls)}")
             
-            # 総商品数との比較
-            if hasattr(self, 'total_items') and self.total_items > 0:
-                if len(unique_urls) < self.total_items:
-                    self.logger.log(f"    ⚠️ 取得率: {len(unique_urls)}/{self.total_items} ({len(unique_urls)/self.total_items*100:.1f}%)")
+            # HTMLを保存（任意の副出力、成果物ストアに圧縮して保存）
+            if self.save_html:
+                filename = self.html_filename
+                await self._store_html(filename, full_html)
+                self.html_file = filename
+                self.logger.log(f"    ✅ HTMLファイル保存完了: {filename}")
+            else:
+                self.logger.log(f"    ✅ HTML取得完了（ファイル保存なし）")
+            self.logger.log(f"    📁 HTMLサイズ: {file_size:,} bytes ({file_size/1024:.1f} KB)")
             
             return True
             
@@ -772,154 +536,95 @@ class HermesScraper:
             self.logger.log(f"    ❌ HTMLダウンロードエラー: {e}")
             return False
     
-    async def _check_loading_animation(self, tab):
-        """ローディングアニメーション（3つのドット）を検出"""
-        self.logger.log(f"        🔎 ローディングアニメーション検出開始...")
-        try:
-            # ローディングインジケーターの一般的なセレクター
-            loading_selectors = [
-                '.loading',
-                '.loader',
-                '[class*="loading"]',
-                '[class*="loader"]',
-                '.dots',
-                '.spinner',
-                '[aria-label*="loading"]',
-                '[aria-label*="Loading"]',
-                'div[class*="dot"]',
-                # エルメス固有の可能性
-                'h-loading',
-                '[class*="load-more"]',
-                '.progress'
-            ]
-            
-            for selector in loading_selectors:
-                try:
-                    loading_exists = await tab.evaluate(f'''
-                        (function() {{
-                            const elem = document.querySelector('{selector}');
-                            if (elem) {{
-                                const isVisible = elem.offsetParent !== null;
-                                const style = window.getComputedStyle(elem);
-                                const isDisplayed = style.display !== 'none' && style.visibility !== 'hidden';
-                                return isVisible && isDisplayed;
-                            }}
-                            return false;
-                        }})()
-                    ''')
-                    
-                    if normalize_nodriver_result(loading_exists):
-                        self.logger.log(f"        🔍 ローディング要素検出: {selector}")
-                        return True
-                except:
-                    continue
-            
-            # アニメーション中の要素を検出（より汎用的）
-            animating_elements = await tab.evaluate('''
-                (function() {
-                    const elements = document.querySelectorAll('*');
-                    for (let elem of elements) {
-                        const style = window.getComputedStyle(elem);
-                        if (style.animationName !== 'none' || style.transition !== 'none') {
-                            const rect = elem.getBoundingClientRect();
-                            // 画面内に表示されているアニメーション要素
-                            if (rect.top >= 0 && rect.bottom <= window.innerHeight) {
-                                return true;
-                            }
-                        }
-                    }
-                    return false;
-                })()
-            ''')
-            
-            result = normalize_nodriver_result(animating_elements)
-            if not result:
-                self.logger.log(f"        ❌ ローディングアニメーション検出なし")
-            return result
-            
-        except Exception as e:
-            self.logger.log(f"        ⚠️ ローディング検出エラー: {e}")
+    async def _fetch_pages_parallel(self, tab):
+        """総商品数から残りページを算出し、検索APIを並列に呼び出して取得（失敗時はFalseで逐次読み込みへ）"""
+        self.logger.log(f"    ⚡ 残りページの並列取得")
+        if not self.total_items:
+            # 総商品数が不明だと残りページを算出できない（1ページ目だけで完了扱いにしない）
+            self.logger.log(f"      ⚠️ 総商品数を検出できていません（逐次読み込みへフォールバック）")
+            return False
+        payloads = await self.api_capture.drain()
+        first_page = None
+        for payload in payloads:
+            items = HermesParser.products_from_api_payloads([payload])
+            if items:
+                first_page = (payload['url'], len(items))
+                break
+        if first_page is None:
+            self.logger.log(f"      ⚠️ 1ページ目の検索APIを検出できません（逐次読み込みへフォールバック）")
+            return False
+        
+        api_url, page_size = first_page
+        if self.total_items <= page_size:
+            self.logger.log(f"      [完了] 総商品数{self.total_items}個は1ページ目で取得済み")
+            return True
+        
+        captured = {payload['url'] for payload in payloads}
+        urls = [url for url in plan_page_urls(api_url, self.total_items, page_size) if url not in captured]
+        if not urls:
+            self.logger.log(f"      ⚠️ APIのページングパラメータを特定できません（逐次読み込みへフォールバック）")
+            return False
+        
+        start = time.time()
+        self.logger.log(f"      [実行] {len(urls)}ページを同時{self.page_concurrency}件で取得")
+        results = await fetch_pages(self._evaluate, tab, urls, self.page_concurrency)
+        failed = [r['url'] for r in results if r.get('data') is None]
+        if failed:
+            # 失敗したページは1回だけ再試行
+            retried = await fetch_pages(self._evaluate, tab, failed, self.page_concurrency)
+            results = [r for r in results if r.get('data') is not None] + retried
+            failed = [r['url'] for r in retried if r.get('data') is None]
+        
+        for result in results:
+            if result.get('data') is not None:
+                self.api_capture.payloads.append({'url': result['url'], 'data': result['data']})
+        self.load_stats = {
+            'mode': 'parallel_pages',
+            'pages': len(urls) + 1,
+            'failed_pages': len(failed),
+            'fetch_time': time.time() - start,
+        }
+        self.logger.log(f"      ✅ {len(urls) - len(failed)}/{len(urls)}ページ取得（{time.time() - start:.2f}秒）")
+        if failed:
+            self.logger.log(f"      ⚠️ {len(failed)}ページの取得に失敗（逐次読み込みで補完）")
             return False
+        return True
     
-    async def _detect_dom_changes(self, tab, wait_time=2):
-        """DOM変更を検出（新商品読み込みの間接的な検出）"""
-        try:
-            # 現在のDOM状態を記録
-            initial_state = await tab.evaluate('''
-                (function() {
-                    const items = document.querySelectorAll('h-grid-result-item');
-                    return {
-                        itemCount: items.length,
-                        lastItemId: items.length > 0 ? items[items.length - 1].getAttribute('id') || 'no-id' : null,
-                        bodyHeight: document.body.scrollHeight
-                    };
-                })()
-            ''')
-            
-            await asyncio.sleep(wait_time)
-            
-            # 変更後の状態を確認
-            final_state = await tab.evaluate('''
-                (function() {
-                    const items = document.querySelectorAll('h-grid-result-item');
-                    return {
-                        itemCount: items.length,
-                        lastItemId: items.length > 0 ? items[items.length - 1].getAttribute('id') || 'no-id' : null,
-                        bodyHeight: document.body.scrollHeight
-                    };
-                })()
-            ''')
-            
-            initial = normalize_nodriver_result(initial_state)
-            final = normalize_nodriver_result(final_state)
-            
-            changes_detected = (
-                safe_get(initial, 'itemCount') != safe_get(final, 'itemCount') or
-                safe_get(initial, 'lastItemId') != safe_get(final, 'lastItemId') or
-                safe_get(initial, 'bodyHeight') != safe_get(final, 'bodyHeight')
-            )
-            
-            if changes_detected:
-                self.logger.log(f"        📊 DOM変更検出: アイテム数 {safe_get(initial, 'itemCount')} → {safe_get(final, 'itemCount')}")
-            
-            return changes_detected
-            
-        except Exception as e:
-            self.logger.log(f"        ⚠️ DOM変更検出エラー: {e}")
+    async def _build_products_from_api(self):
+        """キャプチャしたAPIレスポンスから商品リストを構築"""
+        self.logger.log("  Step 3: APIレスポンスから商品情報を構築")
+        
+        payloads = await self.api_capture.drain()
+        if not payloads:
+            self.logger.log("    ⚠️ APIレスポンスを検出できませんでした（HTMLダウンロードへフォールバック）")
+            return False
+        
+        self.api_products = HermesParser.products_from_api_payloads(payloads)
+        if not self.api_products:
+            self.logger.log(f"    ⚠️ APIレスポンス{len(payloads)}件に商品データがありません（HTMLダウンロードへフォールバック）")
             return False
+        
+        self.logger.log(f"    ✅ APIレスポンス{len(payloads)}件から{len(self.api_products)}商品を構築")
+        if self.total_items > 0 and len(self.api_products) < self.total_items:
+            self.logger.log(f"    ⚠️ 取得率: {len(self.api_products)}/{self.total_items} ({len(self.api_products)/self.total_items*100:.1f}%)")
+        return True
     
-    async def _save_html_snapshot(self, tab, filename, label):
-        """現在のHTMLスナップショットを保存"""
-        try:
-            self.logger.log(f"    📸 {label}のHTMLを保存中...")
-            
-            # 完全なHTMLを取得
-            html_raw = await tab.evaluate('document.documentElement.outerHTML')
-            html_content = normalize_nodriver_result(html_raw)
-            if isinstance(html_content, dict):
-                html_content = html_content.get('html', html_content.get('value', str(html_raw)))
-            
-            # HTMLを保存
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write(html_content)
-            
-            file_size = len(html_content.encode('utf-8'))
-            self.logger.log(f"    ✅ {label}HTML保存完了: {filename} ({file_size/1024:.1f} KB)")
-            
-            # 商品数をカウント
-            from bs4 import BeautifulSoup
-            soup = BeautifulSoup(html_content, 'lxml')
-            items = soup.find_all('h-grid-result-item')
-            unique_urls = set()
-            for item in items:
-                link = item.find('a')
-                if link and link.get('href'):
-                    unique_urls.add(link['href'])
-            
-            self.logger.log(f"    📊 {label}商品数: {len(unique_urls)}個")
-            
-        except Exception as e:
-            self.logger.log(f"    ❌ {label}HTML保存エラー: {e}")
+    async def _store_html(self, filename, html_content):
+        """HTMLを成果物ストアに圧縮保存（同一内容は重複排除）"""
+        if self.workspace is not None:
+            filename = self.workspace.final_path(filename)
+        # 圧縮・ハッシュ計算・インデックス更新はブラウザプールのループを塞がないよう別スレッドで行う
+        loop = asyncio.get_running_loop()
+        with self.timer.span('write_html'):
+            record = await loop.run_in_executor(None, get_artifact_store().put_text, filename, html_content)
+        self.saved_files.append(record)
+        if record['deduplicated']:
+            self.logger.log(f"    ♻️ 同一内容のHTMLが保存済みのため再利用（{record['hash'][:12]}）")
+        else:
+            self.logger.log(
+                f"    🗜️ 圧縮保存: {record['size']/1024:.1f} KB → {record['stored_size']/1024:.1f} KB"
+            )
+        return record
     
     def get_results(self):
         """実行結果のログを取得"""
@@ -932,23 +637,10 @@ class HermesScraper:
             for log in self.console_logs:
                 full_logs.append(f"  - {log}")
         
-        # 生成されたファイルのリストを取得
-        import os
-        import glob
-        generated_files = []
-        
-        # スナップショットファイルを検索
-        snapshot_patterns = ['snapshot_*.html', 'before_click.html', 'after_click.html', 'hermes_page.html']
-        for pattern in snapshot_patterns:
-            files = glob.glob(pattern)
-            generated_files.extend(files)
-        
-        # 生成されたファイル情報をログメッセージに追加
-        if generated_files:
+        # この実行で保存したHTMLファイル情報をログメッセージに追加
+        if self.saved_files:
             full_logs.append("\n📸 生成されたスナップショットファイル:")
-            for file in sorted(set(generated_files)):
-                if os.path.exists(file):
-                    size = os.path.getsize(file) / 1024
-                    full_logs.append(f"  - {file} ({size:.1f} KB)")
+            for record in self.saved_files:
+                full_logs.append(f"  - {record['name']} ({record['size']/1024:.1f} KB)")
         
         return full_logs
\ No newline at end of file
@@ -1,7 +1,13 @@
 """
 共通ユーティリティ関数
 """
+import atexit
+import logging
+import os
+import queue
 import sys
+import threading
+from collections import deque
 from datetime import datetime
 
 
@@ -24,22 +30,163 @@ def normalize_nodriver_result(result):
     return result
 
 
-def create_logger():
+# ログ出力の設定（環境変数で変更可能）
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+LOG_BUFFER_SIZE = int(os.environ.get("LOG_BUFFER_SIZE", "5000"))
+_BUFFER_LEVEL = logging.INFO
+
+
+class _QueuedWriter:
+    """標準出力への書き込みを専用スレッドにまとめて行う出力先
+
+    log() はキューに積むだけで戻るため、スクレイピング中のイベントループを止めない。
+    書き込みスレッドは溜まった分をまとめて書き、flushはまとめて1回だけ行う。
+    """
+
+    def __init__(self, stream=None, level=logging.INFO):
+        self.stream = stream or sys.stdout
+        self.level = level
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name='log-writer', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def isEnabledFor(self, level):
+        return level >= self.level
+
+    def log(self, level, message):
+        if level >= self.level:
+            self._queue.put(message)
+
+    def _run(self):
+        while True:
+            message = self._queue.get()
+            if message is None:
+                return
+            batch = [message]
+            try:
+                while len(batch) < 1000:
+                    message = self._queue.get_nowait()
+                    if message is None:
+                        self._write(batch)
+                        return
+                    batch.append(message)
+            except queue.Empty:
+                pass
+            self._write(batch)
+
+    def _write(self, batch):
+        try:
+            self.stream.write("\n".join(batch) + "\n")
+            self.stream.flush()
+        except Exception:
+            pass
+
+    def close(self):
+        """残りのログを書き出して終了（プロセス終了時）"""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout=2)
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def _get_backend():
+    """プロセス共有の出力先を取得"""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = _QueuedWriter(level=getattr(logging, LOG_LEVEL, logging.INFO))
+    return _writer
+
+
+def set_console_level(level):
+    """このプロセスの標準出力に出すログの最低レベルを変更（バッファへの記録には影響しない）"""
+    _get_backend().level = level
+
+
+def _infer_level(message):
+    """既存のメッセージ形式（絵文字の接頭辞）からログレベルを推定"""
+    head = message.lstrip()[:2]
+    if head.startswith('❌'):
+        return logging.ERROR
+    if head.startswith('⚠'):
+        return logging.WARNING
+    return logging.INFO
+
+
+def create_logger(name=None, buffer_size=None):
     """ログ出力用のロガーを作成"""
     class Logger:
+        """実行ごとのロガー（直近のログをリングバッファに保持し、標準出力へは非同期に出力）"""
+
         def __init__(self):
-            self.results = []
-        
-        def log(self, message):
-            """メッセージをログに追加し、標準出力にも出力"""
-            self.results.append(message)
-            print(message)
-            sys.stdout.flush()
-        
+            self.name = name
+            self.backend = _get_backend()
+            self.buffer = deque(maxlen=buffer_size or LOG_BUFFER_SIZE)
+            self.total = 0  # これまでに記録した件数（バッファから溢れた分を含む）
+            self._samples = {}
+
+        def log(self, message, level=None):
+            """メッセージをログに追加し、標準出力にも出力（レベル省略時はメッセージから推定）"""
+            if level is None:
+                level = _infer_level(message)
+            # UI向けのバッファはINFO以上を常に保持し、標準出力はLOG_LEVELで絞り込む
+            if level >= _BUFFER_LEVEL or level >= self.backend.level:
+                self.buffer.append(message)
+                self.total += 1
+            if self.backend.isEnabledFor(level):
+                self.backend.log(level, message)
+
+        def debug(self, message):
+            self.log(message, logging.DEBUG)
+
+        def info(self, message):
+            self.log(message, logging.INFO)
+
+        def warning(self, message):
+            self.log(message, logging.WARNING)
+
+        def error(self, message):
+            self.log(message, logging.ERROR)
+
+        def log_sampled(self, key, message, every=50, level=None):
+            """商品単位など大量に出るログを間引いて出力（最初の1件とevery件ごとに出力）"""
+            count = self._samples.get(key, 0) + 1
+            self._samples[key] = count
+            if count == 1 or count % every == 0:
+                suffix = f" （同種 {count}件目）" if count > 1 else ""
+                self.log(f"{message}{suffix}", level)
+
+        def flush_samples(self):
+            """間引いたログの件数を集計して出力"""
+            for key, count in self._samples.items():
+                if count > 1:
+                    self.log(f"  ℹ️ {key}: 合計{count}件（一部のみ表示）")
+            self._samples.clear()
+
+        def extend(self, messages):
+            """他のロガーの結果をバッファに取り込む（標準出力には再出力しない）"""
+            for message in messages:
+                self.buffer.append(message)
+                self.total += 1
+
+        def read_since(self, cursor):
+            """cursor件目以降のログと次のcursorを返す（バッファから溢れた分は読み飛ばす）"""
+            available = self.total - len(self.buffer)
+            start = max(cursor, available)
+            return list(self.buffer)[start - available:], self.total
+
         def get_results(self):
             """蓄積されたログ結果を取得"""
-            return self.results
-    
+            dropped = self.total - len(self.buffer)
+            results = list(self.buffer)
+            if dropped:
+                results.insert(0, f"…（古いログ{dropped}件を省略）")
+            return results
+
     return Logger()
 
 
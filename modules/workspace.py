@@ -0,0 +1,93 @@
+"""
+実行単位のワークスペース（実行IDごとの作業ディレクトリと原子的な確定処理）
+"""
+import json
+import os
+import shutil
+import time
+import uuid
+from datetime import datetime
+
+
+RUNS_ROOT = os.environ.get("RUNS_DIR", "runs")
+MANIFEST_NAME = 'manifest.json'
+
+
+class RunWorkspace:
+    """1回のスクレイピング実行専用のディレクトリ
+
+    実行中は runs/<run_id>.tmp/ に書き込み、finalize() でマニフェストを書いてから
+    runs/<run_id>/ へリネームする（同一ファイルシステム内のrenameは原子的）。
+    そのため他の実行とファイル名が衝突せず、未完了の出力が確定済みに見えることもない。
+    HTMLは成果物ストアに保存されるため、ストア上の名前には確定後のパス（final_path）を使う。
+    """
+
+    def __init__(self, run_id=None, root=None, worker_id=None):
+        if run_id is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            worker_suffix = f"_{worker_id}" if worker_id else ""
+            run_id = f"{timestamp}{worker_suffix}_{uuid.uuid4().hex[:8]}"
+        self.run_id = run_id
+        self.root = root or RUNS_ROOT
+        self.final_dir = os.path.join(self.root, run_id)
+        self.staging_dir = f"{self.final_dir}.tmp"
+        self.created_at = time.time()
+        self.finalized = False
+        os.makedirs(self.staging_dir, exist_ok=True)
+
+    def path(self, name):
+        """実行中に書き込むファイルのパス（作業ディレクトリ内）"""
+        return os.path.join(self.final_dir if self.finalized else self.staging_dir, os.path.basename(name))
+
+    def final_path(self, name):
+        """確定後のファイルパス（成果物ストア上の名前・APIで返すパス）"""
+        return os.path.join(self.final_dir, os.path.basename(name))
+
+    def finalize(self, status='success', metadata=None):
+        """マニフェストを書き込み、作業ディレクトリを確定ディレクトリへ原子的に移動"""
+        if self.finalized:
+            return self.final_dir
+        files = sorted(os.listdir(self.staging_dir)) if os.path.isdir(self.staging_dir) else []
+        manifest = {
+            'run_id': self.run_id,
+            'status': status,
+            'created_at': datetime.fromtimestamp(self.created_at).isoformat(),
+            'finalized_at': datetime.now().isoformat(),
+            'files': files,
+        }
+        manifest.update(metadata or {})
+        os.makedirs(self.staging_dir, exist_ok=True)
+        tmp_manifest = os.path.join(self.staging_dir, f"{MANIFEST_NAME}.tmp")
+        with open(tmp_manifest, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2, default=str)
+        os.replace(tmp_manifest, os.path.join(self.staging_dir, MANIFEST_NAME))
+        os.replace(self.staging_dir, self.final_dir)
+        self.finalized = True
+        return self.final_dir
+
+    def discard(self):
+        """未確定の作業ディレクトリを削除"""
+        if not self.finalized:
+            shutil.rmtree(self.staging_dir, ignore_errors=True)
+
+    @staticmethod
+    def load_manifest(run_id, root=None):
+        """確定済み実行のマニフェストを取得（存在しない場合はNone）"""
+        path = os.path.join(root or RUNS_ROOT, os.path.basename(run_id), MANIFEST_NAME)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    @staticmethod
+    def list_runs(root=None):
+        """確定済みの実行IDの一覧（新しい順）"""
+        root = root or RUNS_ROOT
+        if not os.path.isdir(root):
+            return []
+        runs = [
+            name for name in os.listdir(root)
+            if not name.endswith('.tmp') and os.path.exists(os.path.join(root, name, MANIFEST_NAME))
+        ]
+        runs.sort(key=lambda name: os.path.getmtime(os.path.join(root, name, MANIFEST_NAME)), reverse=True)
+        return runs
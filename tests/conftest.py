@@ -0,0 +1,5 @@
+import os
+import sys
+
+# リポジトリ直下（modules / benchmarks）をインポートできるようにする
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
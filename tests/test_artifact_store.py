@@ -0,0 +1,95 @@
+"""
+ArtifactStore の圧縮保存・重複排除・追記型インデックスと実行の保持件数
+"""
+import os
+import threading
+import time
+
+from modules import file_handler, workspace
+from modules.artifact_store import ArtifactStore
+from modules.file_handler import FileHandler
+from modules.workspace import RunWorkspace
+
+
+def test_put_and_read_round_trip_with_dedup(tmp_path):
+    store = ArtifactStore(str(tmp_path / 'artifacts'))
+    first = store.put_text('a.html', '<html>同じ内容</html>' * 100)
+    second = store.put_text('b.html', '<html>同じ内容</html>' * 100)
+    assert not first['deduplicated'] and second['deduplicated']
+    assert first['hash'] == second['hash'] and first['stored_size'] < first['size']
+    assert store.read_text('b.html') == '<html>同じ内容</html>' * 100
+    assert store.get_stats()['objects'] == 1
+
+
+def test_remove_deletes_unreferenced_objects(tmp_path):
+    store = ArtifactStore(str(tmp_path / 'artifacts'))
+    digest = store.put_text('a.html', 'x')['hash']
+    store.put_text('b.html', 'x')
+    object_path = store._object_path(digest)
+    assert store.remove('a.html') and os.path.exists(object_path)
+    assert store.remove('b.html') and not os.path.exists(object_path)
+    assert not store.remove('b.html')
+
+
+def test_index_is_appended_and_reloaded(tmp_path):
+    root = str(tmp_path / 'artifacts')
+    store = ArtifactStore(root)
+    store.put_text('a.html', 'a')
+    store.put_text('b.html', 'b')
+    store.remove('a.html')
+    with open(store.index_file, encoding='utf-8') as f:
+        assert len(f.readlines()) == 3
+    assert [e['name'] for e in ArtifactStore(root).list_entries()] == ['b.html']
+
+
+def test_stores_sharing_a_root_do_not_lose_updates(tmp_path):
+    # 別プロセスと同じく、インスタンスごとに独立したインデックスを持つ
+    root = str(tmp_path / 'artifacts')
+    stores = [ArtifactStore(root) for _ in range(4)]
+
+    def write(worker, store):
+        for i in range(25):
+            store.put_text(f'w{worker}/page_{i}.html', f'{worker}-{i}')
+
+    threads = [threading.Thread(target=write, args=(worker, store)) for worker, store in enumerate(stores)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for store in stores + [ArtifactStore(root)]:
+        assert len(store.list_entries()) == 100
+
+
+def test_long_logs_are_compacted(tmp_path, monkeypatch):
+    monkeypatch.setattr(ArtifactStore, 'COMPACT_MIN_LINES', 10)
+    root = str(tmp_path / 'artifacts')
+    store = ArtifactStore(root)
+    other = ArtifactStore(root)
+    other.put_text('keep.html', 'keep')
+    for i in range(20):
+        store.put_text('page.html', f'v{i}')
+    with open(store.index_file, encoding='utf-8') as f:
+        assert len(f.readlines()) <= 10
+    # 書き直し後も他のインスタンスは最新の内容を読む
+    assert sorted(e['name'] for e in other.list_entries()) == ['keep.html', 'page.html']
+    assert other.read_text('page.html') == 'v19'
+
+
+def test_clean_old_runs_keeps_the_latest_runs(tmp_path, monkeypatch):
+    runs_root = str(tmp_path / 'runs')
+    store = ArtifactStore(str(tmp_path / 'artifacts'))
+    monkeypatch.setattr(workspace, 'RUNS_ROOT', runs_root)
+    monkeypatch.setattr(file_handler, 'RUNS_ROOT', runs_root)
+    monkeypatch.setattr(file_handler, 'get_artifact_store', lambda: store)
+
+    for i in range(3):
+        run = RunWorkspace(run_id=f'run{i}', root=runs_root)
+        store.put_text(run.final_path('hermes_page.html'), f'page {i}')
+        run.finalize()
+        # マニフェストの更新時刻で新しさを判定するため、実行ごとにずらす
+        os.utime(os.path.join(run.final_dir, 'manifest.json'), (time.time() + i, time.time() + i))
+
+    assert FileHandler.clean_old_runs(keep_latest=1) == 2
+    assert RunWorkspace.list_runs(root=runs_root) == ['run2']
+    assert [e['name'] for e in store.list_entries()] == [os.path.join(runs_root, 'run2', 'hermes_page.html')]
+    assert FileHandler.clean_old_runs(keep_latest=1) == 0
@@ -0,0 +1,80 @@
+"""
+DeltaIndex の差分算出と状態の保存
+"""
+from modules.delta import DeltaIndex, product_key
+from modules.product_store import ProductStore
+
+
+def _product(idx, price='¥100,000', url=True):
+    return {
+        'index': idx,
+        'name': f'商品{idx}',
+        'url': f'/jp/ja/product/item-{idx}/' if url else 'N/A',
+        'price': price,
+        'colors': [],
+        'sku': f'H{idx}',
+    }
+
+
+def test_product_key_prefers_url_then_sku():
+    assert product_key(_product(1)) == '/jp/ja/product/item-1/'
+    assert product_key(_product(1, url=False)) == 'sku:H1'
+    assert product_key({'url': 'N/A', 'sku': 'N/A'}) is None
+
+
+def test_first_update_reports_everything_as_added(tmp_path):
+    index = DeltaIndex(root=str(tmp_path / 'delta'), runs_root=str(tmp_path / 'runs'))
+    delta = index.update('バッグ', [_product(1), _product(2)], run_id='r1')
+    assert delta['initial'] is True
+    assert delta['counts'] == {'added': 2, 'removed': 0, 'price_changed': 0, 'unchanged': 0, 'total': 2}
+
+
+def test_update_detects_added_removed_and_price_changes(tmp_path):
+    index = DeltaIndex(root=str(tmp_path / 'delta'), runs_root=str(tmp_path / 'runs'))
+    index.update('バッグ', [_product(1), _product(2), _product(3)], run_id='r1')
+    delta = index.update('バッグ', [_product(1), _product(2, price='¥120,000'), _product(4)], run_id='r2')
+
+    assert delta['base_run_id'] == 'r1'
+    assert [p['url'] for p in delta['added']] == ['/jp/ja/product/item-4/']
+    assert [p['url'] for p in delta['removed']] == ['/jp/ja/product/item-3/']
+    assert delta['price_changed'] == [dict(
+        name='商品2', url='/jp/ja/product/item-2/', sku='H2', price='¥120,000', old_price='¥100,000'
+    )]
+    assert delta['counts']['unchanged'] == 1
+    assert index.latest('バッグ') == delta
+
+
+def test_partial_update_reports_no_removals_and_keeps_state(tmp_path):
+    index = DeltaIndex(root=str(tmp_path / 'delta'), runs_root=str(tmp_path / 'runs'))
+    full = index.update('バッグ', [_product(1), _product(2), _product(3)], run_id='r1')
+
+    delta = index.update('バッグ', [_product(1, price='¥90,000'), _product(4)], run_id='r2', partial=True)
+    assert delta['partial'] is True
+    assert delta['removed'] == [] and delta['counts']['removed'] == 0
+    assert delta['counts']['added'] == 1 and delta['counts']['price_changed'] == 1
+    # 状態は更新されず、次の完全な実行は r1 と比較される
+    assert index.latest('バッグ') == full
+    delta = index.update('バッグ', [_product(1), _product(2), _product(3)], run_id='r3')
+    assert delta['base_run_id'] == 'r1'
+    assert delta['counts']['unchanged'] == 3
+
+
+def test_locales_are_tracked_separately(tmp_path):
+    index = DeltaIndex(root=str(tmp_path / 'delta'), runs_root=str(tmp_path / 'runs'))
+    index.update('バッグ', [_product(1)], run_id='r1', locale='jp/ja')
+    delta = index.update('バッグ', [_product(2)], run_id='r2', locale='us/en')
+    assert delta['initial'] is True
+
+
+def test_since_compares_a_stored_run_with_the_current_state(tmp_path):
+    store = ProductStore(str(tmp_path / 'products.db'))
+    index = DeltaIndex(root=str(tmp_path / 'delta'), runs_root=str(tmp_path / 'runs'), product_store=store)
+    old = [_product(1), _product(2)]
+    store.save_run('r1', old, keyword='バッグ', locale='jp/ja')
+    index.update('バッグ', old, run_id='r1')
+    index.update('バッグ', [_product(2, price='¥110,000'), _product(3)], run_id='r2')
+
+    delta = index.since('r1')
+    assert delta['base_run_id'] == 'r1' and delta['run_id'] == 'r2'
+    assert delta['counts'] == {'added': 1, 'removed': 1, 'price_changed': 1, 'unchanged': 0, 'total': 2}
+    assert index.since('missing') is None
@@ -0,0 +1,99 @@
+"""
+HermesScraper.iter_harvest の逐次取得（差分のyieldと途中終了時の後始末）
+"""
+import asyncio
+import json
+
+from modules.pipeline import ScrapePipeline
+from modules.scraper import HermesScraper
+
+
+class _FakeTab:
+    """HARVEST_SCRIPT の代わりに、用意したバッチを1回に1つずつ返すタブ"""
+
+    def __init__(self, batches):
+        self.batches = list(batches)
+        self.total = 0
+
+    async def evaluate(self, expression):
+        records = self.batches.pop(0) if self.batches else []
+        self.total += len(records)
+        return json.dumps({'total': self.total, 'records': records})
+
+
+def _records(start, count):
+    return [
+        {'href': f'/jp/ja/product/item-{i}/', 'name': f'商品{i}', 'price': '¥100,000', 'colors': [], 'sku': f'H{i}'}
+        for i in range(start, start + count)
+    ]
+
+
+class _FakeScraper(HermesScraper):
+    """ブラウザを使わず、Load Moreの各ステップで _harvest を呼ぶスクレイパー"""
+
+    def __init__(self, batches):
+        super().__init__(harvest=True)
+        self.tab = _FakeTab(batches)
+        self.steps = asyncio.Event()
+        self.cancelled = False
+        self.finished = False
+
+    async def scrape_hermes_site(self, url=None, search_keyword="バッグ", locale="jp/ja"):
+        try:
+            for step in range(len(self.tab.batches)):
+                if await self._harvest(self.tab, f'step {step}'):
+                    # 呼び出し側が差分を受け取るまで次のステップに進まない
+                    await self.steps.wait()
+                    self.steps.clear()
+            self.finished = True
+            return bool(self.harvested)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+
+
+def test_iter_harvest_yields_each_step_before_the_scrape_finishes():
+    async def consume():
+        scraper = _FakeScraper([_records(1, 3), _records(4, 2), _records(1, 2), _records(6, 1)])
+        deltas = []
+        async for delta in scraper.iter_harvest():
+            assert not scraper.finished
+            deltas.append([product['sku'] for product in delta])
+            scraper.steps.set()
+        return scraper, deltas
+
+    scraper, deltas = asyncio.run(consume())
+    # 取得済みのURL（3回目のステップ）は差分に含めない
+    assert deltas == [['H1', 'H2', 'H3'], ['H4', 'H5'], ['H6']]
+    assert scraper.harvest_success is True
+    assert [p['index'] for p in scraper.get_harvested_products()] == [1, 2, 3, 4, 5, 6]
+    assert scraper._harvest_queue is None
+
+
+def test_iter_harvest_cancels_the_scrape_when_the_consumer_stops_early():
+    async def consume():
+        scraper = _FakeScraper([_records(1, 3), _records(4, 2)])
+        generator = scraper.iter_harvest()
+        first = await generator.__anext__()
+        await generator.aclose()
+        return scraper, first
+
+    scraper, first = asyncio.run(consume())
+    assert len(first) == 3
+    assert scraper.cancelled and not scraper.finished
+    assert scraper.harvest_success is False
+    assert scraper._harvest_queue is None
+
+
+def test_pipeline_passes_harvested_products_while_scraping():
+    received = []
+
+    def on_products(delta):
+        received.append([product['sku'] for product in delta])
+        pipeline.scraper.steps.set()
+
+    pipeline = ScrapePipeline(harvest=True, save_json=False, on_products=on_products)
+    pipeline.scraper = _FakeScraper([_records(1, 2), _records(3, 2)])
+    assert asyncio.run(pipeline.run(search_keyword='バッグ')) is True
+    assert received == [['H1', 'H2'], ['H3', 'H4']]
+    assert [p['sku'] for p in pipeline.get_products()] == ['H1', 'H2', 'H3', 'H4']
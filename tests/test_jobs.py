@@ -0,0 +1,80 @@
+"""
+JobManager のキュー実行とブラウザプール再起動後の引き継ぎ
+"""
+import asyncio
+import time
+
+import pytest
+
+from modules.browser_pool import BrowserPool
+from modules.jobs import JobManager, QueueFullError
+
+
+def _wait_done(job, timeout=5):
+    deadline = time.time() + timeout
+    while not job.done and time.time() < deadline:
+        time.sleep(0.01)
+    return job.done
+
+
+@pytest.fixture
+def pool():
+    pool = BrowserPool(size=1)
+    yield pool
+    pool.shutdown()
+
+
+async def _echo(job):
+    await asyncio.sleep(0)
+    return {'status': 'success', 'value': job.params['value'], 'error': None}
+
+
+def test_jobs_run_on_the_pool_loop(pool):
+    manager = JobManager(pool, _echo, workers=2)
+    jobs = [manager.submit({'value': i}) for i in range(5)]
+    assert all(_wait_done(job) for job in jobs)
+    assert [job.result['value'] for job in jobs] == list(range(5))
+    assert manager.get_stats()['jobs'] == {'succeeded': 5}
+    assert manager.list_jobs()[0] is jobs[-1]
+
+
+def test_queue_limit(pool):
+    async def blocked(job):
+        await asyncio.sleep(10)
+
+    manager = JobManager(pool, blocked, workers=1, max_queue=2)
+    manager.submit({})
+    time.sleep(0.1)  # 1件目はワーカーが取り出して実行中
+    manager.submit({})
+    manager.submit({})
+    with pytest.raises(QueueFullError):
+        manager.submit({})
+
+
+def test_jobs_run_after_the_pool_is_restarted(pool):
+    manager = JobManager(pool, _echo, workers=1)
+    assert _wait_done(manager.submit({'value': 1}))
+
+    pool.shutdown()
+    job = manager.submit({'value': 2})
+    assert _wait_done(job)
+    assert job.status == 'succeeded' and job.result['value'] == 2
+
+
+def test_restart_fails_running_jobs_and_keeps_queued_ones(pool):
+    async def slow(job):
+        if job.params['value'] == 'slow':
+            await asyncio.sleep(10)
+        return await _echo(job)
+
+    manager = JobManager(pool, slow, workers=1)
+    running = manager.submit({'value': 'slow'})
+    time.sleep(0.1)
+    queued = manager.submit({'value': 'queued'})
+    assert running.status == 'running' and queued.status == 'queued'
+
+    pool.shutdown()
+    after = manager.submit({'value': 'after'})
+    assert _wait_done(queued) and _wait_done(after)
+    assert running.status == 'failed' and running.error
+    assert queued.result['value'] == 'queued'
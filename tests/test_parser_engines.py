@@ -0,0 +1,37 @@
+"""
+HermesParser の lxml / bs4 エンジンの一致確認
+"""
+import pytest
+
+from modules.parser import HermesParser
+from benchmarks.synthetic_pages import FIELDS, generate_search_page
+
+
+def _extract(html_content, engine):
+    return HermesParser().extract_products(html_content, engine=engine)
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_engines_match_on_synthetic_corpus(seed):
+    html_content = generate_search_page(120, seed=seed)
+    lxml_products = _extract(html_content, 'lxml')
+    assert len(lxml_products) == 120
+    assert lxml_products == _extract(html_content, 'bs4')
+
+
+@pytest.mark.parametrize('field', FIELDS)
+def test_engines_match_when_field_is_missing(field):
+    html_content = generate_search_page(24, fields=tuple(f for f in FIELDS if f != field))
+    assert _extract(html_content, 'lxml') == _extract(html_content, 'bs4')
+
+
+def test_engines_match_without_variants():
+    html_content = generate_search_page(24, noise=False, variants=False)
+    assert _extract(html_content, 'lxml') == _extract(html_content, 'bs4')
+
+
+@pytest.mark.parametrize('html_content', ['', '   \n\t'])
+def test_empty_html_has_no_products(html_content):
+    assert _extract(html_content, 'lxml') == []
+    assert _extract(html_content, 'bs4') == []
+    assert HermesParser.count_unique_urls(html_content) == 0
@@ -0,0 +1,117 @@
+"""
+ProductStore の保存・検索と parse_price
+"""
+import json
+
+import pytest
+
+from modules.product_store import ProductStore
+from modules.records import parse_price
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('¥1,234,000', (1234000, 'JPY')),
+    ('¥ 980円', (980, 'JPY')),
+    ('€2.450,50', (245050, 'EUR')),
+    ('€12', (1200, 'EUR')),
+    ('$19.99', (1999, 'USD')),
+    ('£1,234.5', (123450, 'GBP')),
+    ('$0.29', (29, 'USD')),
+    ('価格未定', (None, None)),
+    ('N/A', (None, None)),
+    (None, (None, None)),
+])
+def test_parse_price_returns_minor_units(text, expected):
+    assert parse_price(text) == expected
+
+
+def _product(idx, name='バーキン', price='¥1,000,000', url=True, sku=True):
+    return {
+        'index': idx,
+        'name': name,
+        'url': f'/jp/ja/product/item-{idx}/' if url else 'N/A',
+        'price': price,
+        'colors': ['ノワール'],
+        'sku': f'H{idx}' if sku else 'N/A',
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ProductStore(str(tmp_path / 'products.db'), batch_size=2)
+
+
+def test_save_run_and_read_back_in_order(store):
+    products = [_product(i) for i in range(1, 6)]
+    assert store.save_run('r1', products, keyword='バッグ', locale='jp/ja') == 5
+    assert store.get_run_products('r1') == products
+    assert store.get_run_products('missing') is None
+    # 同じrun_idは置き換え
+    store.save_run('r1', products[:2], keyword='バッグ')
+    assert len(store.get_run_products('r1')) == 2
+
+
+def test_query_filters(store):
+    store.save_run('r1', [
+        _product(1, name='バーキン 25', price='¥1,500,000'),
+        _product(2, name='ケリー 28', price='¥1,200,000'),
+        _product(3, name='ピコタン', price='€2.450,50'),
+    ], keyword='バッグ', locale='jp/ja', extracted_at=1000)
+    store.save_run('r2', [_product(4, name='ボリード')], keyword='財布', locale='jp/ja', extracted_at=2000)
+
+    assert store.query(keyword='財布')[0] == 1
+    assert [p['sku'] for p in store.query(name='ケリー')[1]] == ['H2']
+    assert [p['sku'] for p in store.query(currency='JPY', min_price=1300000)[1]] == ['H1']
+    assert [p['sku'] for p in store.query(currency='EUR', max_price=245050)[1]] == ['H3']
+    assert store.query(currency='EUR', max_price=245049)[0] == 0
+    assert [p['sku'] for p in store.query(since=1500)[1]] == ['H4']
+    assert store.query(until=1500)[0] == 3
+    total, products = store.query(keyword='バッグ', limit=2, offset=2)
+    assert total == 3 and len(products) == 1
+
+
+def test_price_bounds_apply_within_one_currency(store):
+    store.save_run('r1', [
+        _product(1, price='¥10,000'),
+        _product(2, price='$100.00'),
+        _product(3, price='$99.99'),
+        _product(4, price='¥9,999'),
+    ], keyword='バッグ')
+
+    # 10000 は ¥10,000 と $100.00 の両方に一致してしまうため、通貨の指定を必須にする
+    with pytest.raises(ValueError):
+        store.query(min_price=10000)
+    assert [p['sku'] for p in store.query(min_price=10000, currency='JPY')[1]] == ['H1']
+    assert [p['sku'] for p in store.query(min_price=10000, currency='USD')[1]] == ['H2']
+    assert [p['sku'] for p in store.query(max_price=9999, currency='USD')[1]] == ['H3']
+    assert store.query(currency='USD')[0] == 2
+
+
+def test_query_latest_keeps_the_newest_capture_per_product(store):
+    store.save_run('r1', [_product(1, price='¥1,000,000')], keyword='バッグ', extracted_at=1000)
+    store.save_run('r2', [_product(1, price='¥1,100,000')], keyword='バッグ', extracted_at=2000)
+
+    total, products = store.query(sku='H1')
+    assert total == 1
+    assert products[0]['price'] == '¥1,100,000' and products[0]['price_minor'] == 1100000
+    assert store.query(sku='H1', latest=False)[0] == 2
+
+
+def test_query_rows_use_the_parser_shape_for_missing_values(store):
+    store.save_run('r1', [_product(1, name='N/A', price='N/A', url=False, sku=False)], keyword='バッグ')
+    [row] = store.query(keyword='バッグ')[1]
+    assert {key: row[key] for key in ('name', 'url', 'price', 'sku')} == dict.fromkeys(
+        ('name', 'url', 'price', 'sku'), 'N/A'
+    )
+    assert row['price_minor'] is None and row['currency'] is None
+    assert store.get_run_products('r1')[0]['url'] == 'N/A'
+
+
+def test_export_json(store, tmp_path):
+    products = [_product(1), _product(2)]
+    store.save_run('r1', products, keyword='バッグ')
+    filename = store.export_json('r1', str(tmp_path / 'export.json'))
+    with open(filename, encoding='utf-8') as f:
+        assert json.load(f)['products'] == products
+    assert store.export_json('missing', str(tmp_path / 'missing.json')) is None
+
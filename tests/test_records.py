@@ -0,0 +1,62 @@
+"""
+ProductRecord と解析結果の辞書・JSON・商品DBとの相互変換
+"""
+import pytest
+
+from modules.product_store import ProductStore
+from modules.records import MISSING, ProductRecord, to_dicts, to_records
+
+
+PRODUCTS = [
+    {'index': 1, 'name': 'バーキン 25', 'url': '/jp/ja/product/item-1/', 'price': '¥1,500,000',
+     'colors': ['ノワール', 'ゴールド'], 'sku': 'H1'},
+    {'index': 2, 'name': 'ピコタン', 'url': '/jp/ja/product/item-2/', 'price': '€2.450,50',
+     'colors': [], 'sku': 'H2'},
+    {'index': 3, 'name': MISSING, 'url': MISSING, 'price': MISSING, 'colors': ['エトゥープ'], 'sku': MISSING},
+]
+
+
+@pytest.mark.parametrize('product', PRODUCTS)
+def test_dict_round_trip(product):
+    record = ProductRecord.from_dict(product)
+    assert record.to_dict() == product
+    assert ProductRecord.from_dict(record.to_dict()) == record
+
+
+@pytest.mark.parametrize('product', PRODUCTS)
+def test_json_round_trip(product):
+    record = ProductRecord.from_dict(product)
+    assert ProductRecord.from_json(record.to_json()) == record
+
+
+def test_from_dict_parses_price_and_maps_missing_values():
+    first, second, third = to_records(PRODUCTS)
+    assert (first.price, first.currency, first.price_text) == (1500000, 'JPY', '¥1,500,000')
+    assert (second.price, second.currency) == (245050, 'EUR')
+    assert (third.name, third.url, third.sku, third.price, third.currency) == (None,) * 5
+    assert first.colors == ('ノワール', 'ゴールド')
+
+
+def test_sku_is_kept_as_text():
+    assert ProductRecord.from_dict({'sku': 12345}).sku == '12345'
+
+
+def test_to_records_accepts_records_and_to_dicts_restores_products():
+    records = to_records(PRODUCTS)
+    assert to_records(records)[0] is records[0]
+    assert to_dicts(records) == PRODUCTS
+
+
+def test_records_are_compact():
+    record = ProductRecord.from_dict(PRODUCTS[0])
+    assert not hasattr(record, '__dict__')
+    with pytest.raises(AttributeError):
+        record.extra = 1
+
+
+def test_store_round_trip(tmp_path):
+    store = ProductStore(str(tmp_path / 'products.db'), batch_size=2)
+    records = to_records(PRODUCTS)
+    store.save_run('r1', records, keyword='バッグ')
+    assert list(store.iter_run_records('r1')) == records
+    assert list(store.iter_run_products('r1')) == PRODUCTS
@@ -0,0 +1,79 @@
+"""
+BulkReparser の並列再解析と中断後の再開
+"""
+import json
+import os
+
+import pytest
+
+from benchmarks.synthetic_pages import write_search_page
+from modules.reparse import PROGRESS_FILE, SUMMARY_FILE, BulkReparser, load_summary, snapshot_task
+
+
+@pytest.fixture
+def snapshots(tmp_path, monkeypatch):
+    # 成果物ストアなど作業ディレクトリ基準のパスがリポジトリ内に作られないようにする
+    monkeypatch.chdir(tmp_path)
+    paths = []
+    for idx, n_items in enumerate((12, 24, 36)):
+        path = str(tmp_path / f'hermes_page_2026010{idx + 1}_w{idx}.html')
+        write_search_page(path, n_items, seed=idx, noise=False)
+        paths.append(path)
+    return paths
+
+
+def _reparser(tmp_path):
+    return BulkReparser(output_dir=str(tmp_path / 'out'), workers=2, runs_root=str(tmp_path / 'runs'))
+
+
+def _progress_lines(tmp_path):
+    with open(tmp_path / 'out' / PROGRESS_FILE, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_snapshot_task_for_loose_files(tmp_path):
+    task = snapshot_task(str(tmp_path / 'hermes_page_20260101_w0.html'), runs_root=str(tmp_path / 'runs'))
+    assert task['snapshot_id'] == '20260101_w0'
+    assert task['run_id'] == 'reparse_20260101_w0'
+
+
+def test_run_parses_every_snapshot(tmp_path, snapshots):
+    stats = _reparser(tmp_path).run(snapshots)
+    assert stats['status'] == 'success'
+    assert stats['succeeded'] == 3 and stats['products'] == 12 + 24 + 36
+    with open(tmp_path / 'out' / 'hermes_products_20260102_w1.json', encoding='utf-8') as f:
+        assert json.load(f)['total_products'] == 24
+    assert load_summary(str(tmp_path / 'out')) == stats
+    # 全件成功したら進捗は破棄され、次回は全件を解析し直す
+    assert not os.path.exists(tmp_path / 'out' / PROGRESS_FILE)
+    assert _reparser(tmp_path).run(snapshots)['processed'] == 3
+
+
+def test_resume_skips_recorded_snapshots(tmp_path, snapshots):
+    reparser = _reparser(tmp_path)
+    os.makedirs(reparser.output_dir)
+    # 1件目の完了後に中断した状態（最後の行は書きかけ）
+    with open(reparser.progress_file, 'w', encoding='utf-8') as f:
+        f.write(json.dumps({'snapshot': snapshots[0], 'status': 'success', 'products': 12}) + '\n')
+        f.write('{"snapshot": "')
+
+    stats = reparser.run(snapshots)
+    assert stats['skipped'] == 1 and stats['processed'] == 2
+    assert stats['total_products'] == 12 + 24 + 36
+    assert not os.path.exists(reparser.progress_file)
+
+
+def test_failed_snapshots_are_retried(tmp_path, snapshots):
+    missing = str(tmp_path / 'hermes_page_missing.html')
+    reparser = _reparser(tmp_path)
+
+    stats = reparser.run(snapshots + [missing])
+    assert stats['status'] == 'error' and stats['failures'] == [missing]
+    # 失敗があると進捗は残り、再実行では失敗した分だけを解析する
+    assert len(_progress_lines(tmp_path)) == 4
+    stats = reparser.run(snapshots + [missing])
+    assert stats['skipped'] == 3 and stats['processed'] == 1
+
+    stats = reparser.run(snapshots + [missing], resume=False)
+    assert stats['processed'] == 4
+    assert os.path.exists(tmp_path / 'out' / SUMMARY_FILE)
@@ -0,0 +1,78 @@
+"""
+ResultCache の鮮度判定・LRU・エントリ単位の永続化
+"""
+import os
+
+from modules.result_cache import ResultCache, make_cache_key
+
+
+PRODUCTS = [{'index': 1, 'name': 'バーキン', 'url': '/jp/ja/product/item-1/', 'price': '¥1,000,000',
+             'colors': [], 'sku': 'H1'}]
+
+
+def _files(root):
+    return sorted(name for name in os.listdir(root) if name.endswith('.json')) if os.path.isdir(root) else []
+
+
+def test_make_cache_key_normalizes_keyword_and_locale():
+    assert make_cache_key('  Birkin   25 ', '/JP/ja/') == make_cache_key('birkin 25', 'jp/ja')
+
+
+def test_fresh_stale_and_miss(tmp_path, monkeypatch):
+    cache = ResultCache(root=str(tmp_path / 'cache'), ttl=10, stale_ttl=100)
+    now = 1_000_000.0
+    monkeypatch.setattr('modules.result_cache.time.time', lambda: now)
+    cache.put('バッグ', 'jp/ja', PRODUCTS)
+    assert cache.get('バッグ', 'jp/ja')[1] == 'fresh'
+    now += 50
+    entry, state = cache.get('バッグ', 'jp/ja')
+    assert state == 'stale' and entry['products'] == PRODUCTS
+    now += 100
+    assert cache.get('バッグ', 'jp/ja') == (None, 'miss')
+    assert cache.flush()
+    assert _files(cache.root) == []
+
+
+def test_entries_are_persisted_per_file_and_reloaded(tmp_path):
+    root = str(tmp_path / 'cache')
+    cache = ResultCache(root=root, max_entries=2)
+    for keyword in ('バッグ', '財布', 'スカーフ'):
+        cache.put(keyword, 'jp/ja', PRODUCTS)
+    assert cache.flush()
+    # 上限を超えた最も古いエントリはファイルも削除される
+    assert len(_files(root)) == 2
+
+    reloaded = ResultCache(root=root, max_entries=2)
+    assert reloaded.get('バッグ', 'jp/ja') == (None, 'miss')
+    entry, state = reloaded.get('スカーフ', 'jp/ja')
+    assert state == 'fresh' and entry['products'] == PRODUCTS
+
+
+def test_invalidate_removes_files(tmp_path):
+    root = str(tmp_path / 'cache')
+    cache = ResultCache(root=root)
+    cache.put('バッグ', 'jp/ja', PRODUCTS)
+    cache.put('財布', 'jp/ja', PRODUCTS)
+    cache.invalidate('バッグ', 'jp/ja')
+    assert cache.flush()
+    assert len(_files(root)) == 1
+    cache.invalidate()
+    assert cache.flush()
+    assert _files(root) == []
+    assert ResultCache(root=root).get('財布', 'jp/ja') == (None, 'miss')
+
+
+def test_partial_results_are_not_cached(tmp_path):
+    root = str(tmp_path / 'cache')
+    cache = ResultCache(root=root)
+    assert cache.put('バッグ', 'jp/ja', PRODUCTS[:0], partial=True) is False
+    assert cache.get('バッグ', 'jp/ja') == (None, 'miss')
+
+    # 完全な結果を部分結果で上書きしない
+    assert cache.put('バッグ', 'jp/ja', PRODUCTS) is True
+    cache.put('バッグ', 'jp/ja', [], partial=True)
+    entry, state = cache.get('バッグ', 'jp/ja')
+    assert state == 'fresh' and entry['products'] == PRODUCTS
+    assert cache.get_stats()['partial_skips'] == 2
+    assert cache.flush()
+    assert ResultCache(root=root).get('バッグ', 'jp/ja')[0]['products'] == PRODUCTS